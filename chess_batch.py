@@ -0,0 +1,326 @@
+'''Chess Puzzle Batch Solver
+
+Classifies a directory of board files in the plain format in parallel,
+writing one JSON line per file in the order the results complete.
+
+Usage: python chess_batch.py DIRECTORY [-o OUTPUT] [-j WORKERS] [--mate N] [--dedupe]
+                             [--store FILE [--store-max N]]
+
+With --dedupe, each worker solves a board only once up to rotation and
+reflection (copying its result to later boards of the same form), and every
+result of a form but the first written is marked with duplicate_of.
+With --store, verdicts and mate solutions are read from and written to a
+persistent solution store (see chess_store), shared by all workers and runs.
+
+Author : Serika Kawano
+Created: 2026-10-16
+Updated: 2026-10-16
+'''
+
+import argparse
+import fnmatch
+import json
+import os
+import sys
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Iterable, Iterator, TextIO
+
+from chess_puzzle import (board_to_plain, canonical_board, index2move, inverse_transform, is_check,
+                          is_checkmate, is_stalemate, move2index, read_board, solve_mate,
+                          transform_square)
+from chess_store import Solution, SolutionStore
+
+
+# < Code Variables >
+#region
+# The most results a worker keeps for --dedupe (the oldest is dropped first)
+DEDUPE_ENTRIES = 10000
+
+# The solution store of this process, opened on first use
+_stores: dict[str, SolutionStore] = {}
+
+# The result and transform to the canonical board of each board solved by this
+# process with dedupe, by canonical board and mate depth
+_solved: dict[tuple[str, int], tuple[dict, int]] = {}
+#endregion
+
+
+# ---------------
+# Static Methods
+# ---------------
+# < File Methods >
+#region
+def iter_board_files(directory: str, pattern: str = '*.txt') -> Iterator[str]:
+    '''
+    yields the paths of the board files under directory, walking it lazily
+
+    [arguments]
+    directory: str
+    pattern: str - The file name pattern of board files
+
+    [return]
+    generator of str
+    '''
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in sorted(files):
+            if fnmatch.fnmatch(name, pattern):
+                yield os.path.join(root, name)
+#endregion
+
+# < Classification Methods >
+#region
+def classify_file(path: str, mate_depth: int = 0, store: str | None = None,
+                  store_max: int | None = None, dedupe: bool = False) -> dict:
+    '''
+    reads the board in path and classifies it for both sides
+    if mate_depth is positive, also searches for a mate by White within mate_depth moves
+    with a solution store file, known answers are read from it and new ones written to it
+    with dedupe, the result carries the canonical board under 'canonical', and a
+    board whose canonical form this process has solved before gets a copy of that result
+
+    [arguments]
+    path: str
+    mate_depth: int
+    store: str | None - The solution store file, if any
+    store_max: int | None - The most entries the store keeps
+    dedupe: bool
+
+    [return]
+    dict - The JSON-ready result
+    '''
+    # 1. Read the board
+    try:
+        B = read_board(path)
+    except (IOError, ValueError) as ex:
+        return {'file': path, 'error': str(ex)}
+
+    # 2. Copy the result of a board of the same form, if solved already;
+    # the canonical board is computed once, for the memo and the store alike
+    memo = canonical = None
+    if dedupe or store:
+        canonical = C, transform = canonical_board(B)
+    if dedupe:
+        memo = (board_to_plain(C), mate_depth)
+        if memo in _solved:
+            return _copy_result(*_solved[memo], path, transform)
+
+    # 3. Look both sides up in the store at once
+    solutions = _open_store(store, store_max) if store else None
+    keys = {side: SolutionStore.canonical_key(C, side) for side in (True, False)} if solutions else {}
+    known = solutions.get_many(keys.values()) if solutions else {}
+    new: dict[str, Solution] = {}
+
+    # 4. Check, checkmate and stalemate for each side
+    result: dict = {'file': path, 'size': B[0]}
+    for name, side in (('white', True), ('black', False)):
+        solution = known.get(keys.get(side))
+        if solution is None or None in (solution.check, solution.checkmate, solution.stalemate):
+            solution = Solution(is_check(side, B), is_checkmate(side, B), is_stalemate(side, B))
+            if solutions:
+                new[keys[side]] = solution
+        result[name] = {
+            'check': solution.check,
+            'checkmate': solution.checkmate,
+            'stalemate': solution.stalemate,
+        }
+    if new:
+        solutions.put_many(new)
+
+    # 5. Mate search
+    if mate_depth > 0:
+        line = solve_mate(B, True, mate_depth, store=solutions, canonical=canonical)
+        result['mate_in'] = None if line is None else (len(line) + 1) // 2
+        result['mate'] = None if line is None else [index2move(*move) for move in line]
+
+    # 6. Remember the result for later boards of the same form
+    if memo is not None:
+        result['canonical'] = memo[0]
+        if len(_solved) >= DEDUPE_ENTRIES:
+            del _solved[next(iter(_solved))]
+        _solved[memo] = (dict(result), transform)
+
+    # 7. Return
+    return result
+
+
+def _open_store(filename: str, max_entries: int | None) -> SolutionStore:
+    '''
+    returns the solution store of filename for this process, opening it on first use
+
+    [arguments]
+    filename: str
+    max_entries: int | None
+
+    [return]
+    object: SolutionStore
+    '''
+    if filename not in _stores:
+        _stores[filename] = SolutionStore(filename, max_entries)
+    return _stores[filename]
+
+
+def classify_files(paths: list[str], mate_depth: int = 0, store: str | None = None,
+                   store_max: int | None = None, dedupe: bool = False) -> list[dict]:
+    '''
+    classifies a chunk of board files (the unit of work sent to a worker process)
+
+    [arguments]
+    paths: list[str]
+    mate_depth: int
+    store: str | None
+    store_max: int | None
+    dedupe: bool
+
+    [return]
+    list[dict]
+    '''
+    return [classify_file(path, mate_depth, store, store_max, dedupe) for path in paths]
+#endregion
+
+# < Batch Methods >
+#region
+def _chunks(paths: Iterable[str], size: int) -> Iterator[list[str]]:
+    '''
+    yields consecutive chunks of at most size paths
+
+    [arguments]
+    paths: Iterable[str]
+    size: int
+
+    [return]
+    generator of list[str]
+    '''
+    chunk = []
+    for path in paths:
+        chunk.append(path)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _copy_result(result: dict, transform: int, path: str, duplicate_transform: int) -> dict:
+    '''
+    copies the result of a board to its duplicate in path, mapping the mate line
+    through the canonical frame: original -> transform -> inverse of duplicate_transform
+
+    [arguments]
+    result: dict
+    transform: int - The transform from the original board to the canonical board
+    path: str
+    duplicate_transform: int - The transform from the duplicate board to the canonical board
+
+    [return]
+    dict
+    '''
+    copy = dict(result, file=path, duplicate_of=result['file'])
+    if copy.get('mate'):
+        size, back = result['size'], inverse_transform(duplicate_transform)
+
+        def square(x: int, y: int) -> tuple[int, int]:
+            return transform_square(*transform_square(x, y, size, transform), size, back)
+
+        copy['mate'] = [index2move(*square(*move[:2]), *square(*move[2:]))
+                        for move in map(move2index, result['mate'])]
+    return copy
+
+
+def run_batch(paths: Iterable[str], output: TextIO, workers: int | None = None,
+              mate_depth: int = 0, chunk_size: int = 16, dedupe: bool = False,
+              store: str | None = None, store_max: int | None = None) -> int:
+    '''
+    classifies the board files in paths over a pool of worker processes and
+    writes each result to output as a JSON line as soon as it completes
+    only a few chunks per worker are in flight, so paths may be a lazy stream
+    with dedupe, the workers reduce each board to its canonical form under
+    rotation and reflection, and every result of a form but the first written
+    is marked with duplicate_of (only the canonical forms are kept here)
+
+    [arguments]
+    paths: Iterable[str]
+    output: TextIO
+    workers: int | None - The number of worker processes (the number of cores if None)
+    mate_depth: int
+    chunk_size: int - The number of files sent to a worker at a time
+    dedupe: bool
+    store: str | None - The solution store file, if any
+    store_max: int | None - The most entries the store keeps
+
+    [return]
+    int - The number of results written
+    '''
+    workers = workers or os.cpu_count() or 1
+    chunks = _chunks(paths, chunk_size)
+    options = (mate_depth, store, store_max, dedupe)
+    firsts: dict[str, str] = {}
+    written = 0
+
+    def emit(result: dict) -> None:
+        nonlocal written
+        canonical = result.pop('canonical', None)
+        if canonical is not None:
+            first = firsts.setdefault(canonical, result['file'])
+            if first == result['file']:
+                result.pop('duplicate_of', None)
+            else:
+                result['duplicate_of'] = first
+        output.write(json.dumps(result) + '\n')
+        written += 1
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # 1. Fill the pool
+        pending = set()
+        for chunk in chunks:
+            pending.add(executor.submit(classify_files, chunk, *options))
+            if len(pending) >= workers * 2:
+                break
+
+        # 2. Write results as they complete, topping the pool up from the stream
+        while pending:
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                for result in future.result():
+                    emit(result)
+                chunk = next(chunks, None)
+                if chunk is not None:
+                    pending.add(executor.submit(classify_files, chunk, *options))
+
+    # 3. Return
+    return written
+#endregion
+
+
+# ---------------
+# Main Function
+# ---------------
+def main(argv: list[str] | None = None) -> None:
+    '''
+    runs the batch solver from the command line
+
+    [arguments]
+    argv: list[str] | None - The command line arguments (sys.argv if None)
+    '''
+    parser = argparse.ArgumentParser(description='Classify a directory of chess puzzle board files.')
+    parser.add_argument('directory', help='directory of board files in the plain format')
+    parser.add_argument('-o', '--output', help='JSON lines output file (standard output if omitted)')
+    parser.add_argument('-j', '--workers', type=int, default=None, help='number of worker processes')
+    parser.add_argument('--mate', type=int, default=0, help='search for a White mate within this many moves')
+    parser.add_argument('--pattern', default='*.txt', help='file name pattern of board files')
+    parser.add_argument('--dedupe', action='store_true', help='solve boards equal up to rotation or reflection once')
+    parser.add_argument('--store', help='SQLite solution store to read and write answers')
+    parser.add_argument('--store-max', type=int, default=None, help='most entries kept in the solution store')
+    args = parser.parse_args(argv)
+
+    paths = iter_board_files(args.directory, args.pattern)
+    options = {'dedupe': args.dedupe, 'store': args.store, 'store_max': args.store_max}
+    if args.output:
+        with open(args.output, 'w') as output:
+            run_batch(paths, output, args.workers, args.mate, **options)
+    else:
+        run_batch(paths, sys.stdout, args.workers, args.mate, **options)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,227 @@
+'''Chess Puzzle Benchmarks
+
+Times move generation (perft), is_check, is_checkmate and conf2unicode on
+a standard position of each board size, reports nodes or calls per second,
+and saves or compares baselines as JSON so regressions show up.
+
+Usage: python chess_bench.py [--sizes 5 8 16 26] [--min-time SECONDS]
+                             [--save-baseline FILE] [--compare FILE] [--tolerance F]
+
+Author : Serika Kawano
+Created: 2026-10-16
+Updated: 2026-10-16
+'''
+
+import argparse
+import json
+import platform
+import sys
+import time
+from typing import Callable
+
+from chess_puzzle import (Bishop, Board, King, conf2unicode, is_check, is_checkmate, perft,
+                          result_cache)
+
+
+# < Code Variables >
+#region
+SIZES = (5, 8, 16, 26)
+PERFT_DEPTHS = {5: 4, 8: 4, 16: 3, 26: 3}
+#endregion
+
+
+# ---------------
+# Static Methods
+# ---------------
+# < Position Methods >
+#region
+def standard_position(size: int) -> Board:
+    '''
+    returns the standard benchmark position of size: each side has its king
+    in the middle of its back rank and bishops on the second and last but one files
+
+    [arguments]
+    size: int
+
+    [return]
+    object: Board
+    '''
+    centre = (size + 1) // 2
+    return Board((size, [
+        King(centre, 1, True), Bishop(2, 1, True), Bishop(size - 1, 1, True),
+        King(centre, size, False), Bishop(2, size, False), Bishop(size - 1, size, False)]))
+#endregion
+
+# < Timing Methods >
+#region
+def measure(func: Callable[[], object], min_time: float) -> tuple[int, float]:
+    '''
+    calls func repeatedly, doubling the number of calls until they take at least min_time
+
+    [arguments]
+    func: Callable[[], object]
+    min_time: float - Seconds
+
+    [return]
+    tuple[int, float] - The number of calls and the seconds they took
+    '''
+    calls = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(calls):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return calls, elapsed
+        calls *= 2
+
+
+def run_benchmarks(sizes: tuple[int, ...] = SIZES, min_time: float = 0.2) -> dict[str, dict]:
+    '''
+    runs every benchmark on the standard position of each size
+    the result cache is disabled meanwhile, so every call does the full work
+
+    [arguments]
+    sizes: tuple[int, ...]
+    min_time: float - The minimum seconds spent on each benchmark
+
+    [return]
+    dict[str, dict] - For each 'name/size': the rate, its unit and the measurements
+    '''
+    results: dict[str, dict] = {}
+    max_entries = result_cache.max_entries
+    result_cache.max_entries = 0
+    result_cache.clear()
+    try:
+        for size in sizes:
+            B = standard_position(size)
+
+            # 1. Perft, counted in nodes
+            depth = PERFT_DEPTHS.get(size, 3)
+            start = time.perf_counter()
+            nodes = perft(B, True, depth)
+            elapsed = time.perf_counter() - start
+            results[f'perft/{size}'] = {
+                'depth': depth, 'nodes': nodes, 'seconds': elapsed,
+                'rate': nodes / elapsed, 'unit': 'nodes/s'}
+
+            # 2. Single calls, counted in calls
+            for name, func in (('is_check', lambda: is_check(True, B)),
+                               ('is_checkmate', lambda: is_checkmate(True, B)),
+                               ('conf2unicode', lambda: conf2unicode(B))):
+                calls, elapsed = measure(func, min_time)
+                results[f'{name}/{size}'] = {
+                    'calls': calls, 'seconds': elapsed,
+                    'rate': calls / elapsed, 'unit': 'calls/s'}
+    finally:
+        result_cache.max_entries = max_entries
+    return results
+#endregion
+
+# < Baseline Methods >
+#region
+def save_baseline(filename: str, results: dict[str, dict]) -> None:
+    '''
+    writes results into filename as a JSON baseline
+
+    [arguments]
+    filename: str
+    results: dict[str, dict]
+    '''
+    with open(filename, 'w') as file:
+        json.dump({'python': platform.python_version(), 'results': results}, file, indent=2)
+
+
+def load_baseline(filename: str) -> dict[str, dict]:
+    '''
+    reads the results of a JSON baseline
+
+    [arguments]
+    filename: str
+
+    [return]
+    dict[str, dict]
+    '''
+    with open(filename) as file:
+        return json.load(file)['results']
+
+
+def compare(results: dict[str, dict], baseline: dict[str, dict], tolerance: float = 0.1
+            ) -> list[tuple[str, float, float, bool]]:
+    '''
+    compares the rate of each benchmark in both results
+    a benchmark regressed if its rate fell by more than tolerance (a fraction)
+
+    [arguments]
+    results: dict[str, dict]
+    baseline: dict[str, dict]
+    tolerance: float
+
+    [return]
+    list[tuple[str, float, float, bool]] - name, ratio of new to old rate, old rate, regressed
+    '''
+    rows = []
+    for name, result in results.items():
+        if name in baseline:
+            old = baseline[name]['rate']
+            ratio = result['rate'] / old
+            rows.append((name, ratio, old, ratio < 1 - tolerance))
+    return rows
+#endregion
+
+# < Report Methods >
+#region
+def format_report(results: dict[str, dict], comparison: list[tuple[str, float, float, bool]] | None = None) -> str:
+    '''
+    formats results, and their comparison with a baseline if any, as a table
+
+    [arguments]
+    results: dict[str, dict]
+    comparison: list[tuple[str, float, float, bool]] | None
+
+    [return]
+    str
+    '''
+    compared = {name: (ratio, regressed) for name, ratio, _, regressed in comparison or []}
+    lines = [f'{"benchmark":<18}{"rate":>16}  unit']
+    for name, result in results.items():
+        line = f'{name:<18}{result["rate"]:>16,.0f}  {result["unit"]:<8}'
+        if name in compared:
+            ratio, regressed = compared[name]
+            line += f' {ratio:6.2f}x' + ('  REGRESSION' if regressed else '')
+        lines.append(line.rstrip())
+    return '\n'.join(lines)
+#endregion
+
+
+# ---------------
+# Main Function
+# ---------------
+def main(argv: list[str] | None = None) -> int:
+    '''
+    runs the benchmarks from the command line
+
+    [arguments]
+    argv: list[str] | None - The command line arguments (sys.argv if None)
+
+    [return]
+    int - The exit status, 1 if a benchmark regressed against the baseline
+    '''
+    parser = argparse.ArgumentParser(description='Benchmark the chess puzzle move generation.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(SIZES), help='board sizes')
+    parser.add_argument('--min-time', type=float, default=0.2, help='minimum seconds per benchmark')
+    parser.add_argument('--save-baseline', metavar='FILE', help='write the results as a JSON baseline')
+    parser.add_argument('--compare', metavar='FILE', help='compare the results with a JSON baseline')
+    parser.add_argument('--tolerance', type=float, default=0.1, help='allowed slowdown before a regression')
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(tuple(args.sizes), args.min_time)
+    comparison = compare(results, load_baseline(args.compare), args.tolerance) if args.compare else None
+    print(format_report(results, comparison))
+    if args.save_baseline:
+        save_baseline(args.save_baseline, results)
+    return 1 if comparison and any(row[3] for row in comparison) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,228 @@
+'''Chess Puzzle Binary Boards
+
+Compact binary format for board configurations of the chess puzzle
+programming course work, and a container file of many boards with an
+offset index, read through mmap so single boards are decoded on demand.
+
+Board record: one byte for the size, then two little-endian bytes per
+piece holding the square (bits 0-9, (y - 1) * size + (x - 1)), the piece
+type (bit 10, set for a king) and the side (bit 11, set for White).
+
+Container: a 16 byte header (magic, board count as uint32, index offset
+as uint64), the records, then count + 1 uint64 record offsets.
+
+Author : Serika Kawano
+Created: 2026-10-16
+Updated: 2026-10-16
+'''
+
+import mmap
+import struct
+from typing import Iterable, Iterator
+
+from chess_puzzle import Bishop, Board, King, Piece, iter_boards, write_boards
+
+
+# < Format Variables >
+#region
+MAGIC = b'CPB1'
+HEADER = struct.Struct('<4sIQ')
+# Two neighbouring offsets of the index: the start and end of one record
+OFFSETS = struct.Struct('<QQ')
+
+KING_BIT = 1 << 10
+WHITE_BIT = 1 << 11
+SQUARE_MASK = KING_BIT - 1
+#endregion
+
+
+# ---------------
+# Classes
+# ---------------
+# < BoardArchive Class >
+#region
+class BoardArchive:
+    '''
+    BoardArchive class
+
+    Read-only, memory-mapped view of a container file; boards and their
+    offsets are read from the mapping only when indexed
+
+    Created: 2026-10-16
+    Updated: 2026-10-16
+    '''
+
+    def __init__(self, filename: str):
+        '''
+        Constructor
+
+        [arguments]
+        filename: str - The container file to open
+        '''
+        with open(filename, 'rb') as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        # 1. Validate the header
+        if len(self._map) < HEADER.size:
+            self._map.close()
+            raise ValueError(f'{filename} is not a board archive.')
+        magic, self._count, index_offset = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self._map.close()
+            raise ValueError(f'{filename} is not a board archive.')
+
+        # 2. Locate the offset index, which stays in the mapping
+        if index_offset + 8 * (self._count + 1) > len(self._map):
+            self._map.close()
+            raise ValueError(f'{filename} is not a board archive.')
+        self._index_offset = index_offset
+
+    def __enter__(self) -> 'BoardArchive':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, i: int) -> Board:
+        '''
+        decodes the board at position i
+
+        [arguments]
+        i: int
+
+        [return]
+        object: Board
+        '''
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError('board index out of range')
+        start, end = OFFSETS.unpack_from(self._map, self._index_offset + 8 * i)
+        return decode_board(self._map[start:end])
+
+    def __iter__(self) -> Iterator[Board]:
+        for i in range(self._count):
+            yield self[i]
+
+    def close(self) -> None:
+        '''
+        unmaps the file
+        '''
+        self._map.close()
+#endregion
+
+
+# ---------------
+# Static Methods
+# ---------------
+# < Encoding Methods >
+#region
+def encode_board(B: Board) -> bytes:
+    '''
+    encodes board configuration B as a binary record
+
+    [arguments]
+    B: Board
+
+    [return]
+    bytes
+    '''
+    size = B[0]
+    codes = []
+    for piece in B[1]:
+        code = (piece.pos_y - 1) * size + (piece.pos_x - 1)
+        if isinstance(piece, King):
+            code |= KING_BIT
+        if piece.side:
+            code |= WHITE_BIT
+        codes.append(code)
+    return bytes((size,)) + struct.pack(f'<{len(codes)}H', *codes)
+
+
+def decode_board(record: bytes) -> Board:
+    '''
+    decodes a binary record into a board configuration
+
+    [arguments]
+    record: bytes
+
+    [return]
+    object: Board
+    '''
+    size = record[0]
+    count = (len(record) - 1) // 2
+    pieces: list[Piece] = []
+    for code in struct.unpack_from(f'<{count}H', record, 1):
+        y, x = divmod(code & SQUARE_MASK, size)
+        kind = King if code & KING_BIT else Bishop
+        pieces.append(kind(x + 1, y + 1, bool(code & WHITE_BIT)))
+    return Board((size, pieces))
+#endregion
+
+# < Container Methods >
+#region
+def write_archive(filename: str, boards: Iterable[Board]) -> int:
+    '''
+    writes boards into a container file, streaming the records
+
+    [arguments]
+    filename: str
+    boards: Iterable[Board]
+
+    [return]
+    int - The number of boards written
+    '''
+    offsets = []
+    with open(filename, 'wb') as file:
+        # 1. Placeholder header, then the records
+        file.write(HEADER.pack(MAGIC, 0, 0))
+        position = HEADER.size
+        for B in boards:
+            record = encode_board(B)
+            offsets.append(position)
+            file.write(record)
+            position += len(record)
+        offsets.append(position)
+
+        # 2. The offset index, then the real header
+        file.write(struct.pack(f'<{len(offsets)}Q', *offsets))
+        file.seek(0)
+        file.write(HEADER.pack(MAGIC, len(offsets) - 1, position))
+
+    # 3. Return
+    return len(offsets) - 1
+
+
+def plain_to_binary(source: str, target: str) -> int:
+    '''
+    converts a file of boards in plain format (one board, or many separated
+    by blank lines) into a container file
+
+    [arguments]
+    source: str
+    target: str
+
+    [return]
+    int - The number of boards converted
+    '''
+    return write_archive(target, iter_boards(source))
+
+
+def binary_to_plain(source: str, target: str) -> int:
+    '''
+    converts a container file into a file of boards in plain format
+    separated by blank lines (a single board is a valid read_board file)
+
+    [arguments]
+    source: str
+    target: str
+
+    [return]
+    int - The number of boards converted
+    '''
+    with BoardArchive(source) as archive:
+        return write_boards(target, archive)
+#endregion
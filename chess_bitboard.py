@@ -0,0 +1,389 @@
+'''Chess Puzzle Bitboards
+
+Bitboard backend for the chess puzzle programming course work.
+A board of size N is held as Python integers with one bit per square
+(bit (y - 1) * N + (x - 1) for square x, y), so boards up to 26x26 fit
+in a single integer per mask.
+
+Author : Serika Kawano
+Created: 2026-10-16
+Updated: 2026-10-16
+'''
+
+from functools import lru_cache
+
+from chess_puzzle import Board, Bishop, King, as_board
+
+
+# ---------------
+# Classes
+# ---------------
+# < Masks Class >
+#region
+class Masks:
+    '''
+    Masks class
+
+    Constant masks for one board size, shared by all bitboards of that size
+
+    Created: 2026-10-16
+    Updated: 2026-10-16
+    '''
+
+    def __init__(self, size: int):
+        '''
+        Constructor
+
+        [arguments]
+        size: int - The size of the board
+        '''
+        self.size = size
+        self.full = (1 << (size * size)) - 1
+
+        # Files 1 and N, used to stop shifts wrapping around the board edge
+        file_first = 0
+        for y in range(size):
+            file_first |= 1 << (y * size)
+        self.not_first_file = self.full & ~file_first
+        self.not_last_file = self.full & ~(file_first << (size - 1))
+#endregion
+
+# < BitBoard Class >
+#region
+class BitBoard:
+    '''
+    BitBoard class
+
+    Per-side occupancy, king and bishop masks of a Board
+
+    Created: 2026-10-16
+    Updated: 2026-10-16
+    '''
+
+    def __init__(self, size: int, kings: dict[bool, int], bishops: dict[bool, int]):
+        '''
+        Constructor
+
+        [arguments]
+        size: int - The size of the board
+        kings: dict[bool, int] - The king mask of each side (True for White, False for Black)
+        bishops: dict[bool, int] - The bishop mask of each side
+        '''
+        self.size = size
+        self.masks = masks_for(size)
+        self.kings = dict(kings)
+        self.bishops = dict(bishops)
+
+    @classmethod
+    def from_board(cls, B: Board) -> 'BitBoard':
+        '''
+        builds the bitboard of board B
+
+        [arguments]
+        B: Board
+
+        [return]
+        object: BitBoard
+        '''
+        size = B[0]
+        kings = {True: 0, False: 0}
+        bishops = {True: 0, False: 0}
+        for piece in as_board(B).occupancy.values():
+            bit = 1 << square_index(piece.pos_x, piece.pos_y, size)
+            if isinstance(piece, King):
+                kings[piece.side] |= bit
+            elif isinstance(piece, Bishop):
+                bishops[piece.side] |= bit
+            else:
+                raise TypeError('The piece should be King or Bishop objects.')
+        return cls(size, kings, bishops)
+
+    def occupied(self, side: bool) -> int:
+        '''
+        returns the mask of squares occupied by side
+
+        [arguments]
+        side: bool
+
+        [return]
+        int
+        '''
+        return self.kings[side] | self.bishops[side]
+
+    def attacks(self, side: bool) -> int:
+        '''
+        returns the mask of squares attacked by side
+
+        [arguments]
+        side: bool
+
+        [return]
+        int
+        '''
+        empty = self.masks.full & ~(self.occupied(True) | self.occupied(False))
+        return (bishop_attacks(self.bishops[side], empty, self.masks)
+                | king_attacks(self.kings[side], self.masks))
+
+    def is_check(self, side: bool) -> bool:
+        '''
+        checks if configuration is check for side
+
+        [arguments]
+        side: bool
+
+        [return]
+        True or False
+        '''
+        king = self.kings[side]
+        if not king:
+            raise ValueError('King not found')
+        empty = self.masks.full & ~(self.occupied(True) | self.occupied(False))
+        return _is_attacked(king, not side, self.kings, self.bishops, empty, self.masks)
+
+    def has_legal_move(self, side: bool) -> bool:
+        '''
+        checks if side has at least one move which does not leave its king in check
+
+        [arguments]
+        side: bool
+
+        [return]
+        True or False
+        '''
+        masks = self.masks
+        opponent = not side
+        own_king, own_bishops = self.kings[side], self.bishops[side]
+        their_king, their_bishops = self.kings[opponent], self.bishops[opponent]
+        if not own_king:
+            raise ValueError('King not found')
+        own = own_king | own_bishops
+        occupied = own | their_king | their_bishops
+        empty = masks.full & ~occupied
+
+        # 1. King moves: the king itself is removed from the blockers
+        #    so that it cannot hide behind its own square
+        targets = king_attacks(own_king, masks) & ~own
+        while targets:
+            to_bit = targets & -targets
+            targets ^= to_bit
+            kings = {side: to_bit, opponent: their_king & ~to_bit}
+            bishops = {side: own_bishops, opponent: their_bishops & ~to_bit}
+            after_empty = (empty | own_king) & ~to_bit
+            if not _is_attacked(to_bit, opponent, kings, bishops, after_empty, masks):
+                return True
+
+        # 2. Bishop moves, one bishop at a time
+        movers = own_bishops
+        while movers:
+            from_bit = movers & -movers
+            movers ^= from_bit
+            targets = bishop_attacks(from_bit, empty, masks) & ~own
+            while targets:
+                to_bit = targets & -targets
+                targets ^= to_bit
+                kings = {side: own_king, opponent: their_king & ~to_bit}
+                bishops = {side: own_bishops ^ from_bit ^ to_bit, opponent: their_bishops & ~to_bit}
+                after_empty = (empty | from_bit) & ~to_bit
+                if not _is_attacked(own_king, opponent, kings, bishops, after_empty, masks):
+                    return True
+
+        # 3. Return
+        return False
+
+    def is_checkmate(self, side: bool) -> bool:
+        '''
+        checks if configuration is checkmate for side
+
+        [arguments]
+        side: bool
+
+        [return]
+        True or False
+        '''
+        return self.is_check(side) and not self.has_legal_move(side)
+
+    def is_stalemate(self, side: bool) -> bool:
+        '''
+        checks if configuration is stalemate for side
+
+        [arguments]
+        side: bool
+
+        [return]
+        True or False
+        '''
+        return not self.is_check(side) and not self.has_legal_move(side)
+#endregion
+
+
+# ---------------
+# Static Methods
+# ---------------
+# < Mask Methods >
+#region
+@lru_cache(maxsize=None)
+def masks_for(size: int) -> Masks:
+    '''
+    returns the constant masks of the given board size (built once per size)
+
+    [arguments]
+    size: int
+
+    [return]
+    object: Masks
+    '''
+    return Masks(size)
+
+
+def square_index(x: int, y: int, size: int) -> int:
+    '''
+    converts a pair of coordinates to the bit index of the square
+
+    [arguments]
+    x: int
+    y: int
+    size: int
+
+    [return]
+    int
+    '''
+    return (y - 1) * size + (x - 1)
+
+
+def bishop_attacks(bishops: int, empty: int, masks: Masks) -> int:
+    '''
+    returns the squares attacked by the bishops in the mask, sliding each
+    diagonal with shifts until the ray hits an occupied square
+
+    [arguments]
+    bishops: int
+    empty: int
+    masks: Masks
+
+    [return]
+    int
+    '''
+    size, full = masks.size, masks.full
+    attacks = 0
+
+    # 1. Towards higher ranks (left shifts), clipped to the board
+    for shift, edge in ((size + 1, masks.not_first_file), (size - 1, masks.not_last_file)):
+        frontier = bishops
+        while frontier:
+            frontier = (frontier << shift) & edge & full
+            attacks |= frontier
+            frontier &= empty
+
+    # 2. Towards lower ranks (right shifts)
+    for shift, edge in ((size - 1, masks.not_first_file), (size + 1, masks.not_last_file)):
+        frontier = bishops
+        while frontier:
+            frontier = (frontier >> shift) & edge
+            attacks |= frontier
+            frontier &= empty
+
+    # 3. Return
+    return attacks
+
+
+def king_attacks(kings: int, masks: Masks) -> int:
+    '''
+    returns the squares next to the kings in the mask
+
+    [arguments]
+    kings: int
+    masks: Masks
+
+    [return]
+    int
+    '''
+    size = masks.size
+
+    # 1. Spread along the rank, then along the file
+    row = kings | ((kings << 1) & masks.not_first_file) | ((kings >> 1) & masks.not_last_file)
+    around = row | ((row << size) & masks.full) | (row >> size)
+
+    # 2. Return without the kings' own squares
+    return around & ~kings
+#endregion
+
+# < Check Methods >
+#region
+def _is_attacked(target: int, by: bool, kings: dict[bool, int], bishops: dict[bool, int],
+                 empty: int, masks: Masks) -> bool:
+    '''
+    checks if the square in the target mask is attacked by side by,
+    sliding from the target square itself
+
+    [arguments]
+    target: int
+    by: bool
+    kings: dict[bool, int]
+    bishops: dict[bool, int]
+    empty: int
+    masks: Masks
+
+    [return]
+    True or False
+    '''
+    if king_attacks(target, masks) & kings[by]:
+        return True
+    return bool(bishop_attacks(target, empty, masks) & bishops[by])
+
+
+def is_check(side: bool, B: Board) -> bool:
+    '''
+    checks if configuration of B is check for side
+
+    [arguments]
+    side: bool
+    B: Board
+
+    [return]
+    True or False
+    '''
+    return _as_bitboard(B).is_check(side)
+
+
+def is_checkmate(side: bool, B: Board) -> bool:
+    '''
+    checks if configuration of B is checkmate for side
+
+    [arguments]
+    side: bool
+    B: Board
+
+    [return]
+    True or False
+    '''
+    return _as_bitboard(B).is_checkmate(side)
+
+
+def is_stalemate(side: bool, B: Board) -> bool:
+    '''
+    checks if configuration of B is stalemate for side
+
+    [arguments]
+    side: bool
+    B: Board
+
+    [return]
+    True or False
+    '''
+    return _as_bitboard(B).is_stalemate(side)
+
+
+def _as_bitboard(B) -> BitBoard:
+    '''
+    returns B itself if it is already a BitBoard, otherwise its bitboard
+
+    [arguments]
+    B: Board or BitBoard
+
+    [return]
+    object: BitBoard
+    '''
+    if isinstance(B, BitBoard):
+        return B
+    return BitBoard.from_board(B)
+#endregion
@@ -0,0 +1,263 @@
+'''Chess Puzzle Instrumentation
+
+Opt-in call counters, latency histograms and allocation counts for the
+hot paths of the chess puzzle module. enable() replaces the instrumented
+functions and methods with timing wrappers and disable() puts the
+originals back, so nothing is measured (or paid for) while disabled.
+
+Functions are replaced in the module namespace: calls made inside the
+module are counted, but names imported elsewhere with 'from chess_puzzle
+import ...' before enable() keep the original function. Times include
+nested instrumented calls (is_checkmate includes its is_check).
+
+Allocations are the change in sys.getallocatedblocks() over each call,
+so they are net blocks still allocated when the call returns.
+
+Author : Serika Kawano
+Created: 2026-10-16
+Updated: 2026-10-16
+'''
+
+import functools
+import json
+import signal
+import sys
+import time
+from types import ModuleType
+from typing import Callable, TextIO
+
+
+# < Code Variables >
+#region
+FUNCTIONS = ('is_check', 'is_checkmate', 'is_stalemate', 'read_board', 'conf2unicode')
+METHODS = ('can_reach', 'can_move_to', 'move_to')
+CLASSES = ('Bishop', 'King')
+
+# Latency histogram buckets: bucket i counts calls of 2**(i-1) to 2**i - 1 nanoseconds
+BUCKETS = 48
+
+# The signal which dumps the statistics by default (None where the platform has no SIGUSR1)
+DEFAULT_SIGNAL = getattr(signal, 'SIGUSR1', None)
+#endregion
+
+
+# ---------------
+# Classes
+# ---------------
+# < CallStats Class >
+#region
+class CallStats:
+    '''
+    CallStats class
+
+    Number of calls, total and maximum time, log2 latency histogram and
+    net allocated blocks of one instrumented function
+
+    Created: 2026-10-16
+    Updated: 2026-10-16
+    '''
+
+    __slots__ = ('calls', 'total_ns', 'max_ns', 'buckets', 'blocks')
+
+    def __init__(self):
+        '''
+        Constructor
+        '''
+        self.calls = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.buckets = [0] * BUCKETS
+        self.blocks = 0
+
+    def record(self, elapsed_ns: int, blocks: int) -> None:
+        '''
+        records one call
+
+        [arguments]
+        elapsed_ns: int
+        blocks: int - The change in allocated blocks over the call
+        '''
+        self.calls += 1
+        self.total_ns += elapsed_ns
+        if elapsed_ns > self.max_ns:
+            self.max_ns = elapsed_ns
+        self.buckets[min(elapsed_ns.bit_length(), BUCKETS - 1)] += 1
+        self.blocks += blocks
+
+    def as_dict(self) -> dict[str, object]:
+        '''
+        returns the statistics as a JSON-ready dict; the histogram maps the
+        upper bound of each non-empty bucket in nanoseconds to its count
+
+        [return]
+        dict[str, object]
+        '''
+        return {
+            'calls': self.calls,
+            'total_ns': self.total_ns,
+            'mean_ns': self.total_ns / self.calls if self.calls else 0.0,
+            'max_ns': self.max_ns,
+            'blocks': self.blocks,
+            'histogram': {str(1 << i): count for i, count in enumerate(self.buckets) if count},
+        }
+#endregion
+
+
+# < Instrument Variables >
+#region
+# Statistics by name ('is_check', 'King.can_reach', ...), kept across enable and disable
+stats: dict[str, CallStats] = {}
+
+# The replaced originals, as (owner, attribute, original), while enabled
+_originals: list[tuple[object, str, Callable]] = []
+#endregion
+
+
+# ---------------
+# Static Methods
+# ---------------
+# < Switch Methods >
+#region
+def enable(module: ModuleType | None = None) -> None:
+    '''
+    starts instrumenting the functions and methods of module
+    (chess_puzzle if None; pass sys.modules['__main__'] when it runs as a script)
+
+    [arguments]
+    module: ModuleType | None
+    '''
+    if _originals:
+        return
+    if module is None:
+        import chess_puzzle as module
+
+    # 1. Module functions
+    for name in FUNCTIONS:
+        _replace(module, name, name)
+
+    # 2. Piece methods, counted per class
+    for class_name in CLASSES:
+        cls = getattr(module, class_name)
+        for name in METHODS:
+            _replace(cls, name, f'{class_name}.{name}')
+
+
+def disable() -> None:
+    '''
+    stops instrumenting, putting every original back (the statistics are kept)
+    '''
+    while _originals:
+        owner, name, original = _originals.pop()
+        setattr(owner, name, original)
+
+
+def is_enabled() -> bool:
+    '''
+    checks if instrumentation is enabled
+
+    [return]
+    True or False
+    '''
+    return bool(_originals)
+
+
+def reset() -> None:
+    '''
+    clears the statistics
+    '''
+    for entry in stats.values():
+        entry.__init__()
+
+
+def _replace(owner: object, name: str, label: str) -> None:
+    '''
+    replaces owner.name with a wrapper recording into stats[label]
+
+    [arguments]
+    owner: object - A module or a class
+    name: str
+    label: str
+    '''
+    original = owner.__dict__[name]
+    entry = stats.setdefault(label, CallStats())
+    record = entry.record
+    getallocatedblocks = sys.getallocatedblocks
+    perf_counter_ns = time.perf_counter_ns
+
+    @functools.wraps(original)
+    def wrapper(*args, **kwargs):
+        blocks = getallocatedblocks()
+        start = perf_counter_ns()
+        try:
+            return original(*args, **kwargs)
+        finally:
+            record(perf_counter_ns() - start, getallocatedblocks() - blocks)
+
+    _originals.append((owner, name, original))
+    setattr(owner, name, wrapper)
+#endregion
+
+# < Report Methods >
+#region
+def snapshot() -> dict[str, dict[str, object]]:
+    '''
+    returns the statistics of every instrumented function which was called
+
+    [return]
+    dict[str, dict[str, object]]
+    '''
+    return {name: entry.as_dict() for name, entry in sorted(stats.items()) if entry.calls}
+
+
+def report() -> str:
+    '''
+    formats the statistics as a text table, slowest total first, with the
+    histogram as counts per power of two microseconds
+
+    [return]
+    str
+    '''
+    lines = [f'{"function":<20}{"calls":>10}{"total ms":>12}{"mean us":>10}{"max us":>10}{"blocks":>10}']
+    entries = sorted((entry.total_ns, name, entry) for name, entry in stats.items() if entry.calls)
+    for total_ns, name, entry in reversed(entries):
+        lines.append(f'{name:<20}{entry.calls:>10}{total_ns / 1e6:>12.2f}'
+                     f'{total_ns / entry.calls / 1e3:>10.2f}{entry.max_ns / 1e3:>10.2f}{entry.blocks:>10}')
+        histogram = ', '.join(f'<{(1 << i) / 1e3:g}us:{count}' for i, count in enumerate(entry.buckets) if count)
+        lines.append(f'    {histogram}')
+    return '\n'.join(lines)
+
+
+def dump(target: str | TextIO = sys.stderr) -> None:
+    '''
+    writes the statistics to target: a file name ending in .json gets JSON,
+    any other file name or an open file gets the text report
+
+    [arguments]
+    target: str | TextIO
+    '''
+    if not isinstance(target, str):
+        target.write(report() + '\n')
+        return
+    with open(target, 'w') as file:
+        if target.endswith('.json'):
+            json.dump(snapshot(), file, indent=2)
+        else:
+            file.write(report() + '\n')
+
+
+def install_signal_handler(signum: int | None = None, target: str | TextIO = sys.stderr) -> None:
+    '''
+    dumps the statistics to target whenever the process receives signum
+    (DEFAULT_SIGNAL if None), e.g. kill -USR1 PID on a running game
+    raises ValueError if signum is None and the platform has no SIGUSR1
+
+    [arguments]
+    signum: int | None
+    target: str | TextIO
+    '''
+    if signum is None:
+        if DEFAULT_SIGNAL is None:
+            raise ValueError('This platform has no SIGUSR1. Pass the signal to use.')
+        signum = DEFAULT_SIGNAL
+    signal.signal(signum, lambda signum, frame: dump(target))
+#endregion
@@ -7,9 +7,14 @@ Created: 2024-12-05
 Updated: 2024-12-20
 '''
 
-import pdb
+import os
 import random
-from typing import List, NamedTuple, cast
+import re
+import sys
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Callable, Iterable, Iterator, NamedTuple, TextIO
 
 
 # ---------------
@@ -23,10 +28,19 @@ class Piece:
 
     Description
 
+    Pieces keep their attributes in slots rather than an instance dictionary,
+    which keeps them small when many positions are held in memory.
+
+    A Board indexes the position and side of its pieces when it is built, so
+    the setters must not be used on a piece of a Board still in use: they
+    would leave its index stale. Move it with Board.make_move or move_to.
+
     Created: 2024-12-05
-    Updated: 2024-12-14
+    Updated: 2026-10-16
     '''
 
+    __slots__ = ('_pos_x', '_pos_y', '_side')
+
     def __init__(self, pos_x: int, pos_y: int, side: bool):
         '''
         Constructor
@@ -72,9 +86,605 @@ class Piece:
         self._side = value
 #endregion
 
-# < Board Variable >
+# < Board Class >
+#region
+class Board(tuple):
+    '''
+    Board class
+
+    A (size, pieces) tuple which also keeps a square -> piece index, so that
+    is_piece_at and piece_at are dictionary lookups instead of list scans.
+    It can be used wherever a plain (size, pieces) tuple is expected, and
+    plain tuples are still accepted by every function taking a Board.
+
+    Created: 2024-12-05
+    Updated: 2026-10-16
+    '''
+
+    def __new__(cls, board: tuple[int, list[Piece]]):
+        '''
+        Constructor
+
+        [arguments]
+        board: tuple[int, list[Piece]] - The board size and the list of pieces
+        '''
+        self = super().__new__(cls, board)
+
+        # Index the pieces by square (the first piece wins, as with a list scan)
+        occupancy: dict[tuple[int, int], Piece] = {}
+        kings: dict[bool, Piece] = {}
+        size = self[0]
+        for piece in self[1]:
+            if not isinstance(piece, Piece):
+                raise TypeError('Board must contain only Piece objects.')
+            square = (piece._pos_x, piece._pos_y)
+            if not (1 <= square[0] <= size and 1 <= square[1] <= size):
+                raise ValueError(f'The piece at {index2location(*square)} is outside the board.')
+            occupancy.setdefault(square, piece)
+            if isinstance(piece, King):
+                kings.setdefault(piece._side, piece)
+        self.occupancy = occupancy
+        self.kings = kings
+
+        # Zobrist key of the size and pieces, computed on first use (see key)
+        self._key: int | None = None
+
+        # Known check state of each side (None until a move has been applied with apply_board)
+        self.checks: dict[bool, bool] | None = None
+
+        return self
+
+    def make_move(self, piece: Piece, pos_X: int, pos_Y: int) -> 'UndoRecord':
+        '''
+        [specification]
+        moves piece to coordinates pos_X, pos_Y on this board in place,
+        capturing whatever stands there, and returns the record which
+        unmake_move needs to restore the board
+        assumes this move is valid according to chess rules
+
+        [arguments]
+        piece: Piece
+        pos_X: int
+        pos_Y: int
+
+        [return]
+        object: UndoRecord
+        '''
+        occupancy = self.occupancy
+        pieces = self[1]
+        from_square = (piece._pos_x, piece._pos_y)
+        if occupancy.get(from_square) is not piece:
+            raise ValueError(f'The piece at {index2location(*from_square)} is not on this board')
+
+        # 1. Remove the captured piece (swap with the last piece to avoid shifting the list)
+        captured = occupancy.get((pos_X, pos_Y))
+        slot = -1
+        if captured is not None:
+            slot = pieces.index(captured)
+            last = pieces.pop()
+            if slot < len(pieces):
+                pieces[slot] = last
+            if self.kings.get(captured.side) is captured:
+                del self.kings[captured.side]
+
+        # 2. Move the piece
+        del occupancy[from_square]
+        occupancy[(pos_X, pos_Y)] = piece
+        piece._pos_x = pos_X
+        piece._pos_y = pos_Y
+
+        # 3. Update the Zobrist key, if it has been computed
+        key = self._key
+        if key is not None:
+            zobrist = zobrist_keys(self[0]).pieces
+            squares = zobrist[piece.symbol, piece.side]
+            self._key ^= squares[from_square] ^ squares[(pos_X, pos_Y)]
+            if captured is not None:
+                self._key ^= zobrist[captured.symbol, captured.side][(pos_X, pos_Y)]
+
+        # 4. Forget the known check states, which the move may have changed
+        checks = self.checks
+        self.checks = None
+
+        # 5. Return
+        return UndoRecord(piece, from_square[0], from_square[1], captured, slot, checks, key)
+
+    def unmake_move(self, undo: 'UndoRecord') -> None:
+        '''
+        [specification]
+        restores this board to its state before the move recorded in undo
+        assumes the moves made since have already been unmade
+
+        [arguments]
+        undo: UndoRecord
+        '''
+        occupancy = self.occupancy
+        pieces = self[1]
+        piece, from_x, from_y, captured, slot, checks, key = undo
+        to_square = (piece._pos_x, piece._pos_y)
+
+        # 1. Move the piece back
+        piece._pos_x = from_x
+        piece._pos_y = from_y
+        occupancy[(from_x, from_y)] = piece
+
+        # 2. Put the captured piece back into its original slot
+        if captured is None:
+            del occupancy[to_square]
+        else:
+            occupancy[to_square] = captured
+            if slot == len(pieces):
+                pieces.append(captured)
+            else:
+                pieces.append(pieces[slot])
+                pieces[slot] = captured
+            if isinstance(captured, King):
+                self.kings.setdefault(captured.side, captured)
+
+        # 3. Restore the known check states and the Zobrist key
+        self.checks = checks
+        self._key = key
+
+    @property
+    def key(self) -> int:
+        '''
+        the 64-bit Zobrist key of the size and pieces, computed on first use
+        (boards built for a single lookup never need it) and then kept up to
+        date by make_move and unmake_move
+        '''
+        if self._key is None:
+            zobrist = zobrist_keys(self[0])
+            key = zobrist.size
+            for square, piece in self.occupancy.items():
+                key ^= zobrist.pieces[piece.symbol, piece.side][square]
+            self._key = key
+        return self._key
+
+    def position_key(self, side: bool) -> int:
+        '''
+        returns the 64-bit Zobrist key of this board with side to move
+
+        [arguments]
+        side: bool
+
+        [return]
+        int
+        '''
+        if side:
+            return self.key
+        return self.key ^ zobrist_keys(self[0]).black_to_move
+
+
+class UndoRecord(NamedTuple):
+    '''
+    UndoRecord class
+
+    What Board.unmake_move needs to take back one move
+
+    Created: 2026-10-16
+    Updated: 2026-10-16
+    '''
+    piece: Piece
+    from_x: int
+    from_y: int
+    captured: Piece | None
+    captured_slot: int
+    checks: dict[bool, bool] | None
+    key: int | None
+
+
+def as_board(B: tuple[int, list[Piece]]) -> Board:
+    '''
+    returns B itself if it is already a Board, otherwise a Board
+    indexing the same list of pieces
+
+    [arguments]
+    B: tuple[int, list[Piece]]
+
+    [return]
+    object: Board
+    '''
+    if isinstance(B, Board):
+        return B
+    return Board(B)
+#endregion
+
+# < RayTables Class >
+#region
+class RayTables:
+    '''
+    RayTables class
+
+    Lookup tables for one board size: the diagonal rays from every square,
+    the king neighbours of every square and the squares between every pair
+    of squares on a common diagonal. Use ray_tables to get the shared
+    tables of a size instead of building them directly.
+
+    Created: 2026-10-16
+    Updated: 2026-10-16
+    '''
+
+    # Diagonal directions, in the order of the rays of each square
+    DIRECTIONS = ((1, 1), (-1, 1), (1, -1), (-1, -1))
+
+    def __init__(self, size: int):
+        '''
+        Constructor
+
+        [arguments]
+        size: int - The size of the board
+        '''
+        self.size = size
+        self.rays: dict[tuple[int, int], tuple[tuple[tuple[int, int], ...], ...]] = {}
+        self.neighbours: dict[tuple[int, int], tuple[tuple[int, int], ...]] = {}
+        self.between: dict[tuple[tuple[int, int], tuple[int, int]], tuple[tuple[int, int], ...]] = {}
+
+        for x in range(1, size + 1):
+            for y in range(1, size + 1):
+                square = (x, y)
+
+                # 1. Diagonal rays, nearest square first
+                rays = []
+                for step_x, step_y in self.DIRECTIONS:
+                    ray = []
+                    to_x, to_y = x + step_x, y + step_y
+                    while 1 <= to_x <= size and 1 <= to_y <= size:
+                        ray.append((to_x, to_y))
+                        to_x += step_x
+                        to_y += step_y
+                    rays.append(tuple(ray))
+
+                    # 2. Squares between this square and each square of the ray
+                    for i, target in enumerate(ray):
+                        self.between[(square, target)] = tuple(ray[:i])
+                self.rays[square] = tuple(rays)
+
+                # 3. King neighbours
+                self.neighbours[square] = tuple(
+                    (x + dx, y + dy)
+                    for dx in (-1, 0, 1) for dy in (-1, 0, 1)
+                    if (dx or dy) and 1 <= x + dx <= size and 1 <= y + dy <= size)
+#endregion
+
+# < ZobristKeys Class >
+#region
+class ZobristKeys:
+    '''
+    ZobristKeys class
+
+    Random 64-bit keys for one board size: one for the size itself, one per
+    (piece type, side, square) and one for Black to move. The keys are drawn
+    from a generator seeded with the size, so they are the same in every process.
+    Use zobrist_keys to get the shared keys of a size.
+
+    Created: 2026-10-16
+    Updated: 2026-10-16
+    '''
+
+    def __init__(self, size: int):
+        '''
+        Constructor
+
+        [arguments]
+        size: int - The size of the board
+        '''
+        generator = random.Random(size)
+        self.size = generator.getrandbits(64)
+        self.black_to_move = generator.getrandbits(64)
+        self.pieces: dict[tuple[str, bool], dict[tuple[int, int], int]] = {}
+        for symbol in ('K', 'B'):
+            for side in (True, False):
+                self.pieces[symbol, side] = {
+                    (x, y): generator.getrandbits(64)
+                    for x in range(1, size + 1) for y in range(1, size + 1)}
+#endregion
+
+# < ResultCache Class >
+#region
+class ResultCache:
+    '''
+    ResultCache class
+
+    Bounded least-recently-used cache of results (check, checkmate and
+    stalemate verdicts, legal move lists) keyed by position key and kind,
+    with hit and miss statistics
+
+    Created: 2026-10-16
+    Updated: 2026-10-16
+    '''
+
+    # Rough size of one entry besides its value (key tuple, node and links)
+    ENTRY_OVERHEAD = 160
+
+    def __init__(self, max_entries: int = 100000, max_bytes: int | None = None):
+        '''
+        Constructor
+
+        [arguments]
+        max_entries: int - The maximum number of entries (0 disables the cache)
+        max_bytes: int | None - The maximum estimated size of the entries in bytes, if any
+        '''
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[tuple[int, str], tuple[object, int]] = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: int, kind: str) -> object:
+        '''
+        returns the cached result of kind for the position key, or None if not cached
+
+        [arguments]
+        key: int
+        kind: str
+
+        [return]
+        object
+        '''
+        entry = self._entries.get((key, kind))
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end((key, kind))
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key: int, kind: str, value: object) -> None:
+        '''
+        stores the result of kind for the position key, evicting the least
+        recently used entries to stay within the limits
+
+        [arguments]
+        key: int
+        kind: str
+        value: object
+        '''
+        if self.max_entries <= 0:
+            return
+
+        # 1. Replace any previous entry
+        old = self._entries.pop((key, kind), None)
+        if old is not None:
+            self.bytes -= old[1]
+
+        # 2. Add the entry with its estimated size
+        size = self.ENTRY_OVERHEAD + sys.getsizeof(value)
+        if isinstance(value, (list, tuple)):
+            size += sum(sys.getsizeof(item) for item in value)
+        self._entries[(key, kind)] = (value, size)
+        self.bytes += size
+
+        # 3. Evict from the least recently used end
+        while len(self._entries) > self.max_entries or (
+                self.max_bytes is not None and self.bytes > self.max_bytes and self._entries):
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self.bytes -= evicted
+            self.evictions += 1
+
+    def clear(self) -> None:
+        '''
+        removes all entries and resets the statistics
+        '''
+        self._entries.clear()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def stats(self) -> dict[str, int | float]:
+        '''
+        returns the hit and miss statistics of the cache
+
+        [return]
+        dict[str, int | float]
+        '''
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'bytes': self.bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+#endregion
+
+# < BoardWriter Class >
+#region
+class BoardWriter:
+    '''
+    BoardWriter class
+
+    Buffered writer of many board configurations into one file, as plain
+    format records separated by blank lines (read back with iter_boards)
+
+    Created: 2026-10-16
+    Updated: 2026-10-16
+    '''
+
+    def __init__(self, filename: str, buffer_size: int = 1 << 20):
+        '''
+        Constructor
+
+        [arguments]
+        filename: str - The file to write
+        buffer_size: int - The size of the write buffer in bytes
+        '''
+        self._file: TextIO = open(filename, 'w', buffering=buffer_size)
+        self.count = 0
+
+    def __enter__(self) -> 'BoardWriter':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def write(self, B: Board) -> None:
+        '''
+        appends board configuration B
+
+        [arguments]
+        B: Board
+        '''
+        if self.count:
+            self._file.write('\n')
+        self._file.write(board_to_plain(B))
+        self.count += 1
+
+    def write_many(self, boards: Iterable[Board]) -> None:
+        '''
+        appends every board configuration of boards
+
+        [arguments]
+        boards: Iterable[Board]
+        '''
+        for B in boards:
+            self.write(B)
+
+    def close(self) -> None:
+        '''
+        flushes the buffer and closes the file
+        '''
+        self._file.close()
+#endregion
+
+# < PositionInfo Class >
 #region
-Board = tuple[int, list[Piece]]
+class PositionInfo:
+    '''
+    PositionInfo class
+
+    Check and pin analysis of a board for one side, computed once so that
+    the legality of each move (Rule4) is a set-membership test instead of
+    building the board after the move and calling is_check on it.
+    Use analyse_position to build it.
+
+    Created: 2026-10-16
+    Updated: 2026-10-16
+    '''
+
+    def __init__(self, side: bool, B: Board):
+        '''
+        Constructor
+
+        [arguments]
+        side: bool - The side to analyse (True for White, False for Black)
+        B: Board - The board to analyse
+        '''
+        B = as_board(B)
+        tables = ray_tables(B[0])
+        occupancy = B.occupancy
+        self.side = side
+        self.board = B
+        self.king = find_king(side, B)
+        king_square = (self.king.pos_x, self.king.pos_y)
+        self._attacked: set[tuple[int, int]] | None = None
+
+        # 1. Opponent pieces giving check, and own pieces pinned to the king
+        self.checkers: list[Piece] = []
+        self.pinned: dict[Piece, frozenset[tuple[int, int]]] = {}
+        for ray in tables.rays[king_square]:
+            shield = None
+            for i, square in enumerate(ray):
+                piece = occupancy.get(square)
+                if piece is None:
+                    continue
+                if shield is None and piece.side == side:
+                    # The first own piece on the ray may be pinned behind it
+                    shield = piece
+                    continue
+                if piece.side != side and isinstance(piece, Bishop):
+                    if shield is None:
+                        self.checkers.append(piece)
+                    else:
+                        # A pinned piece may only move along the pin ray (up to the pinner)
+                        self.pinned[shield] = frozenset(ray[:i + 1])
+                break
+        for square in tables.neighbours[king_square]:
+            piece = occupancy.get(square)
+            if piece is not None and piece.side != side and isinstance(piece, King):
+                self.checkers.append(piece)
+
+        # 2. Squares on which a non-king move resolves the check (None when not in check)
+        self.block: set[tuple[int, int]] | None = None
+        if len(self.checkers) == 1:
+            checker_square = (self.checkers[0].pos_x, self.checkers[0].pos_y)
+            self.block = {checker_square, *tables.between.get((king_square, checker_square), ())}
+        elif self.checkers:
+            # Only the king can answer a double check
+            self.block = set()
+
+    @property
+    def attacked(self) -> set[tuple[int, int]]:
+        '''
+        The squares attacked by the opponent, seen through the own king
+        so that the king cannot step back along a checking ray
+        (computed on first use, as only king moves need it)
+        '''
+        if self._attacked is None:
+            tables = ray_tables(self.board[0])
+            occupancy = self.board.occupancy
+            attacked = set()
+            for piece in self.board[1]:
+                if piece.side == self.side:
+                    continue
+                square = (piece.pos_x, piece.pos_y)
+                if isinstance(piece, King):
+                    attacked.update(tables.neighbours[square])
+                    continue
+                for ray in tables.rays[square]:
+                    for target in ray:
+                        attacked.add(target)
+                        blocker = occupancy.get(target)
+                        if blocker is not None and blocker is not self.king:
+                            break
+            self._attacked = attacked
+        return self._attacked
+
+    def is_check(self) -> bool:
+        '''
+        checks if the analysed side is in check
+
+        [return]
+        True or False
+        '''
+        return bool(self.checkers)
+
+    def is_legal(self, piece: Piece, pos_X: int, pos_Y: int) -> bool:
+        '''
+        [specification]
+        checks if moving piece to coordinates pos_X, pos_Y keeps the own
+        king out of check (Rule4)
+        assumes the piece belongs to the analysed side and can reach the square
+
+        [arguments]
+        piece: Piece
+        pos_X: int
+        pos_Y: int
+
+        [return]
+        True or False
+        '''
+        square = (pos_X, pos_Y)
+
+        # 1. The king must not step onto an attacked square
+        if piece is self.king:
+            return square not in self.attacked
+
+        # 2. Other pieces must resolve any check and stay on their pin ray
+        if self.block is not None and square not in self.block:
+            return False
+        pin_ray = self.pinned.get(piece)
+        if pin_ray is not None and square not in pin_ray:
+            return False
+
+        # 3. Return
+        return True
 #endregion
 
 # < Bishop Class >
@@ -86,9 +696,14 @@ class Bishop(Piece):
     Description
 
     Created: 2024-12-05
-    Updated: 2024-12-20
+    Updated: 2026-10-16
     '''
 
+    __slots__ = ()
+
+    # Letter of the piece in the plain board format
+    symbol = 'B'
+
     def __init__(self, pos_x: int, pos_y: int, side: bool):
         '''
         Constructor
@@ -117,33 +732,19 @@ class Bishop(Piece):
         True or False
         '''
 
-        dx = abs(pos_X - self.pos_x)
-        dy = abs(pos_Y - self.pos_y)
-
-        # 1. Check if the move is diagonal
-        if dx != dy:
+        # 1. Look up the squares between this bishop and the target
+        #    (missing unless both squares are on the board and on a common diagonal)
+        between = ray_tables(B[0]).between.get(((self.pos_x, self.pos_y), (pos_X, pos_Y)))
+        if between is None:
             return False
 
-        # 2. Check if there are any pieces blocking the path
-        step_x = 1 if pos_X > self.pos_x else -1
-        step_y = 1 if pos_Y > self.pos_y else -1
-        x, y = self.pos_x + step_x, self.pos_y + step_y
-
-        # 3. Check each intermediate position to see if it is blocked
-        while (x != pos_X or y != pos_Y):
-            # Check if the position is blocked
-            if is_piece_at(x, y, B):
+        # 2. Check each intermediate position to see if it is blocked
+        occupancy = as_board(B).occupancy
+        for square in between:
+            if square in occupancy:
                 return False
-            x += step_x
-            y += step_y
-        
-            # Break condition to prevent overshooting
-            if (step_x > 0 and x > pos_X) or (step_x < 0 and x < pos_X):
-                break
-            if (step_y > 0 and y > pos_Y) or (step_y < 0 and y < pos_Y):
-                break
 
-        # 4. Return True if the position is reachable without blockage
+        # 3. Return True if the position is reachable without blockage
         return True
 
 
@@ -174,19 +775,38 @@ class Bishop(Piece):
             return False
 
         # 2. Check if there is a friendly piece at the target position
-        if is_piece_at(pos_X, pos_Y, B):
-            piece = piece_at(pos_X, pos_Y, B)
-            if piece.side == self.side:
-                # Cannot capture a friendly piece
-                return False
-
-        # 3. Check for a check on the king
-        new_board = self.move_to(pos_X, pos_Y, B)
-        if is_check(self.side, new_board):
+        piece = as_board(B).occupancy.get((pos_X, pos_Y))
+        if piece is not None and piece.side == self.side:
+            # Cannot capture a friendly piece
             return False
 
-        # 4. Return
-        return True
+        # 3. Check that the move does not leave the own king in check
+        return analyse_position(self.side, B).is_legal(self, pos_X, pos_Y)
+
+
+    def candidate_moves(self, B: Board):
+        '''
+        [specification]
+        yields the coordinates this bishop can reach on board B without
+        capturing a friendly piece ([Rule1] and [Rule3]), walking each
+        diagonal ray until the first piece; Rule4 is not checked
+
+        [arguments]
+        B: Board
+
+        [return]
+        generator of tuple[int, int]
+        '''
+        occupancy = as_board(B).occupancy
+        for ray in ray_tables(B[0]).rays[(self.pos_x, self.pos_y)]:
+            for square in ray:
+                piece = occupancy.get(square)
+                if piece is None:
+                    yield square
+                    continue
+                if piece.side != self.side:
+                    yield square
+                break
 
 
     def move_to(self, pos_X : int, pos_Y : int, B: Board) -> Board:
@@ -201,31 +821,17 @@ class Bishop(Piece):
         B: Board
 
         [return]
-        True or False
+        object: Board
         '''
 
-        # 1. Remove the piece from its original position
-        new_pieces = [p for p in B[1] if p != self]
-    
-        # 2. Check if there is an opponent piece at the target position
-        captured_piece = None
-        for piece in B[1]:
-            if piece.pos_x == pos_X and piece.pos_y == pos_Y and piece.side != self.side:
-                captured_piece = piece
-                break
-
-        # 3. If there is a captured piece, remove it from the board
-        if captured_piece:
-            new_pieces = [p for p in new_pieces if p != captured_piece]
+        # 1. Copy the board, replacing this piece with a copy so that B is left untouched
+        new_piece = Bishop(self.pos_x, self.pos_y, self.side)
+        new_board = Board((B[0], [new_piece if p is self else p for p in B[1]]))
 
-        # 4. Add the bishop to the new position
-        new_piece = Bishop(pos_X, pos_Y, self.side)
-        new_pieces.append(new_piece)
-    
-        # 5. Return the updated board
-        new_board = Board((B[0], new_pieces))
+        # 2. Apply the move to the copy
+        new_board.make_move(new_piece, pos_X, pos_Y)
 
-        # 6. Return the updated board
+        # 3. Return the updated board
         return new_board
 #endregion
 
@@ -238,8 +844,14 @@ class King(Piece):
     Description
 
     Created: 2024-12-05
-    Updated: 2024-12-14
+    Updated: 2026-10-16
     '''
+
+    __slots__ = ()
+
+    # Letter of the piece in the plain board format
+    symbol = 'K'
+
     def __init__(self, pos_x: int, pos_y: int, side: bool):
         '''
         Constructor
@@ -266,18 +878,14 @@ class King(Piece):
         True or False
         '''
 
-        dx = abs(pos_X - self.pos_x)
-        dy = abs(pos_Y - self.pos_y)
-
         # 1. Check if the king moves within 1 square
-        if dx > 1 or dy > 1:
+        if (pos_X, pos_Y) not in ray_tables(B[0]).neighbours.get((self.pos_x, self.pos_y), ()):
             return False
 
         # 2. Check if there's a friendly piece at the target position
-        if is_piece_at(pos_X, pos_Y, B):
-            piece = piece_at(pos_X, pos_Y, B)
-            if piece.side == self.side:
-                return False
+        piece = as_board(B).occupancy.get((pos_X, pos_Y))
+        if piece is not None and piece.side == self.side:
+            return False
 
         # 3. Return True if all checks pass
         return True
@@ -303,20 +911,31 @@ class King(Piece):
             return False
 
         # 2. Check if there is a friendly piece at the target position
-        if is_piece_at(pos_X, pos_Y, B):
-            piece = piece_at(pos_X, pos_Y, B)
-            if piece.side == self.side:
-                return False
+        piece = as_board(B).occupancy.get((pos_X, pos_Y))
+        if piece is not None and piece.side == self.side:
+            return False
 
-        # 3. Construct the new board after moving the king
-        new_board = self.move_to(pos_X, pos_Y, B)
+        # 3. Check that the move does not leave the king in check
+        return analyse_position(self.side, B).is_legal(self, pos_X, pos_Y)
 
-        # 4. Check if the move results in a check on the king
-        if is_check(self.side, new_board):
-            return False
 
-        # 5. Return True if all checks pass
-        return True
+    def candidate_moves(self, B: Board):
+        '''
+        [specification]
+        yields the coordinates this king can reach on board B without
+        capturing a friendly piece ([Rule2] and [Rule3]); Rule4 is not checked
+
+        [arguments]
+        B: Board
+
+        [return]
+        generator of tuple[int, int]
+        '''
+        occupancy = as_board(B).occupancy
+        for square in ray_tables(B[0]).neighbours[(self.pos_x, self.pos_y)]:
+            piece = occupancy.get(square)
+            if piece is None or piece.side != self.side:
+                yield square
 
 
     def move_to(self, pos_X : int, pos_Y : int, B: Board) -> Board:
@@ -333,85 +952,290 @@ class King(Piece):
         [return]
         object: Board
         '''
-        # 1. Remove the original piece after the move
-        new_pieces = [p for p in B[1] if p != self]
-
-        # 2. Check if there is an opponent piece at the target position
-        captured_piece = None
-        for piece in B[1]:
-            if piece.pos_x == pos_X and piece.pos_y == pos_Y and piece.side != self.side:
-                captured_piece = piece
-                break
-
-        # 3. If there is a captured piece, remove it from the board
-        if captured_piece:
-            new_pieces = [p for p in new_pieces if p != captured_piece]
-
-        # 4. Create a new King piece at the new position
-        new_piece = King(pos_X, pos_Y, self.side)
-
-        # 5. Add the new King to the board
-        new_pieces.append(new_piece)
-
-        # 6. Return the updated board
-        new_board = Board((B[0], new_pieces))
+        # 1. Copy the board, replacing this piece with a copy so that B is left untouched
+        new_piece = King(self.pos_x, self.pos_y, self.side)
+        new_board = Board((B[0], [new_piece if p is self else p for p in B[1]]))
 
-        # 7. Check for check (reject the move if it results in check)
-        if is_check(self.side, new_board):
-            # If moving results in a check, return the original board
-            return B
+        # 2. Apply the move to the copy
+        new_board.make_move(new_piece, pos_X, pos_Y)
 
-        # 8. Return the updated board
+        # 3. Return the updated board
         return new_board
 #endregion
 
-
-# ---------------
-# Static Methods
-# ---------------
-# < Board Methods >
+# < Engine Class >
 #region
-def read_board(filename: str) -> Board:
+class SearchTimeout(Exception):
+    '''
+    Raised inside an Engine search when its deadline has passed
     '''
-    reads board configuration from file in current directory in plain format
-    raises IOError exception if file is not valid (see section Plain board configurations)
 
-    [arguments]
-    filename: str
 
-    [return]
-    object: Board
+class Engine:
     '''
-    try:
-        # 1. Read the board file
-        with open(filename, 'r') as file:
+    Engine class
+
+    Computer opponent: iterative deepening alpha-beta search, limited by a
+    maximum depth and a time budget per move, on an evaluation of material,
+    mobility and king safety. The move of the deepest completed search is
+    played, so a move is always ready when the deadline passes. Positions
+    covered by the registered tablebases are played from them without a search.
+
+    Created: 2026-10-16
+    Updated: 2026-10-16
+    '''
+
+    # Evaluation weights, in hundredths of a bishop
+    BISHOP_VALUE = 300
+    MOBILITY = 4
+    KING_DANGER = 12
+    MATE = 1000000
+
+    def __init__(self, max_depth: int = 3, time_limit: float | None = 1.0,
+                 clock: Callable[[], float] = time.perf_counter):
+        '''
+        Constructor
+
+        [arguments]
+        max_depth: int - The deepest search, in plies
+        time_limit: float | None - The seconds allowed per move (no limit if None)
+        clock: Callable[[], float] - The time in seconds, read once per search node
+        '''
+        self.max_depth = max_depth
+        self.time_limit = time_limit
+        self.clock = clock
+        self.nodes = 0
+        self.depth = 0
+        self._deadline = float('inf')
+
+    def choose_move(self, B: Board, side: bool = False) -> tuple[Piece, int, int] | None:
+        '''
+        [specification]
+        returns (P, x, y) where P is the piece of side on B chosen to move to
+        coordinates x, y, or None if side has no valid move
+        returns within the time limit (plus the cost of one search node)
+
+        [arguments]
+        B: Board
+        side: bool
+
+        [return]
+        tuple[Piece, int, int] or None
+        '''
+        B = as_board(B)
+        start = self.clock()
+        self._deadline = start + self.time_limit if self.time_limit is not None else float('inf')
+        self.nodes = 0
+        self.depth = 0
+
+        # 1. Play the best move if a tablebase covers the position
+        if tablebases and probe_tablebases(B, side) is not None:
+            move = tablebase_move(side, B)
+            if move is not None:
+                return move
+
+        # 2. Search on a private copy, so the pieces of B are never moved
+        board = copy_board(B)
+        moves = [(piece.pos_x, piece.pos_y, x, y) for piece, x, y in legal_moves(side, board)]
+        if not moves:
+            return None
+        best = moves[0]
+
+        # 3. Deepen one ply at a time, searching the previous best move first
+        if len(moves) > 1:
+            for depth in range(1, self.max_depth + 1):
+                try:
+                    move, score = self._search_root(board, side, depth, moves)
+                except SearchTimeout as timeout:
+                    # A move which beat the previous best in the unfinished search is better still
+                    if timeout.args and timeout.args[0] is not None:
+                        best = timeout.args[0]
+                    break
+                best = move
+                self.depth = depth
+                moves.remove(move)
+                moves.insert(0, move)
+                if abs(score) >= self.MATE - self.max_depth:
+                    break
+
+        # 4. Return the move with the piece of B
+        from_x, from_y, to_x, to_y = best
+        return B.occupancy[(from_x, from_y)], to_x, to_y
+
+    def evaluate(self, B: Board, side: bool) -> int:
+        '''
+        [specification]
+        scores B from the point of view of side: material, plus the squares
+        each side's pieces attack or can move to, minus the squares next to
+        each king attacked by the opponent
+
+        [arguments]
+        B: Board
+        side: bool
+
+        [return]
+        int
+        '''
+        tables = ray_tables(B[0])
+        occupancy = B.occupancy
+        material = {True: 0, False: 0}
+        mobility = {True: 0, False: 0}
+        attacked: dict[bool, set[tuple[int, int]]] = {True: set(), False: set()}
+
+        # 1. Material, mobility and attacked squares of every piece
+        for piece in B[1]:
+            square = (piece.pos_x, piece.pos_y)
+            if isinstance(piece, King):
+                targets = tables.neighbours[square]
+            else:
+                material[piece.side] += self.BISHOP_VALUE
+                targets = []
+                for ray in tables.rays[square]:
+                    for target in ray:
+                        targets.append(target)
+                        if target in occupancy:
+                            break
+            attacked[piece.side].update(targets)
+            for target in targets:
+                blocker = occupancy.get(target)
+                if blocker is None or blocker.side != piece.side:
+                    mobility[piece.side] += 1
+
+        # 2. King safety: attacked squares around each king
+        def score(s: bool) -> int:
+            king = B.kings[s]
+            danger = sum(1 for square in tables.neighbours[(king.pos_x, king.pos_y)] if square in attacked[not s])
+            return material[s] + self.MOBILITY * mobility[s] - self.KING_DANGER * danger
+
+        # 3. Return
+        return score(side) - score(not side)
+
+    def _search_root(self, B: Board, side: bool, depth: int, moves: list[tuple[int, int, int, int]]
+                     ) -> tuple[tuple[int, int, int, int], int]:
+        '''
+        searches every move of side to depth plies and returns the best with its score
+        on timeout, SearchTimeout carries the best move found so far if it beat the first
+
+        [arguments]
+        B: Board
+        side: bool
+        depth: int
+        moves: list[tuple[int, int, int, int]] - The moves as (from_x, from_y, to_x, to_y)
+
+        [return]
+        tuple[tuple[int, int, int, int], int]
+        '''
+        best, alpha = None, -self.MATE - 1
+        for move in moves:
+            from_x, from_y, to_x, to_y = move
+            undo = B.make_move(B.occupancy[(from_x, from_y)], to_x, to_y)
+            try:
+                score = -self._search(B, not side, depth - 1, -self.MATE - 1, -alpha, 1)
+            except SearchTimeout:
+                raise SearchTimeout(best if best is not moves[0] else None)
+            B.unmake_move(undo)
+            if score > alpha:
+                best, alpha = move, score
+        return best, alpha
+
+    def _search(self, B: Board, side: bool, depth: int, alpha: int, beta: int, ply: int) -> int:
+        '''
+        returns the alpha-beta score of B for side to move, searched depth plies further
+
+        [arguments]
+        B: Board
+        side: bool
+        depth: int
+        alpha: int
+        beta: int
+        ply: int - The distance from the root, so that nearer mates score higher
+
+        [return]
+        int
+        '''
+        self.nodes += 1
+        if self.clock() > self._deadline:
+            raise SearchTimeout()
+
+        # 1. Mate and stalemate end the line, whatever the depth
+        info = analyse_position(side, B)
+        moves = [move for piece in [p for p in B[1] if p.side == side]
+                 for move in piece_legal_moves(piece, B, info)]
+        if not moves:
+            return -self.MATE + ply if info.is_check() else 0
+        if depth <= 0:
+            return self.evaluate(B, side)
+
+        # 2. Captures first, then the rest
+        occupancy = B.occupancy
+        moves.sort(key=lambda move: (move[1], move[2]) not in occupancy)
+        for piece, x, y in moves:
+            undo = B.make_move(piece, x, y)
+            score = -self._search(B, not side, depth - 1, -beta, -alpha, ply + 1)
+            B.unmake_move(undo)
+            if score >= beta:
+                return score
+            alpha = max(alpha, score)
+
+        # 3. Return
+        return alpha
+#endregion
+
+
+# < Cache Variable >
+#region
+# Number of rotations and reflections of a square board (see transform_square)
+SYMMETRIES = 8
+
+# Shared cache of check, checkmate and stalemate verdicts and legal move lists
+result_cache = ResultCache()
+
+# Endgame tablebases probed by find_black_move and solve_mate (see chess_tablebase)
+tablebases: list = []
+#endregion
+
+# < Unicode Variables >
+#region
+# Unicode characters for chess pieces, by symbol and side
+UNICODE_PIECES = {
+    ('K', True): '\u2654',  # ♔
+    ('B', True): '\u2657',  # ♗
+    ('K', False): '\u265A',  # ♚
+    ('B', False): '\u265D',  # ♝
+}
+EMPTY_SQUARE = '\u2001'  # (matching width space)
+#endregion
+
+# < Move Variables >
+#region
+# A move written as two locations (e.g. 'b5d3' or 'a10b11')
+MOVE_PATTERN = re.compile(r'([a-z]\d+)([a-z]\d+)')
+#endregion
+
+
+# ---------------
+# Static Methods
+# ---------------
+# < Board Methods >
+#region
+def read_board(filename: str) -> Board:
+    '''
+    reads board configuration from file in current directory in plain format
+    raises IOError exception if file is not valid (see section Plain board configurations)
+
+    [arguments]
+    filename: str
+
+    [return]
+    object: Board
+    '''
+    try:
+        # 1. Read the board file
+        with open(filename, 'r') as file:
             lines = file.readlines()
-        if not lines:
-            raise ValueError('The file is empty.') 
-        
-        # 2. Validate the board size
-        board_size = int(lines[0].strip())
-        if not (3 <= board_size <= 26):
-            raise ValueError(f'The board size must be between 3 and 26. It is {board_size}.')
-        
-        # 3. Read white pieces from the 2nd line
-        white_pieces = parse_pieces(lines[1] if len(lines) > 1 else '', True)
-        
-        # 4. Read black pieces from the 3rd line
-        black_pieces = parse_pieces(lines[2] if len(lines) > 2 else '', False)
-        
-        # 5. Check the number of kings for each side
-        if len([p for p in white_pieces if isinstance(p, King)]) != 1:
-            raise ValueError('There must be exactly one white king.')
-        if len([p for p in black_pieces if isinstance(p, King)]) != 1:
-            raise ValueError('There must be exactly one black king.')
-
-        # 6. Combine white and black pieces
-        pieces = white_pieces + black_pieces
-        
-        # 7. Return
-        board = Board((board_size, pieces))
-        return board
+
+        # 2. Parse the lines
+        return parse_board_lines(lines)
     
     except IOError:
         raise IOError(f'The file {filename} could not be opened or is invalid.')
@@ -419,326 +1243,1115 @@ def read_board(filename: str) -> Board:
         raise ValueError(f'Invalid file content: {ex}')
 
 
+def iter_boards(filename: str) -> Iterator[Board]:
+    '''
+    reads many board configurations from file in current directory, one at a time
+    each record is in plain format and records are separated by blank lines
+    raises IOError exception if file is not valid
+
+    [arguments]
+    filename: str
+
+    [return]
+    generator of Board
+    '''
+    try:
+        with open(filename, 'r') as file:
+            # 1. Collect the lines of each record up to the next blank line
+            lines: list[str] = []
+            record = 0
+            for line in file:
+                if line.strip():
+                    lines.append(line)
+                    continue
+                if lines:
+                    record += 1
+                    yield parse_board_lines(lines)
+                    lines = []
+
+            # 2. The last record may not be followed by a blank line
+            if lines:
+                record += 1
+                yield parse_board_lines(lines)
+
+    except IOError:
+        raise IOError(f'The file {filename} could not be opened or is invalid.')
+    except ValueError as ex:
+        raise ValueError(f'Invalid file content in record {record}: {ex}')
+
+
+def write_boards(filename: str, boards: Iterable[Board]) -> int:
+    '''
+    saves many board configurations into file in current directory,
+    in the format read by iter_boards
+
+    [arguments]
+    filename: str
+    boards: Iterable[Board]
+
+    [return]
+    int - The number of boards saved
+    '''
+    with BoardWriter(filename) as writer:
+        writer.write_many(boards)
+    return writer.count
+
+
 def conf2unicode(B: Board) -> str:
     '''
     Converts board configuration B to a unicode format string 
     (see section Unicode board configurations).
+    The grid is filled in one pass over the pieces, top row first.
+
+    [arguments]
+    B: Board
+
+    [return]
+    str
+    '''
+    size = B[0]
+
+    # 1. An empty grid, rows from y = size down to y = 1
+    grid = [[EMPTY_SQUARE] * size for _ in range(size)]
+
+    # 2. Place each piece
+    for piece in B[1]:
+        grid[size - piece.pos_y][piece.pos_x - 1] = UNICODE_PIECES[piece.symbol, piece.side]
+
+    # 3. Return the rows joined by newlines (no trailing newline)
+    return '\n'.join(''.join(row) for row in grid)
+
+
+def conf2unicode_diff(previous: str, B: Board, move: tuple[int, int, int, int]
+                      ) -> tuple[str, list[tuple[int, int, str]]]:
+    '''
+    [specification]
+    updates previous, the unicode string of the board before move, to the
+    board B after it, looking only at the two squares of the move
+    returns the new string and the cells which changed as (x, y, character),
+    so a front-end can redraw just those cells (or their rows)
+
+    [arguments]
+    previous: str
+    B: Board
+    move: tuple[int, int, int, int] - from_x, from_y, to_x, to_y
+
+    [return]
+    tuple[str, list[tuple[int, int, str]]]
+    '''
+    size = B[0]
+    occupancy = as_board(B).occupancy
+    from_x, from_y, to_x, to_y = move
+
+    # 1. The new character of each square of the move, where it differs
+    changes = []
+    for x, y in ((from_x, from_y), (to_x, to_y)):
+        piece = occupancy.get((x, y))
+        char = EMPTY_SQUARE if piece is None else UNICODE_PIECES[piece.symbol, piece.side]
+        if previous[(size - y) * (size + 1) + x - 1] != char:
+            changes.append((x, y, char))
+
+    # 2. Patch the string (each row is size characters and a newline)
+    if not changes:
+        return previous, changes
+    chars = list(previous)
+    for x, y, char in changes:
+        chars[(size - y) * (size + 1) + x - 1] = char
+
+    # 3. Return
+    return ''.join(chars), changes
+
+
+def save_board(filename: str, B: Board) -> None:
+    '''
+    saves board configuration into file in current directory in plain format
+    
+    [arguments]
+    filename: str
+    B: Board
+    '''
+    with open(filename, 'w') as file:
+        file.write(board_to_plain(B))
+
+
+def location2index(loc: str) -> tuple[int, int]:
+    '''
+    converts chess location to corresponding x and y coordinates
+    
+    [arguments]
+    loc: str
+
+    [return]
+    index: tuple[int, int]
+    '''
+    x = ord(loc[0]) - ord('a') + 1
+    #y = int(loc[1])
+    y = int(loc[1:])
+
+    return (x, y)
+
+	
+def index2location(x: int, y: int) -> str:
+    '''
+    converts  pair of coordinates to corresponding location
+    
+    [arguments]
+    x: int
+    y: int
+
+    [return]
+    location: str
+    '''
+    col = chr(x + ord('a') - 1)
+    row = str(y)
+
+
+    return col + row
+
+
+def move2index(move: str) -> tuple[int, int, int, int]:
+    '''
+    converts a move written as two locations (e.g. 'b5d3') to coordinates
+    raises ValueError if move is not two locations
+
+    [arguments]
+    move: str
+
+    [return]
+    tuple[int, int, int, int] - from_x, from_y, to_x, to_y
+    '''
+    match = MOVE_PATTERN.fullmatch(move.strip())
+    if match is None:
+        raise ValueError(f'Invalid move: {move}')
+    return location2index(match.group(1)) + location2index(match.group(2))
+
+
+def index2move(from_x: int, from_y: int, to_x: int, to_y: int) -> str:
+    '''
+    converts the coordinates of a move to two locations (e.g. 'b5d3')
+
+    [arguments]
+    from_x: int
+    from_y: int
+    to_x: int
+    to_y: int
+
+    [return]
+    move: str
+    '''
+    return index2location(from_x, from_y) + index2location(to_x, to_y)
+#endregion
+
+# < Check Methods >
+#region
+def is_piece_at(pos_X : int, pos_Y : int, B: Board) -> bool:
+    '''
+    checks if there is piece at coordinates pox_X, pos_Y of board B
+    
+    [arguments]
+    pos_X: int
+    pos_Y: int
+    B: Board
+
+    [return]
+    True or False
+    ''' 
+    # 1. Look the square up in the board's occupancy index
+    if isinstance(B, Board):
+        return (pos_X, pos_Y) in B.occupancy
+
+    # 2. Scan a plain tuple, which has no index (building one costs more than the scan)
+    for piece in B[1]:
+        if piece.pos_x == pos_X and piece.pos_y == pos_Y:
+            return True
+    return False
+	
+
+def piece_at(pos_X : int, pos_Y : int, B: Board) -> Piece:
+    '''
+    returns the piece at coordinates pox_X, pos_Y of board B 
+    assumes some piece at coordinates pox_X, pos_Y of board B is present
+
+    [arguments]
+    pos_X: int
+    pos_Y: int
+    B: Board
+
+    [return]
+    object: Piece
+    '''
+
+    # 1. Look the square up in the board's occupancy index, or scan a plain tuple
+    if isinstance(B, Board):
+        piece = B.occupancy.get((pos_X, pos_Y))
+    else:
+        piece = next((p for p in B[1] if p.pos_x == pos_X and p.pos_y == pos_Y), None)
+
+    # 2. Raise an error if no piece is found at the specified position
+    if piece is None:
+        raise ValueError(f'Cannot find a piece at {index2location(pos_X, pos_Y)}')
+
+    # 3. Return
+    return piece
+
+
+def is_check(side: bool, B: Board) -> bool:
+    '''
+    checks if configuration of B is check for side
+    Hint: use find_checkers
+
+    [arguments]
+    side: bool
+    B: Board
+
+    [return]
+    True or False
+    '''
+
+    # 1. Plain tuples skip the caches: their Board lives for this call only
+    #    and its Zobrist key would cost more than the answer
+    if not isinstance(B, Board):
+        B = Board(B)
+        return bool(find_checkers(find_king(side, B), B))
+
+    # 2. Use the check state kept by apply_board, if known
+    if B.checks is not None and side in B.checks:
+        return B.checks[side]
+
+    # 3. Use the cached verdict, if any
+    key = B.position_key(side)
+    verdict = result_cache.get(key, 'check')
+    if verdict is not None:
+        return verdict
+
+    # 4. Check if any opponent piece can reach the king's position,
+    #    looking outwards from the king along its diagonals and neighbours
+    verdict = bool(find_checkers(find_king(side, B), B))
+    result_cache.put(key, 'check', verdict)
+    return verdict
+
+
+def is_checkmate(side: bool, B: Board) -> bool:
+    '''
+    [specification]
+    checks if configuration of B is checkmate for side
+
+    Hints: 
+    - use is_check
+    - use legal_moves
+
+    [arguments]
+    side: bool
+    B: Board
+
+    [return]
+    True or False
+    
+    '''
+    # 1. Use the cached verdict, if any
+    B = as_board(B)
+    key = B.position_key(side)
+    verdict = result_cache.get(key, 'checkmate')
+    if verdict is not None:
+        return verdict
+
+    # 2. Checkmate if the side is in check and no piece has a legal move
+    verdict = is_check(side, B) and not has_legal_move(side, B)
+    result_cache.put(key, 'checkmate', verdict)
+    return verdict
+
+
+def is_stalemate(side: bool, B: Board) -> bool:
+    '''
+    checks if configuration of B is stalemate for side
+
+    Hints: 
+    - use is_check
+    - use legal_moves
+    
+    [arguments]
+    side: bool
+    B: board
+
+    [return]
+    True or False
+    '''
+    # 1. Use the cached verdict, if any
+    B = as_board(B)
+    key = B.position_key(side)
+    verdict = result_cache.get(key, 'stalemate')
+    if verdict is not None:
+        return verdict
+
+    # 2. Stalemate if the side is not in check and no piece has a legal move
+    verdict = not is_check(side, B) and not has_legal_move(side, B)
+    result_cache.put(key, 'stalemate', verdict)
+    return verdict
+
+
+#endregion
+
+# < Playing Methods >
+#region
+def find_black_move(B: Board) -> tuple[Piece, int, int]:
+    '''
+    returns (P, x, y) where a Black piece P can move on B to coordinates x,y according to chess rules 
+    assumes there is at least one black piece that can move somewhere
+
+    Hints: 
+    - use methods of random library
+    - use piece_legal_moves
+
+    [arguments]
+    B: Board
+
+    [return]
+    tuple[Piece, int, int]
+    '''
+    # 1. Play the best move if a tablebase covers the position
+    B = as_board(B)
+    if tablebases and probe_tablebases(B, False) is not None:
+        move = tablebase_move(False, B)
+        if move is not None:
+            return move
+
+    # 2. Otherwise draw one of all the valid moves of Black, each equally likely
+    move = sample_legal_move(False, B)
+    if move is not None:
+        return move
+
+    # 3. If no valid move is found, raise an exception
+    raise ValueError('No valid moves found for black pieces')
+#endregion
+
+
+# ---------------
+# Static Methods (Added)
+# ---------------
+# < Check Methods >
+#region
+def is_valid(piece: Piece, from_x: int, from_y: int, to_x: int, to_y: int, board: Board) -> bool:
+    '''
+    Check if the specified piece can make a valid move
+
+    [arguments]
+    piece: Piece
+    from_x: int
+    from_y: int
+    to_x: int
+    to_y: int
+    board: Board
+
+    [return]
+    True or False
+    '''
+    # (Use type-assertion to enable IntelliSense in Visual Studio)
+    if not isinstance(piece, (King, Bishop)):
+        raise TypeError('The piece should be King or Bishop objects.')
+
+    # Check if the piece can move to the position
+    return piece.can_move_to(to_x, to_y, board)
+#endregion
+
+# < Table Methods >
+#region
+@lru_cache(maxsize=None)
+def ray_tables(size: int) -> RayTables:
+    '''
+    returns the lookup tables of the given board size,
+    built on first use and shared by all boards of that size
+
+    [arguments]
+    size: int
+
+    [return]
+    object: RayTables
+    '''
+    return RayTables(size)
+
+
+@lru_cache(maxsize=None)
+def zobrist_keys(size: int) -> ZobristKeys:
+    '''
+    returns the Zobrist keys of the given board size,
+    built on first use and shared by all boards of that size
+
+    [arguments]
+    size: int
+
+    [return]
+    object: ZobristKeys
+    '''
+    return ZobristKeys(size)
+#endregion
+
+# < Symmetry Methods >
+#region
+def transform_square(x: int, y: int, size: int, transform: int) -> tuple[int, int]:
+    '''
+    [specification]
+    returns the coordinates of square x, y under one of the 8 symmetries of
+    a board of size: 0 identity, 1-3 rotations by 90, 180 and 270 degrees,
+    4 and 5 reflections in the vertical and horizontal centre lines,
+    6 and 7 reflections in the two long diagonals
+    bishops and kings move the same way on the transformed board, so every
+    position is equivalent to its 8 transforms
+
+    [arguments]
+    x: int
+    y: int
+    size: int
+    transform: int
+
+    [return]
+    tuple[int, int]
+    '''
+    flip_x, flip_y = size + 1 - x, size + 1 - y
+    if transform == 0:
+        return (x, y)
+    if transform == 1:
+        return (y, flip_x)
+    if transform == 2:
+        return (flip_x, flip_y)
+    if transform == 3:
+        return (flip_y, x)
+    if transform == 4:
+        return (flip_x, y)
+    if transform == 5:
+        return (x, flip_y)
+    if transform == 6:
+        return (y, x)
+    if transform == 7:
+        return (flip_y, flip_x)
+    raise ValueError(f'Invalid transform: {transform}')
+
+
+def inverse_transform(transform: int) -> int:
+    '''
+    returns the transform which undoes transform (only the quarter turns differ)
+
+    [arguments]
+    transform: int
+
+    [return]
+    int
+    '''
+    return {1: 3, 3: 1}.get(transform, transform)
+
+
+def transform_board(B: Board, transform: int) -> Board:
+    '''
+    returns the board B under transform, with new pieces
+
+    [arguments]
+    B: Board
+    transform: int
+
+    [return]
+    object: Board
+    '''
+    size = B[0]
+    return Board((size, [type(p)(*transform_square(p.pos_x, p.pos_y, size, transform), p.side) for p in B[1]]))
+
+
+def canonical_board(B: Board) -> tuple[Board, int]:
+    '''
+    [specification]
+    returns (C, transform) where C is the canonical form of B, the same board
+    for all 8 rotations and reflections of B, and C is B under transform
+    the pieces of C are sorted, so board_to_plain(C) identifies the position exactly
+
+    [arguments]
+    B: Board
+
+    [return]
+    tuple[Board, int]
+    '''
+    size = B[0]
+    best, best_transform = None, 0
+    for transform in range(SYMMETRIES):
+        pieces = sorted(
+            (p.symbol, not p.side, transform_square(p.pos_x, p.pos_y, size, transform))
+            for p in B[1])
+        if best is None or pieces < best:
+            best, best_transform = pieces, transform
+    canonical = [(King if symbol == 'K' else Bishop)(x, y, not black) for symbol, black, (x, y) in best]
+    return Board((size, canonical)), best_transform
+#endregion
+
+# < Move Generation Methods >
+#region
+def legal_moves(side: bool, B: Board):
+    '''
+    [specification]
+    yields (P, x, y) for every move of a piece P of side to coordinates x, y
+    which is valid on B according to all chess rules
+    only the squares along each piece's rays or neighbours are tried,
+    so the cost follows the mobility of the pieces rather than the board area
+    B must not be changed while the generator is running
+
+    [arguments]
+    side: bool
+    B: Board
+
+    [return]
+    generator of tuple[Piece, int, int]
+    '''
+    info = analyse_position(side, B)
+    for piece in [p for p in info.board[1] if p.side == side]:
+        yield from piece_legal_moves(piece, B, info)
+
+
+def legal_move_list(side: bool, B: Board) -> list[tuple[int, int, int, int]]:
+    '''
+    [specification]
+    returns every valid move of side on B as (from_x, from_y, to_x, to_y),
+    using the result cache
 
     [arguments]
+    side: bool
     B: Board
 
     [return]
-    str
+    list[tuple[int, int, int, int]]
     '''
-    # Unicode characters for chess pieces
-    white_king = '\u2654'  # ♔
-    white_bishop = '\u2657'  # ♗
-    black_king = '\u265A'  # ♚
-    black_bishop = '\u265D'  # ♝
-    empty_space = '\u2001'  # (matching width space)
-
-    # Initialise the unicode string for the board
-    board_str = ''
-
-    # Loop through each row from top to bottom (reversed y-axis for proper display)
-    for y in range(B[0] - 1, -1, -1):
-        for x in range(B[0]):
-            # Check if there is a piece at (x, y)
-            if is_piece_at(x, y, B):
-                # Get the piece at position (x, y)
-                piece = piece_at(x, y, B)
-                if isinstance(piece, King):
-                    board_str += white_king if piece.side else black_king
-                elif isinstance(piece, Bishop):
-                    board_str += white_bishop if piece.side else black_bishop
-            else:
-                # Add an empty space for no piece
-                board_str += empty_space
-        # Add a newline at the end of each row (except the last one)
-        board_str += '\n'
+    B = as_board(B)
+    key = B.position_key(side)
 
-    # Return the final board string, stripping the trailing newline
-    return board_str.strip()
+    # 1. Use the cached moves, if any
+    moves = result_cache.get(key, 'moves')
+    if moves is not None:
+        return list(moves)
 
+    # 2. Generate the moves and cache them
+    moves = [(piece.pos_x, piece.pos_y, x, y) for piece, x, y in legal_moves(side, B)]
+    result_cache.put(key, 'moves', list(moves))
+    return moves
 
-def save_board(filename: str, B: Board) -> None:
+
+def sample_legal_move(side: bool, B: Board, rng: random.Random | None = None) -> tuple[Piece, int, int] | None:
     '''
-    saves board configuration into file in current directory in plain format
-    
+    [specification]
+    returns (P, x, y), a valid move of side on B drawn uniformly at random from
+    all valid moves of all pieces of side, or None if there is none
+    reservoir sampling over legal_moves: the i-th move replaces the choice with
+    probability 1/i, so no move list is built and the cost follows mobility
+
     [arguments]
-    filename: str
+    side: bool
     B: Board
+    rng: random.Random | None - The random number generator (the random module if None)
+
+    [return]
+    tuple[Piece, int, int] or None
     '''
-    #TODO
+    randrange = (rng or random).randrange
+    choice = None
+    for count, move in enumerate(legal_moves(side, B), 1):
+        if randrange(count) == 0:
+            choice = move
+    return choice
 
 
-def location2index(loc: str) -> tuple[int, int]:
+def has_legal_move(side: bool, B: Board) -> bool:
     '''
-    converts chess location to corresponding x and y coordinates
-    
+    checks if side has at least one valid move on B,
+    stopping at the first one unless the move list is cached
+
     [arguments]
-    loc: str
+    side: bool
+    B: Board
 
     [return]
-    index: tuple[int, int]
+    True or False
     '''
-    x = ord(loc[0]) - ord('a') + 1
-    #y = int(loc[1])
-    y = int(loc[1:])
+    B = as_board(B)
+    moves = result_cache.get(B.position_key(side), 'moves')
+    if moves is not None:
+        return bool(moves)
+    for _ in legal_moves(side, B):
+        return True
+    return False
 
-    return (x, y)
 
-	
-def index2location(x: int, y: int) -> str:
+def piece_legal_moves(piece: Piece, B: Board, info: PositionInfo | None = None):
     '''
-    converts  pair of coordinates to corresponding location
-    
+    [specification]
+    yields (P, x, y) for every valid move of piece P to coordinates x, y on B
+    pseudo-legal destinations are kept if the position analysis shows they
+    do not leave the own king in check (Rule4)
+
     [arguments]
-    x: int
-    y: int
+    piece: Piece
+    B: Board
+    info: PositionInfo - The analysis of B for the side of P, if already computed
 
     [return]
-    location: str
+    generator of tuple[Piece, int, int]
     '''
-    col = chr(x + ord('a') - 1)
-    row = str(y)
+    # (Use type-assertion to enable IntelliSense in Visual Studio)
+    if not isinstance(piece, (King, Bishop)):
+        raise TypeError('The piece should be King or Bishop objects.')
 
+    if info is None:
+        info = analyse_position(piece.side, B)
+    for pos_X, pos_Y in piece.candidate_moves(info.board):
+        if info.is_legal(piece, pos_X, pos_Y):
+            yield (piece, pos_X, pos_Y)
 
-    return col + row
-#endregion
 
-# < Check Methods >
-#region
-def is_piece_at(pos_X : int, pos_Y : int, B: Board) -> bool:
+def analyse_position(side: bool, B: Board) -> PositionInfo:
     '''
-    checks if there is piece at coordinates pox_X, pos_Y of board B
-    
+    [specification]
+    computes the checking pieces, the pinned pieces with their pin rays and
+    the squares attacked by the opponent of side on B, so that the legality
+    of every move of side can be tested without making it
+
     [arguments]
-    pos_X: int
-    pos_Y: int
+    side: bool
     B: Board
 
     [return]
-    True or False
-    ''' 
-    # 1. Check if there is a piece at coordinates pos_X, pos_Y on board B
-    for piece in B[1]:  # Access pieces with B[1] instead of B[1]
-        
-        # (Use type-assertion to enable IntelliSense in Visual Studio)
-        if not isinstance(piece, Piece):
-            raise TypeError('Board must contain only Piece objects.')
-        
-        # 2. Check if the piece is at the specified coordinates
-        if piece.pos_x == pos_X and piece.pos_y == pos_Y:
-            return True
-            
-    # 3. Return
-    return False
-	
+    object: PositionInfo
+    '''
+    return PositionInfo(side, B)
 
-def piece_at(pos_X : int, pos_Y : int, B: Board) -> Piece:
+
+def find_king(side: bool, B: Board) -> Piece:
     '''
-    returns the piece at coordinates pox_X, pos_Y of board B 
-    assumes some piece at coordinates pox_X, pos_Y of board B is present
+    returns the king of side on B
+    raises ValueError if side has no king
 
     [arguments]
-    pos_X: int
-    pos_Y: int
+    side: bool
     B: Board
 
     [return]
     object: Piece
     '''
-
-    # (Type-assertion to enable IntelliSense in Visual Studio)
-    pieces = cast(List[Piece], B[1])
-    
-    # 1. Iterate through the pieces to find the piece at the specified coordinates
-    for piece in pieces:
-        if piece.pos_x == pos_X and piece.pos_y == pos_Y:
-            return piece
-    
-    # 2. Raise an error if no piece is found at the specified position
-    raise ValueError(f'Cannot find a piece at {index2location(pos_X, pos_Y)}')
+    king = as_board(B).kings.get(side)
+    if king is None:
+        raise ValueError('King not found')
+    return king
 
 
-def is_check(side: bool, B: Board) -> bool:
+def find_checkers(king: Piece, B: Board) -> list[Piece]:
     '''
-    checks if configuration of B is check for side
-    Hint: use can_reach
+    returns the opponent pieces which can reach the square of king on B,
+    looking outwards from the king so that only its own rays are walked
 
     [arguments]
-    side: bool
+    king: Piece
     B: Board
 
     [return]
-    True or False
+    list[Piece]
     '''
+    B = as_board(B)
+    tables = ray_tables(B[0])
+    occupancy = B.occupancy
+    king_square = (king.pos_x, king.pos_y)
+    checkers = []
+
+    # 1. Bishops on the king's diagonals with nothing in between
+    for ray in tables.rays[king_square]:
+        for square in ray:
+            piece = occupancy.get(square)
+            if piece is not None:
+                if piece.side != king.side and isinstance(piece, Bishop):
+                    checkers.append(piece)
+                break
 
-    # 1. Find the position of the king for the given side
-    king_pos = None
-    for piece in B[1]:
-        if isinstance(piece, King) and piece.side == side:
-            king_pos = (piece.pos_x, piece.pos_y)
-            break
-
-    # 2. If the king is not found, raise an error
-    if not king_pos:
-        raise ValueError('King not found')
+    # 2. The opponent king next to the king
+    for square in tables.neighbours[king_square]:
+        piece = occupancy.get(square)
+        if piece is not None and piece.side != king.side and isinstance(piece, King):
+            checkers.append(piece)
 
-    # 3. Check if any opponent piece can reach the king's position using can_reach
-    for piece in B[1]:
-        # Check only opponent pieces (not the king of the same side)
-        if piece.side != side:
-            # Use can_reach to determine if the piece can attack the king
-            if piece.can_reach(king_pos[0], king_pos[1], B):
-                # If any opponent piece can reach the king, it's check
-                return True  
-
-    # 4. Return False if no opponent piece can reach the king
-    return False
+    # 3. Return
+    return checkers
 
 
-def is_checkmate(side: bool, B: Board) -> bool:
+def update_check(side: bool, B: Board, from_x: int, from_y: int, to_x: int, to_y: int,
+                 was_check: bool) -> bool:
     '''
     [specification]
-    checks if configuration of B is checkmate for side
-
-    Hints: 
-    - use is_check
-    - use can_move_to
+    checks if configuration of B is check for side, where B is the board
+    just after a move from from_x, from_y to to_x, to_y and was_check is
+    whether side was in check before that move
+    only the lines which the move can change are examined: the lines of the
+    king if it moved or was in check, otherwise the piece which moved (direct
+    check) and the king's diagonal through the vacated square (discovered check)
 
     [arguments]
     side: bool
     B: Board
+    from_x: int
+    from_y: int
+    to_x: int
+    to_y: int
+    was_check: bool
 
     [return]
     True or False
-    
     '''
-    # 1. Check if the side is in check
-    if not is_check(side, B):
-        return False
+    B = as_board(B)
+    tables = ray_tables(B[0])
+    occupancy = B.occupancy
+    king = find_king(side, B)
+    king_square = (king.pos_x, king.pos_y)
+
+    # 1. King moves and existing checks (which may be blocked or captured) need all of the king's lines
+    if was_check or king_square == (to_x, to_y):
+        return bool(find_checkers(king, B))
+
+    # 2. Direct check by the piece which moved
+    mover = occupancy.get((to_x, to_y))
+    if mover is not None and mover.side != side:
+        if isinstance(mover, King):
+            if (to_x, to_y) in tables.neighbours[king_square]:
+                return True
+        else:
+            between = tables.between.get((king_square, (to_x, to_y)))
+            if between is not None and not any(square in occupancy for square in between):
+                return True
+
+    # 3. Discovered check along the king's diagonal through the vacated square
+    between = tables.between.get((king_square, (from_x, from_y)))
+    if between is not None and not any(square in occupancy for square in between):
+        direction = RayTables.DIRECTIONS.index(
+            ((from_x > king.pos_x) - (from_x < king.pos_x), (from_y > king.pos_y) - (from_y < king.pos_y)))
+        for square in tables.rays[king_square][direction][len(between) + 1:]:
+            piece = occupancy.get(square)
+            if piece is not None:
+                return piece.side != side and isinstance(piece, Bishop)
 
-    # 2. Iterate over all pieces belonging to the given side
-    for piece in B[1]:
-        if piece.side == side:
-            # 3. Check if any piece can make a valid move
-            # Ensure x is within the board's limits
-            for x in range(1, B[0] + 1):  
-                # Ensure y is within the board's limits
-                for y in range(1, B[0] + 1):  
-                    # Prevent can_move_to from being called recursively
-                    if piece.can_move_to(x, y, B):
-                        return False
+    # 4. Return
+    return False
+#endregion
 
-    # 4. If no valid moves are found, it's checkmate
-    return True
+# < Solver Methods >
+#region
+def solve_mate(B: Board, side: bool, max_depth: int, store=None,
+               canonical: tuple[Board, int] | None = None) -> list[tuple[int, int, int, int]] | None:
+    '''
+    [specification]
+    finds a forced mate for side to move on B within max_depth moves of side
+    searches with iterative deepening, so the first mate found is the shortest;
+    each search is alpha-beta on a win/loss window, so a node stops at the first
+    winning move or the first refuting reply, and checking moves are tried first
+    (at the last move of side only checking moves are tried)
+    returns the principal variation as (from_x, from_y, to_x, to_y) moves, with
+    the defence which holds out the longest, or None if there is no mate within max_depth
+    with a solution store (see chess_store), a stored answer is used without
+    searching, and a new answer is stored; the canonical board of B is computed
+    once for both, or taken from canonical if the caller has it already
 
+    [arguments]
+    B: Board
+    side: bool
+    max_depth: int
+    store: SolutionStore | None - The persistent solution store, if any
+    canonical: tuple[Board, int] | None - canonical_board(B), if already computed
 
-def is_stalemate(side: bool, B: Board) -> bool:
+    [return]
+    list[tuple[int, int, int, int]] or None
     '''
-    checks if configuration of B is stalemate for side
+    # 0. The store answers if it holds a mate within max_depth or a search as deep
+    if store is not None:
+        C, transform = canonical if canonical is not None else canonical_board(B)
+        solution = store.get_canonical(C, transform, side)
+        if solution is not None:
+            if solution.mate is not None:
+                return list(solution.mate) if solution.mate_in <= max_depth else None
+            if solution.searched is not None and solution.searched >= max_depth:
+                return None
+        line = solve_mate(B, side, max_depth)
+        store.put_canonical(C, transform, side, mate=line, searched=max_depth)
+        return line
+
+    # 1. Search on a private copy, so the pieces of B are never moved
+    board = copy_board(B)
+    table: dict[tuple[int, int], list[tuple[int, int, int, int]] | None] = {}
+
+    # 2. A tablebase answers directly, and its best moves give the line
+    probe = probe_tablebases(board, side)
+    if probe is not None:
+        return _tablebase_line(board, side, probe, max_depth)
+
+    # 3. Deepen one move at a time
+    for depth in range(1, max_depth + 1):
+        line = _attack(board, side, depth, table)
+        if line is not None:
+            return line
+
+    # 4. Return (no mate within max_depth)
+    return None
+
+
+def _tablebase_line(B: Board, side: bool, probe: tuple[str, int], max_depth: int
+                    ) -> list[tuple[int, int, int, int]] | None:
+    '''
+    [specification]
+    returns the mating line of side to move on B by following the best
+    tablebase moves of both sides, or None if the tablebase result probe
+    is not a win within max_depth moves of side
 
-    Hints: 
-    - use is_check
-    - use can_move_to
-    
     [arguments]
+    B: Board
     side: bool
-    B: board
+    probe: tuple[str, int]
+    max_depth: int
 
     [return]
-    True or False
+    list[tuple[int, int, int, int]] or None
+    '''
+    result, distance = probe
+    if result != 'win' or distance > 2 * max_depth - 1:
+        return None
+    line = []
+    for _ in range(distance):
+        move = tablebase_move(side, B)
+        if move is None:
+            return None
+        piece, x, y = move
+        line.append((piece.pos_x, piece.pos_y, x, y))
+        B.make_move(piece, x, y)
+        side = not side
+    return line
+
+
+def _attack(B: Board, side: bool, depth: int,
+            table: dict[tuple[int, int], list[tuple[int, int, int, int]] | None]
+            ) -> list[tuple[int, int, int, int]] | None:
     '''
-    # 1. Check if the side is in check
-    if is_check(side, B):
-        return False
+    [specification]
+    returns a line in which side to move on B mates within depth moves, or None
+
+    [arguments]
+    B: Board
+    side: bool
+    depth: int
+    table: dict - The transposition table of this search
+
+    [return]
+    list[tuple[int, int, int, int]] or None
+    '''
+    key = (B.position_key(side), depth)
+    if key in table:
+        return table[key]
+
+    # 1. Order the moves, checks first (only checks can mate on the last move)
+    checks, quiet = [], []
+    for piece, x, y in legal_moves(side, B):
+        from_x, from_y = piece.pos_x, piece.pos_y
+        undo = B.make_move(piece, x, y)
+        gives_check = update_check(not side, B, from_x, from_y, x, y, False)
+        B.unmake_move(undo)
+        if gives_check:
+            checks.append((piece, x, y))
+        elif depth > 1:
+            quiet.append((piece, x, y))
+
+    # 2. Stop at the first move after which every defence loses
+    line = None
+    for piece, x, y in checks + quiet:
+        move = (piece.pos_x, piece.pos_y, x, y)
+        undo = B.make_move(piece, x, y)
+        defence = _defend(B, not side, depth, table)
+        B.unmake_move(undo)
+        if defence is not None:
+            line = [move] + defence
+            break
+
+    # 3. Return
+    table[key] = line
+    return line
 
-    # 2. Iterate over all pieces of the specified side
-    for piece in B[1]:
-        # (Use type-assertion to enable IntelliSense in Visual Studio)
-        if not isinstance(piece, (King, Bishop)):
-            raise TypeError('The piece should be King or Bishop objects.')
 
-        if piece.side == side:
-            # 3. Check if any piece can make a valid move
-            for x in range(B[0]):
-                for y in range(B[0]):
-                    if piece.can_move_to(x, y, B):
-                        # If a valid move is found, it is not stalemate
-                        return False
+def _defend(B: Board, side: bool, depth: int,
+            table: dict[tuple[int, int], list[tuple[int, int, int, int]] | None]
+            ) -> list[tuple[int, int, int, int]] | None:
+    '''
+    [specification]
+    returns the longest line in which side to move on B is mated within
+    depth - 1 further moves of the opponent, or None if side can avoid it
 
-    # 4. Return (stalemate)
-    return True
+    [arguments]
+    B: Board
+    side: bool
+    depth: int
+    table: dict - The transposition table of this search
 
+    [return]
+    list[tuple[int, int, int, int]] or None
+    '''
+    info = analyse_position(side, B)
+    replies = [move for piece in [p for p in B[1] if p.side == side]
+               for move in piece_legal_moves(piece, B, info)]
+
+    # 1. No reply: mate if in check, stalemate otherwise
+    if not replies:
+        return [] if info.is_check() else None
+    if depth == 1:
+        return None
+
+    # 2. Every reply must lose; the first which does not refutes the attack
+    longest: list[tuple[int, int, int, int]] = []
+    for piece, x, y in replies:
+        move = (piece.pos_x, piece.pos_y, x, y)
+        undo = B.make_move(piece, x, y)
+        line = _attack(B, not side, depth - 1, table)
+        B.unmake_move(undo)
+        if line is None:
+            return None
+        if len(line) + 1 > len(longest):
+            longest = [move] + line
 
+    # 3. Return
+    return longest
 #endregion
 
-# < Playing Methods >
+# < Perft Methods >
 #region
-def find_black_move(B: Board) -> tuple[Piece, int, int]:
+def perft(B: Board, side: bool, depth: int) -> int:
     '''
-    returns (P, x, y) where a Black piece P can move on B to coordinates x,y according to chess rules 
-    assumes there is at least one black piece that can move somewhere
+    [specification]
+    counts the sequences of depth valid moves starting with side to move on B
+    (the leaf nodes of the move tree), which measures and checks move generation
+    the moves are played on a private copy, so the pieces of B are never moved
 
-    Hints: 
-    - use methods of random library
-    - use can_move_to
+    [arguments]
+    B: Board
+    side: bool
+    depth: int
+
+    [return]
+    int
+    '''
+    if depth <= 0:
+        return 1
+    return _perft(copy_board(B), side, depth)
+
+
+def perft_divide(B: Board, side: bool, depth: int) -> dict[str, int]:
+    '''
+    [specification]
+    returns the perft count below each move of side to move on B, keyed by the
+    move written as from and to locations (e.g. 'b5d3'); the counts add up to
+    perft(B, side, depth)
 
     [arguments]
     B: Board
+    side: bool
+    depth: int
 
     [return]
-    tuple[Piece, int, int]
+    dict[str, int]
     '''
-    # 1. Collect all black pieces on the board
-    black_pieces = [p for p in B[1] if not p.side]
+    board = copy_board(B)
+    counts = {}
+    for piece, x, y in list(legal_moves(side, board)):
+        move = index2move(piece.pos_x, piece.pos_y, x, y)
+        undo = board.make_move(piece, x, y)
+        counts[move] = _perft(board, not side, depth - 1) if depth > 1 else 1
+        board.unmake_move(undo)
+    return counts
 
-    # 2. Randomly select one black piece
-    piece = random.choice(black_pieces)
 
-    # (Use type-assertion to enable IntelliSense in Visual Studio)
-    if not isinstance(piece, (King, Bishop)):
-        raise TypeError('The piece should be King or Bishop objects.')
+def _perft(B: Board, side: bool, depth: int) -> int:
+    '''
+    counts the leaf nodes below B with side to move, for depth >= 1
+    at depth 1 the moves are only counted, not played
 
-    # 3. Check for a valid move for the selected piece
-    for x in range(B[0]):
-        for y in range(B[0]):
-            if piece.can_move_to(x, y, B):
-                return (piece, x, y)
+    [arguments]
+    B: Board
+    side: bool
+    depth: int
 
-    # 4. If no valid move is found, raise an exception
-    raise ValueError('No valid moves found for black pieces')
+    [return]
+    int
+    '''
+    moves = list(legal_moves(side, B))
+    if depth == 1:
+        return len(moves)
+    nodes = 0
+    for piece, x, y in moves:
+        undo = B.make_move(piece, x, y)
+        nodes += _perft(B, not side, depth - 1)
+        B.unmake_move(undo)
+    return nodes
 #endregion
 
-
-# ---------------
-# Static Methods (Added)
-# ---------------
-# < Check Methods >
+# < Tablebase Methods >
 #region
-def is_valid(piece: Piece, from_x: int, from_y: int, to_x: int, to_y: int, board: Board) -> bool:
+def register_tablebase(tablebase) -> None:
     '''
-    Check if the specified piece can make a valid move
+    adds a tablebase to the ones probed by find_black_move and solve_mate
+    the tablebase needs a probe(B, side) method returning (result, distance)
+    or None, like chess_tablebase.Tablebase
 
     [arguments]
-    piece: Piece
-    from_x: int
-    from_y: int
-    to_x: int
-    to_y: int
-    board: Board
+    tablebase: object
+    '''
+    tablebases.append(tablebase)
+
+
+def probe_tablebases(B: Board, side: bool) -> tuple[str, int] | None:
+    '''
+    returns ('win', 'draw' or 'loss' for side to move on B, distance to mate in plies)
+    from the first registered tablebase which covers B, or None
+
+    [arguments]
+    B: Board
+    side: bool
 
     [return]
-    True or False
+    tuple[str, int] or None
     '''
-    # (Use type-assertion to enable IntelliSense in Visual Studio)
-    if not isinstance(piece, (King, Bishop)):
-        raise TypeError('The piece should be King or Bishop objects.')
+    for tablebase in tablebases:
+        result = tablebase.probe(B, side)
+        if result is not None:
+            return result
+    return None
 
-    # Check if the piece can move to the position
-    return piece.can_move_to(to_x, to_y, board)
+
+def tablebase_move(side: bool, B: Board) -> tuple[Piece, int, int] | None:
+    '''
+    [specification]
+    returns the best move (P, x, y) of side on B according to the registered
+    tablebases: the fastest win, otherwise a draw, otherwise the slowest loss
+    returns None if some position after a move is not covered
+
+    [arguments]
+    side: bool
+    B: Board
+
+    [return]
+    tuple[Piece, int, int] or None
+    '''
+    B = as_board(B)
+    best, best_score = None, None
+    for piece, x, y in list(legal_moves(side, B)):
+        undo = B.make_move(piece, x, y)
+        try:
+            probe = probe_tablebases(B, not side)
+        finally:
+            B.unmake_move(undo)
+        if probe is None:
+            return None
+
+        # Score from the mover's point of view: the opponent's loss is our win
+        result, distance = probe
+        if result == 'loss':
+            score = (0, distance)
+        elif result == 'draw':
+            score = (1, 0)
+        else:
+            score = (2, -distance)
+        if best_score is None or score < best_score:
+            best, best_score = (piece, x, y), score
+    return best
 #endregion
 
 # < Board Methods >
@@ -763,12 +2376,81 @@ def apply_board(piece: Piece, from_x: int, from_y: int, to_x: int, to_y: int, bo
         raise TypeError('The piece should be King or Bishop objects.')
 
     # 1. Check if the piece can move to the position
+    board = as_board(board)
     if is_valid(piece, from_x, from_y, to_x, to_y, board):
-        return piece.move_to(to_x, to_y, board)
+        new_board = piece.move_to(to_x, to_y, board)
+
+        # 2. Carry the check state of both sides over to the new board incrementally
+        new_board.checks = {
+            side: update_check(side, new_board, from_x, from_y, to_x, to_y, is_check(side, board))
+            for side in (True, False)}
+        return new_board
 
-    # 2. If the move is invalid, the board remains unchanged
+    # 3. If the move is invalid, the board remains unchanged
     return board
 
+def copy_board(B: Board) -> Board:
+    '''
+    Returns a copy of board B with copies of its pieces, which can be
+    changed with make_move without affecting B
+
+    [arguments]
+    B: Board
+
+    [return]
+    object: Board
+    '''
+    return Board((B[0], [type(p)(p.pos_x, p.pos_y, p.side) for p in B[1]]))
+
+def parse_board_lines(lines: list[str]) -> Board:
+    '''
+    Parses the lines of one board configuration in plain format
+
+    [arguments]
+    lines: list[str]
+
+    [return]
+    object: Board
+    '''
+    if not lines:
+        raise ValueError('The file is empty.') 
+    
+    # 1. Validate the board size
+    board_size = int(lines[0].strip())
+    if not (3 <= board_size <= 26):
+        raise ValueError(f'The board size must be between 3 and 26. It is {board_size}.')
+    
+    # 2. Read white pieces from the 2nd line
+    white_pieces = parse_pieces(lines[1] if len(lines) > 1 else '', True)
+    
+    # 3. Read black pieces from the 3rd line
+    black_pieces = parse_pieces(lines[2] if len(lines) > 2 else '', False)
+    
+    # 4. Check the number of kings for each side
+    if len([p for p in white_pieces if isinstance(p, King)]) != 1:
+        raise ValueError('There must be exactly one white king.')
+    if len([p for p in black_pieces if isinstance(p, King)]) != 1:
+        raise ValueError('There must be exactly one black king.')
+
+    # 5. Return
+    return Board((board_size, white_pieces + black_pieces))
+
+def board_to_plain(B: Board) -> str:
+    '''
+    Converts board configuration B to the plain format (three lines)
+
+    [arguments]
+    B: Board
+
+    [return]
+    str
+    '''
+    lines = [str(B[0])]
+    for side in (True, False):
+        lines.append(', '.join(
+            p.symbol + index2location(p.pos_x, p.pos_y) for p in B[1] if p.side == side))
+    return '\n'.join(lines) + '\n'
+
 def parse_pieces(line: str, is_white: bool) -> list:
     '''
     Parses a line of piece positions and returns a list of Piece objects.
@@ -835,9 +2517,7 @@ def players_turn(board: Board) -> tuple[int, int, int, int]:
 
     # 1. Prompt the player to enter their move
     move = input('It is your turn (White). Enter the position to move: ')
-    from_loc, to_loc = move[:2], move[2:]
-    from_x, from_y = location2index(from_loc)
-    to_x, to_y = location2index(to_loc)
+    from_x, from_y, to_x, to_y = move2index(move)
     
     # 2. Check if there is a piece at the start location
     if not is_piece_at(from_x, from_y, board):
@@ -854,19 +2534,26 @@ def players_turn(board: Board) -> tuple[int, int, int, int]:
     return from_x, from_y, to_x, to_y
 
 
-def opponents_turn(board: Board) -> tuple[int, int, int, int]:
+def opponents_turn(board: Board, engine: Engine | None = None) -> tuple[int, int, int, int]:
     '''
     Decide the move for the computer (black)
 
     [arguments]
     board: Board
+    engine: Engine | None - The engine choosing the move (find_black_move if None)
 
     [return]
     position: tuple[int, int, int, int]
     '''
 
-    # 1. Randomly select a black piece and determine the move
-    piece, to_x, to_y = find_black_move(board)
+    # 1. Let the engine search for a move, or randomly select one
+    if engine is None:
+        piece, to_x, to_y = find_black_move(board)
+    else:
+        move = engine.choose_move(board, False)
+        if move is None:
+            raise ValueError('No valid moves found for black pieces')
+        piece, to_x, to_y = move
 
     # 2. Return the positions of the selected piece and its move
     return piece.pos_x, piece.pos_y, to_x, to_y
@@ -882,58 +2569,85 @@ def main() -> None:
 
     Hint: implementation of this could start as follows:
     filename = input('File name for initial configuration: ')
-    '''
-    while True:
-        # 1. Initialisation
-        # 1-1. Ask for the file name with the initial configuration
-        filename = input('File name for initial configuration: ')
 
-        try:
-            # 1-2. Read and print the board from the file
-            board = read_board(filename)
-            print('The initial configuration is:')
-            print(conf2unicode(board)) # TODO
-
-            # 2. Game begins
-            while True:
-                # 2-1. Player's (White) turn
-                # Get the player's move
-                from_x, from_y, to_x, to_y = players_turn(board)
-                board = apply_board(piece_at(from_x, from_y, board),from_x, from_y, to_x, to_y, board)
-                # Display the board after the move
-                print(conf2unicode(board))
-
-                # 2-2. Check process
-                if is_check(piece_at(to_x, to_y, board).side, board):
-                    print('Check!')
-                if is_checkmate(piece_at(to_x, to_y, board).side, board):
-                    print('Checkmate!')
-                    break
-                if is_stalemate(piece_at(to_x, to_y, board).side, board):
-                    print('Stalemate!')
-                    break
+    Set CHESS_OPPONENT to choose Black: 'engine' (the default) searches with
+    Engine, 'random' plays find_black_move (a tablebase move where one covers
+    the position, otherwise a uniformly random valid move)
 
-                # 2-3. Opponent's (Black) turn
-                # Get the computer's move
-                from_x, from_y, to_x, to_y = opponents_turn(board)
-                board = apply_board(piece_at(from_x, from_y, board),from_x, from_y, to_x, to_y, board)
-                # Display the board after the move
-                print(conf2unicode(board))
-
-                # 2-4. Check process
-                if is_check(piece_at(to_x, to_y, board).side, board):
-                    print('Check!')
-                if is_checkmate(piece_at(to_x, to_y, board).side, board):
-                    print('Checkmate!')
-                    break
-                if is_stalemate(piece_at(to_x, to_y, board).side, board):
-                    print('Stalemate!')
-                    break
+    Set CHESS_INSTRUMENT to time the hot paths (see chess_instrument): the
+    report goes to that file (JSON if it ends in .json), or to standard
+    error if it is '1'
+    '''
+    # 0-1. The opponent
+    opponent = os.environ.get('CHESS_OPPONENT', 'engine')
+    if opponent not in ('engine', 'random'):
+        raise ValueError(f"CHESS_OPPONENT must be 'engine' or 'random', not {opponent!r}.")
+
+    # 0-2. Optional instrumentation
+    instrument = os.environ.get('CHESS_INSTRUMENT')
+    if instrument:
+        import chess_instrument
+        chess_instrument.enable(sys.modules[__name__])
+        if chess_instrument.DEFAULT_SIGNAL is not None:
+            chess_instrument.install_signal_handler()
 
-            # 3. Exit
-            break
-        except Exception as ex:
-            print(f'An unexpected error occurred: {ex}')
+    try:
+        while True:
+            # 1. Initialisation
+            # 1-1. Ask for the file name with the initial configuration
+            filename = input('File name for initial configuration: ')
+
+            try:
+                # 1-2. Read and print the board from the file
+                board = read_board(filename)
+                engine = Engine() if opponent == 'engine' else None
+                print('The initial configuration is:')
+                print(conf2unicode(board)) # TODO
+
+                # 2. Game begins
+                while True:
+                    # 2-1. Player's (White) turn
+                    # Get the player's move
+                    from_x, from_y, to_x, to_y = players_turn(board)
+                    board = apply_board(piece_at(from_x, from_y, board),from_x, from_y, to_x, to_y, board)
+                    # Display the board after the move
+                    print(conf2unicode(board))
+
+                    # 2-2. Check process (for Black, who moves next)
+                    if is_check(False, board):
+                        print('Check!')
+                    if is_checkmate(False, board):
+                        print('Checkmate!')
+                        break
+                    if is_stalemate(False, board):
+                        print('Stalemate!')
+                        break
+
+                    # 2-3. Opponent's (Black) turn
+                    # Get the computer's move
+                    from_x, from_y, to_x, to_y = opponents_turn(board, engine)
+                    board = apply_board(piece_at(from_x, from_y, board),from_x, from_y, to_x, to_y, board)
+                    # Display the board after the move
+                    print(conf2unicode(board))
+
+                    # 2-4. Check process (for White, who moves next)
+                    if is_check(True, board):
+                        print('Check!')
+                    if is_checkmate(True, board):
+                        print('Checkmate!')
+                        break
+                    if is_stalemate(True, board):
+                        print('Stalemate!')
+                        break
+
+                # 3. Exit
+                break
+            except Exception as ex:
+                print(f'An unexpected error occurred: {ex}')
+    finally:
+        # 4. Report the instrumentation at game end, also on EOF or Ctrl-C at a prompt
+        if instrument:
+            chess_instrument.dump(sys.stderr if instrument == '1' else instrument)
 
 
 # DEBUG
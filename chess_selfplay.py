@@ -0,0 +1,243 @@
+'''Chess Puzzle Self-Play
+
+Plays games between computer policies from a starting board without any
+input, over a pool of worker processes, and reports games per second,
+plies per second and how the games ended.
+
+Policies are given as strings, so that they can be sent to the workers:
+  random                  - a uniformly random valid move
+  engine[:DEPTH[:SECONDS]] - Engine with that depth and time limit per move
+  script:MOVES            - the comma separated moves (e.g. 'b5d3,c5c4') in
+                            turn, then random moves once they run out
+
+Usage: python chess_selfplay.py BOARD [--white P] [--black P] [-n GAMES] [-j WORKERS]
+                                [--max-plies N] [--seed S]
+
+Author : Serika Kawano
+Created: 2026-10-16
+Updated: 2026-10-16
+'''
+
+import argparse
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable
+
+from chess_puzzle import (Board, Engine, Piece, board_to_plain, copy_board, has_legal_move, is_check,
+                          move2index, parse_board_lines, read_board, sample_legal_move)
+
+
+# < Code Variables >
+#region
+OUTCOMES = ('checkmate', 'stalemate', 'move_cap')
+
+Policy = Callable[[Board, bool], tuple[Piece, int, int] | None]
+#endregion
+
+
+# ---------------
+# Static Methods
+# ---------------
+# < Policy Methods >
+#region
+def make_policy(spec: str, rng: random.Random) -> Policy:
+    '''
+    builds the policy described by spec (see the module documentation)
+
+    [arguments]
+    spec: str
+    rng: random.Random - The random number generator of random moves
+
+    [return]
+    Policy - A function of the board and the side to move returning (P, x, y), or None without a move
+    '''
+    kind, _, options = spec.partition(':')
+
+    # 1. Random moves
+    if kind == 'random':
+        return lambda B, side: sample_legal_move(side, B, rng)
+
+    # 2. Engine moves
+    if kind == 'engine':
+        depth, _, seconds = options.partition(':')
+        engine = Engine(int(depth) if depth else 2, float(seconds) if seconds else 0.1)
+        return lambda B, side: engine.choose_move(B, side)
+
+    # 3. Scripted moves, then random ones
+    if kind == 'script':
+        script = [move2index(move) for move in options.split(',') if move.strip()]
+
+        def scripted(B: Board, side: bool) -> tuple[Piece, int, int] | None:
+            if not script:
+                return sample_legal_move(side, B, rng)
+            from_x, from_y, to_x, to_y = script.pop(0)
+            piece = B.occupancy.get((from_x, from_y))
+            if piece is None or piece.side != side or not piece.can_move_to(to_x, to_y, B):
+                raise ValueError(f'Scripted move {from_x},{from_y} to {to_x},{to_y} is not valid.')
+            return piece, to_x, to_y
+        return scripted
+
+    raise ValueError(f'Unknown policy: {spec}')
+#endregion
+
+# < Game Methods >
+#region
+def play_game(B: Board, white: str, black: str, max_plies: int = 200, seed: int | None = None) -> dict:
+    '''
+    plays one game from B, White first, until checkmate, stalemate or max_plies
+
+    [arguments]
+    B: Board
+    white: str - The policy of White
+    black: str - The policy of Black
+    max_plies: int
+    seed: int | None - The seed of the random moves
+
+    [return]
+    dict - outcome ('checkmate', 'stalemate' or 'move_cap'), winner ('white', 'black' or None) and plies
+    '''
+    rng = random.Random(seed)
+    policies = {True: make_policy(white, rng), False: make_policy(black, rng)}
+    board = copy_board(B)
+    side = True
+
+    for plies in range(max_plies + 1):
+        # 1. The game ends when the side to move has no valid move
+        if not has_legal_move(side, board):
+            if is_check(side, board):
+                return {'outcome': 'checkmate', 'winner': 'black' if side else 'white', 'plies': plies}
+            return {'outcome': 'stalemate', 'winner': None, 'plies': plies}
+        if plies == max_plies:
+            break
+
+        # 2. Play the move of the policy
+        piece, x, y = policies[side](board, side)
+        board.make_move(piece, x, y)
+        side = not side
+
+    # 3. Return (move cap reached)
+    return {'outcome': 'move_cap', 'winner': None, 'plies': max_plies}
+
+
+def play_games(plain: str, white: str, black: str, seeds: list[int], max_plies: int) -> list[dict]:
+    '''
+    plays one game per seed from the board in plain format
+    (the unit of work sent to a worker process)
+
+    [arguments]
+    plain: str
+    white: str
+    black: str
+    seeds: list[int]
+    max_plies: int
+
+    [return]
+    list[dict]
+    '''
+    B = parse_board_lines(plain.splitlines())
+    return [play_game(B, white, black, max_plies, seed) for seed in seeds]
+
+
+def run_games(B: Board, white: str, black: str, games: int, workers: int | None = None,
+              max_plies: int = 200, seed: int = 0, chunk_size: int = 8) -> dict:
+    '''
+    plays games from B over a pool of worker processes (in this process if workers is 1)
+    game i uses seed + i, so a run can be repeated exactly
+
+    [arguments]
+    B: Board
+    white: str
+    black: str
+    games: int
+    workers: int | None - The number of worker processes (the number of cores if None)
+    max_plies: int
+    seed: int
+    chunk_size: int - The number of games sent to a worker at a time
+
+    [return]
+    dict - games, plies, seconds, games_per_sec, plies_per_sec, outcomes and wins
+    '''
+    # 1. Check the policies before starting any worker
+    make_policy(white, random.Random())
+    make_policy(black, random.Random())
+    plain = board_to_plain(B)
+    seeds = [seed + i for i in range(games)]
+    chunks = [seeds[i:i + chunk_size] for i in range(0, games, chunk_size)]
+    workers = workers or os.cpu_count() or 1
+
+    # 2. Play
+    start = time.perf_counter()
+    if workers == 1:
+        results = [result for chunk in chunks for result in play_games(plain, white, black, chunk, max_plies)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(play_games, plain, white, black, chunk, max_plies) for chunk in chunks]
+            results = [result for future in futures for result in future.result()]
+    seconds = time.perf_counter() - start
+
+    # 3. Summarise
+    plies = sum(result['plies'] for result in results)
+    return {
+        'games': len(results),
+        'plies': plies,
+        'seconds': seconds,
+        'games_per_sec': len(results) / seconds if seconds else 0.0,
+        'plies_per_sec': plies / seconds if seconds else 0.0,
+        'outcomes': {outcome: sum(1 for r in results if r['outcome'] == outcome) for outcome in OUTCOMES},
+        'wins': {name: sum(1 for r in results if r['winner'] == name) for name in ('white', 'black')},
+    }
+#endregion
+
+# < Report Methods >
+#region
+def format_summary(summary: dict) -> str:
+    '''
+    formats the summary of run_games as text
+
+    [arguments]
+    summary: dict
+
+    [return]
+    str
+    '''
+    games = summary['games'] or 1
+    lines = [
+        f"{summary['games']} games, {summary['plies']} plies in {summary['seconds']:.2f} s",
+        f"{summary['games_per_sec']:.1f} games/s, {summary['plies_per_sec']:.0f} plies/s",
+    ]
+    for outcome, count in summary['outcomes'].items():
+        lines.append(f'{outcome:<10}{count:>8}  {100 * count / games:5.1f}%')
+    lines.append(f"wins      white {summary['wins']['white']}, black {summary['wins']['black']}")
+    return '\n'.join(lines)
+#endregion
+
+
+# ---------------
+# Main Function
+# ---------------
+def main(argv: list[str] | None = None) -> None:
+    '''
+    runs self-play games from the command line
+
+    [arguments]
+    argv: list[str] | None - The command line arguments (sys.argv if None)
+    '''
+    parser = argparse.ArgumentParser(description='Play chess puzzle games between computer policies.')
+    parser.add_argument('board', help='starting board file in the plain format')
+    parser.add_argument('--white', default='random', help='policy of White')
+    parser.add_argument('--black', default='random', help='policy of Black')
+    parser.add_argument('-n', '--games', type=int, default=100, help='number of games')
+    parser.add_argument('-j', '--workers', type=int, default=None, help='number of worker processes')
+    parser.add_argument('--max-plies', type=int, default=200, help='plies before a game is stopped')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the first game')
+    args = parser.parse_args(argv)
+
+    summary = run_games(read_board(args.board), args.white, args.black, args.games,
+                        args.workers, args.max_plies, args.seed)
+    print(format_summary(summary))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,413 @@
+'''Chess Puzzle Game Server
+
+Hosts many games of the chess puzzle at once over local TCP or a Unix
+socket, one game per connection, with a line protocol. Engine replies and
+the end-of-game checks run in a pool of worker processes, so a slow game
+does not hold up the others.
+
+Commands (one per line):
+  BOARD SIZE/WHITE/BLACK - start a game from a board in plain format, with
+                           '/' instead of line breaks (e.g. 'BOARD 3/Ka3, Bc2/Ka1')
+  LOAD FILE              - start a game from a board file in the server's board
+                           directory (--board-dir; disabled without it)
+  MOVE FROMTO            - play White's move (e.g. 'MOVE b5d3'); Black replies
+  SHOW                   - the board in plain format
+  STATS                  - server statistics as JSON
+  QUIT                   - end the session
+Every reply ends with a line starting with 'OK' or 'ERR'. Lines before it
+carry the board (SHOW) or the events of a move: 'BLACK FROMTO', 'CHECK',
+'CHECKMATE WINNER' and 'STALEMATE'.
+
+Usage: python chess_server.py [--host H] [--port P | --unix PATH] [-j WORKERS]
+                              [--depth D] [--time-limit SECONDS] [--board-dir DIR]
+
+Author : Serika Kawano
+Created: 2026-10-16
+Updated: 2026-10-16
+'''
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+
+from chess_puzzle import (Board, Engine, board_to_plain, has_legal_move, index2move, is_check, move2index,
+                          parse_board_lines, read_board)
+
+
+# < Code Variables >
+#region
+# Number of recent command latencies kept for the percentiles
+LATENCY_WINDOW = 1000
+#endregion
+
+
+# ---------------
+# Classes
+# ---------------
+# < Session Class >
+#region
+class Session:
+    '''
+    Session class
+
+    State of one connection: its board, whether the game is over and the
+    latency of its commands
+
+    Created: 2026-10-16
+    Updated: 2026-10-16
+    '''
+
+    def __init__(self, number: int, peer: str):
+        '''
+        Constructor
+
+        [arguments]
+        number: int - The number of the session on its server
+        peer: str - The address of the client
+        '''
+        self.number = number
+        self.peer = peer
+        self.board: Board | None = None
+        self.over = False
+        self.commands = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+
+    def record(self, seconds: float) -> None:
+        '''
+        records the latency of one command
+
+        [arguments]
+        seconds: float
+        '''
+        self.commands += 1
+        self.latency_total += seconds
+        self.latency_max = max(self.latency_max, seconds)
+
+    def stats(self) -> dict[str, object]:
+        '''
+        returns the statistics of the session
+
+        [return]
+        dict[str, object]
+        '''
+        return {
+            'session': self.number,
+            'peer': self.peer,
+            'playing': self.board is not None and not self.over,
+            'commands': self.commands,
+            'latency_mean': self.latency_total / self.commands if self.commands else 0.0,
+            'latency_max': self.latency_max,
+        }
+#endregion
+
+# < GameServer Class >
+#region
+class GameServer:
+    '''
+    GameServer class
+
+    Serves one game per connection; the event loop only parses commands and
+    checks White's moves, everything which searches runs in the executor
+
+    Created: 2026-10-16
+    Updated: 2026-10-16
+    '''
+
+    def __init__(self, executor: Executor, max_depth: int = 2, time_limit: float = 0.5,
+                 board_dir: str | None = None):
+        '''
+        Constructor
+
+        [arguments]
+        executor: Executor - Where engine replies and end-of-game checks run
+        max_depth: int - The search depth of the engine
+        time_limit: float - The seconds the engine may think per move
+        board_dir: str | None - The only directory LOAD reads from (LOAD is disabled if None)
+        '''
+        self.executor = executor
+        self.max_depth = max_depth
+        self.time_limit = time_limit
+        self.board_dir = None if board_dir is None else os.path.realpath(board_dir)
+        self.sessions: dict[int, Session] = {}
+        self.total_sessions = 0
+        self.latencies: deque[float] = deque(maxlen=LATENCY_WINDOW)
+
+    async def start_tcp(self, host: str = '127.0.0.1', port: int = 0) -> asyncio.AbstractServer:
+        '''
+        starts serving on a TCP socket (port 0 picks a free port)
+
+        [arguments]
+        host: str
+        port: int
+
+        [return]
+        asyncio.AbstractServer
+        '''
+        return await asyncio.start_server(self.handle, host, port)
+
+    async def start_unix(self, path: str) -> asyncio.AbstractServer:
+        '''
+        starts serving on a Unix socket
+
+        [arguments]
+        path: str
+
+        [return]
+        asyncio.AbstractServer
+        '''
+        return await asyncio.start_unix_server(self.handle, path)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        '''
+        runs one session: reads commands and writes their replies until QUIT or disconnection
+
+        [arguments]
+        reader: asyncio.StreamReader
+        writer: asyncio.StreamWriter
+        '''
+        self.total_sessions += 1
+        session = Session(self.total_sessions, str(writer.get_extra_info('peername') or 'local'))
+        self.sessions[session.number] = session
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                start = time.perf_counter()
+                command, _, argument = line.decode().strip().partition(' ')
+                try:
+                    reply = await self.execute(session, command.upper(), argument.strip())
+                except ValueError as ex:
+                    reply = [f'ERR {ex}']
+                except OSError:
+                    reply = ['ERR Server error.']
+                writer.write(''.join(f'{text}\n' for text in reply).encode())
+                await writer.drain()
+                elapsed = time.perf_counter() - start
+                session.record(elapsed)
+                self.latencies.append(elapsed)
+                if command.upper() == 'QUIT':
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            del self.sessions[session.number]
+            writer.close()
+
+    async def execute(self, session: Session, command: str, argument: str) -> list[str]:
+        '''
+        runs one command of session and returns the lines of its reply
+        raises ValueError for a command which cannot be run
+
+        [arguments]
+        session: Session
+        command: str
+        argument: str
+
+        [return]
+        list[str]
+        '''
+        # 1. Commands without a game
+        if command == 'QUIT':
+            return ['OK bye']
+        if command == 'STATS':
+            return ['OK ' + json.dumps(self.stats())]
+        if command == 'BOARD':
+            session.board, session.over = parse_board_lines(argument.split('/')), False
+            return [f'OK {session.board[0]}']
+        if command == 'LOAD':
+            session.board, session.over = self.load_board(argument), False
+            return [f'OK {session.board[0]}']
+        if command not in ('MOVE', 'SHOW'):
+            raise ValueError(f'Unknown command: {command}')
+
+        # 2. Commands on the game
+        if session.board is None:
+            raise ValueError('No board. Send BOARD or LOAD first.')
+        if command == 'SHOW':
+            return board_to_plain(session.board).splitlines() + ['OK']
+        if session.over:
+            raise ValueError('The game is over.')
+        from_x, from_y, to_x, to_y = move2index(argument)
+        piece = session.board.occupancy.get((from_x, from_y))
+        if piece is None or not piece.side or not piece.can_move_to(to_x, to_y, session.board):
+            raise ValueError(f'{argument} is not a valid move for White.')
+
+        # 3. White's move here, the rest in the executor
+        board = piece.move_to(to_x, to_y, session.board)
+        loop = asyncio.get_running_loop()
+        plain, events, over = await loop.run_in_executor(
+            self.executor, respond, board_to_plain(board), self.max_depth, self.time_limit)
+        session.board, session.over = parse_board_lines(plain.splitlines()), over
+        return events + ['OK']
+
+    def load_board(self, name: str) -> Board:
+        '''
+        reads the board file name, a relative path inside board_dir
+        raises ValueError with a message which tells nothing about the files of the server
+
+        [arguments]
+        name: str
+
+        [return]
+        object: Board
+        '''
+        # 1. Only relative paths which stay inside the board directory
+        if self.board_dir is None:
+            raise ValueError('LOAD is disabled.')
+        if not name or os.path.isabs(name) or '..' in name.replace('\\', '/').split('/'):
+            raise ValueError('Invalid board file name.')
+        path = os.path.realpath(os.path.join(self.board_dir, name))
+        if os.path.commonpath([self.board_dir, path]) != self.board_dir:
+            raise ValueError('Invalid board file name.')
+
+        # 2. Read it, without echoing what the file holds
+        try:
+            return read_board(path)
+        except (OSError, ValueError):
+            raise ValueError('Cannot load the board.') from None
+
+    def stats(self) -> dict[str, object]:
+        '''
+        returns the number of sessions, the latency percentiles of recent commands
+        and the statistics of each active session
+
+        [return]
+        dict[str, object]
+        '''
+        latencies = sorted(self.latencies)
+
+        def percentile(p: float) -> float:
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))] if latencies else 0.0
+
+        return {
+            'active_sessions': len(self.sessions),
+            'total_sessions': self.total_sessions,
+            'latency_p50': percentile(0.5),
+            'latency_p95': percentile(0.95),
+            'latency_max': latencies[-1] if latencies else 0.0,
+            'sessions': [session.stats() for session in self.sessions.values()],
+        }
+#endregion
+
+
+# ---------------
+# Static Methods
+# ---------------
+# < Worker Methods >
+#region
+def respond(plain: str, max_depth: int, time_limit: float) -> tuple[str, list[str], bool]:
+    '''
+    [specification]
+    finishes a turn after White's move (run in a worker process): checks if
+    Black is mated or stalemated, otherwise plays the engine's reply and
+    checks the result for White
+
+    [arguments]
+    plain: str - The board after White's move, in plain format
+    max_depth: int
+    time_limit: float
+
+    [return]
+    tuple[str, list[str], bool] - The board in plain format, the event lines and whether the game is over
+    '''
+    board = parse_board_lines(plain.splitlines())
+
+    # 1. Black to move
+    ended = _game_end(False, board)
+    if ended is not None:
+        return plain, ended, True
+    events = ['CHECK'] if is_check(False, board) else []
+
+    # 2. Black's reply
+    piece, to_x, to_y = Engine(max_depth, time_limit).choose_move(board, False)
+    events.append('BLACK ' + index2move(piece.pos_x, piece.pos_y, to_x, to_y))
+    board = piece.move_to(to_x, to_y, board)
+
+    # 3. White to move
+    ended = _game_end(True, board)
+    if ended is not None:
+        return board_to_plain(board), events + ended, True
+    if is_check(True, board):
+        events.append('CHECK')
+    return board_to_plain(board), events, False
+
+
+def _game_end(side: bool, B: Board) -> list[str] | None:
+    '''
+    returns the event line if side to move on B is mated or stalemated, otherwise None
+
+    [arguments]
+    side: bool
+    B: Board
+
+    [return]
+    list[str] or None
+    '''
+    if has_legal_move(side, B):
+        return None
+    if is_check(side, B):
+        return ['CHECKMATE ' + ('black' if side else 'white')]
+    return ['STALEMATE']
+#endregion
+
+# < Serve Methods >
+#region
+async def serve(host: str, port: int, unix: str | None, workers: int | None,
+                max_depth: int, time_limit: float, board_dir: str | None = None) -> None:
+    '''
+    runs a game server until it is cancelled
+
+    [arguments]
+    host: str
+    port: int
+    unix: str | None - The Unix socket path (TCP if None)
+    workers: int | None - The number of worker processes (the number of cores if None)
+    max_depth: int
+    time_limit: float
+    board_dir: str | None - The directory LOAD reads from (LOAD is disabled if None)
+    '''
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1) as executor:
+        game_server = GameServer(executor, max_depth, time_limit, board_dir)
+        server = await (game_server.start_unix(unix) if unix else game_server.start_tcp(host, port))
+        for sock in server.sockets:
+            print(f'Serving on {sock.getsockname()}')
+        async with server:
+            await server.serve_forever()
+#endregion
+
+
+# ---------------
+# Main Function
+# ---------------
+def main(argv: list[str] | None = None) -> None:
+    '''
+    runs the game server from the command line
+
+    [arguments]
+    argv: list[str] | None - The command line arguments (sys.argv if None)
+    '''
+    parser = argparse.ArgumentParser(description='Serve chess puzzle games over a line protocol.')
+    parser.add_argument('--host', default='127.0.0.1', help='TCP host')
+    parser.add_argument('--port', type=int, default=8765, help='TCP port')
+    parser.add_argument('--unix', help='serve on this Unix socket path instead of TCP')
+    parser.add_argument('-j', '--workers', type=int, default=None, help='number of worker processes')
+    parser.add_argument('--depth', type=int, default=2, help='search depth of the engine')
+    parser.add_argument('--time-limit', type=float, default=0.5, help='seconds per engine move')
+    parser.add_argument('--board-dir', help='directory of board files for LOAD (LOAD is disabled without it)')
+    args = parser.parse_args(argv)
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.unix, args.workers, args.depth, args.time_limit,
+                          args.board_dir))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
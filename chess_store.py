@@ -0,0 +1,376 @@
+'''Chess Puzzle Solution Store
+
+Persistent cache of puzzle verdicts and mate solutions in a SQLite file,
+shared by runs and by worker processes.
+
+A position is keyed by its canonical board (see canonical_board) in plain
+format with '/' for line breaks, then ' w' or ' b' for the side to move,
+so all 8 rotations and reflections of a position share one entry. Mate
+lines are stored in the canonical orientation and turned back on reading.
+
+Each entry holds, for the side to move: check, checkmate and stalemate,
+the shortest mate line found with its length in moves of that side, and
+the depth searched, so that 'no mate within N' is remembered too. Unknown
+values are NULL and are filled in by later writes.
+
+The file is in WAL mode, so readers do not block the writer; writers wait
+for each other up to the busy timeout. Every process must open its own
+SolutionStore.
+
+Author : Serika Kawano
+Created: 2026-10-16
+Updated: 2026-10-16
+'''
+
+import sqlite3
+import time
+from typing import Iterable, NamedTuple
+
+from chess_puzzle import (Board, board_to_plain, canonical_board, index2move, inverse_transform, move2index,
+                          transform_square)
+
+
+# < Code Variables >
+#region
+# SQLite limits the variables of one statement, so keys are looked up in batches
+BATCH = 500
+
+# Seconds before a hit updates the last use of an entry again, so that most
+# lookups only read (a write takes the lock which every other writer waits for)
+TOUCH_INTERVAL = 60.0
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS solutions (
+    key TEXT PRIMARY KEY,
+    is_check INTEGER,
+    checkmate INTEGER,
+    stalemate INTEGER,
+    mate TEXT,
+    mate_in INTEGER,
+    searched INTEGER,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS solutions_last_used ON solutions (last_used);
+'''
+#endregion
+
+
+# ---------------
+# Classes
+# ---------------
+# < Solution Class >
+#region
+class Solution(NamedTuple):
+    '''
+    What is known about a position for the side to move (None where unknown);
+    mate is a line of (from_x, from_y, to_x, to_y) moves, or None
+    '''
+    check: bool | None = None
+    checkmate: bool | None = None
+    stalemate: bool | None = None
+    mate: tuple[tuple[int, int, int, int], ...] | None = None
+    mate_in: int | None = None
+    searched: int | None = None
+#endregion
+
+# < SolutionStore Class >
+#region
+class SolutionStore:
+    '''
+    SolutionStore class
+
+    SQLite-backed map from canonical position keys to Solutions, with bulk
+    lookup and insert and least-recently-used eviction above max_entries
+    (the last use of an entry is only updated once per touch_interval)
+
+    Created: 2026-10-16
+    Updated: 2026-10-16
+    '''
+
+    def __init__(self, filename: str, max_entries: int | None = None, timeout: float = 30.0,
+                 touch_interval: float = TOUCH_INTERVAL):
+        '''
+        Constructor
+
+        [arguments]
+        filename: str - The SQLite file (created if missing)
+        max_entries: int | None - The most entries kept (no limit if None)
+        timeout: float - The seconds a write waits for another process's write
+        touch_interval: float - The seconds before a hit updates the last use of an entry again
+        '''
+        self.filename = filename
+        self.max_entries = max_entries
+        self.touch_interval = touch_interval
+        self._db = sqlite3.connect(filename, timeout=timeout, isolation_level=None)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute(f'PRAGMA busy_timeout={int(timeout * 1000)}')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        with self._transaction():
+            for statement in SCHEMA.split(';'):
+                if statement.strip():
+                    self._db.execute(statement)
+
+    def __enter__(self) -> 'SolutionStore':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._db.execute('SELECT COUNT(*) FROM solutions').fetchone()[0]
+
+    def close(self) -> None:
+        '''
+        closes the database connection
+        '''
+        self._db.close()
+
+    # < Key Methods >
+    #region
+    @staticmethod
+    def key(B: Board, side: bool) -> tuple[str, int]:
+        '''
+        returns the canonical key of B with side to move and the transform
+        from B to the canonical board
+
+        [arguments]
+        B: Board
+        side: bool
+
+        [return]
+        tuple[str, int]
+        '''
+        C, transform = canonical_board(B)
+        return SolutionStore.canonical_key(C, side), transform
+
+    @staticmethod
+    def canonical_key(C: Board, side: bool) -> str:
+        '''
+        returns the key of C with side to move, where C is already canonical
+        (see canonical_board), so a caller who needs C anyway computes it once
+
+        [arguments]
+        C: Board - The canonical board
+        side: bool
+
+        [return]
+        str
+        '''
+        return board_to_plain(C).rstrip('\n').replace('\n', '/') + (' w' if side else ' b')
+    #endregion
+
+    # < Bulk Methods >
+    #region
+    def get_many(self, keys: Iterable[str]) -> dict[str, Solution]:
+        '''
+        returns the stored Solution of each key which has one (mate lines in
+        the canonical orientation), marking those last used more than
+        touch_interval ago as recently used, in one write for all of them
+
+        [arguments]
+        keys: Iterable[str]
+
+        [return]
+        dict[str, Solution]
+        '''
+        keys = list(dict.fromkeys(keys))
+        found: dict[str, Solution] = {}
+        now = time.time()
+        stale: list[str] = []
+
+        # 1. Read the entries
+        for i in range(0, len(keys), BATCH):
+            batch = keys[i:i + BATCH]
+            marks = ','.join('?' * len(batch))
+            rows = self._db.execute(
+                'SELECT key, is_check, checkmate, stalemate, mate, mate_in, searched, last_used '
+                f'FROM solutions WHERE key IN ({marks})', batch).fetchall()
+            for key, check, checkmate, stalemate, mate, mate_in, searched, last_used in rows:
+                found[key] = Solution(
+                    _flag(check), _flag(checkmate), _flag(stalemate),
+                    None if mate is None else tuple(move2index(move) for move in mate.split()),
+                    mate_in, searched)
+                if now - last_used >= self.touch_interval:
+                    stale.append(key)
+
+        # 2. Mark the entries not marked within touch_interval as used
+        if stale:
+            with self._transaction():
+                for i in range(0, len(stale), BATCH):
+                    batch = stale[i:i + BATCH]
+                    self._db.execute(
+                        f'UPDATE solutions SET last_used = ? WHERE key IN ({",".join("?" * len(batch))})',
+                        [now, *batch])
+        return found
+
+    def put_many(self, solutions: dict[str, Solution]) -> None:
+        '''
+        stores the Solution of each key (mate lines in the canonical orientation)
+        known values of an existing entry are kept where the new Solution has None;
+        the deepest search and the shortest mate win; then evicts above max_entries
+
+        [arguments]
+        solutions: dict[str, Solution]
+        '''
+        now = time.time()
+        rows = [(key, _int(s.check), _int(s.checkmate), _int(s.stalemate),
+                 None if s.mate is None else ' '.join(index2move(*move) for move in s.mate),
+                 s.mate_in, s.searched, now)
+                for key, s in solutions.items()]
+        with self._transaction():
+            self._db.executemany('''
+                INSERT INTO solutions (key, is_check, checkmate, stalemate, mate, mate_in, searched, last_used)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (key) DO UPDATE SET
+                    is_check = COALESCE(excluded.is_check, is_check),
+                    checkmate = COALESCE(excluded.checkmate, checkmate),
+                    stalemate = COALESCE(excluded.stalemate, stalemate),
+                    mate = CASE WHEN mate_in IS NULL OR excluded.mate_in < mate_in
+                                THEN COALESCE(excluded.mate, mate) ELSE mate END,
+                    mate_in = CASE WHEN mate_in IS NULL OR excluded.mate_in < mate_in
+                                   THEN COALESCE(excluded.mate_in, mate_in) ELSE mate_in END,
+                    searched = CASE WHEN searched IS NULL OR excluded.searched > searched
+                                    THEN COALESCE(excluded.searched, searched) ELSE searched END,
+                    last_used = excluded.last_used''', rows)
+            if self.max_entries is not None:
+                self._db.execute(
+                    'DELETE FROM solutions WHERE key IN (SELECT key FROM solutions '
+                    'ORDER BY last_used DESC LIMIT -1 OFFSET ?)', (self.max_entries,))
+    #endregion
+
+    # < Position Methods >
+    #region
+    def get_solution(self, B: Board, side: bool) -> Solution | None:
+        '''
+        returns the stored Solution of B with side to move, with the mate line
+        turned into the orientation of B, or None if nothing is stored
+
+        [arguments]
+        B: Board
+        side: bool
+
+        [return]
+        object: Solution or None
+        '''
+        return self.get_canonical(*canonical_board(B), side)
+
+    def get_canonical(self, C: Board, transform: int, side: bool) -> Solution | None:
+        '''
+        get_solution for a board whose canonical board C and transform (as
+        returned by canonical_board) are already known
+
+        [arguments]
+        C: Board - The canonical board
+        transform: int - The transform from the board to C
+        side: bool
+
+        [return]
+        object: Solution or None
+        '''
+        key = self.canonical_key(C, side)
+        solution = self.get_many([key]).get(key)
+        if solution is None or solution.mate is None:
+            return solution
+        back = inverse_transform(transform)
+        return solution._replace(mate=tuple(_transform_move(move, C[0], back) for move in solution.mate))
+
+    def put_solution(self, B: Board, side: bool, **values) -> None:
+        '''
+        stores what is known about B with side to move: any of the Solution
+        fields check, checkmate, stalemate, mate (a line on B) and searched;
+        mate_in follows from the mate line
+
+        [arguments]
+        B: Board
+        side: bool
+        values: The Solution fields
+        '''
+        self.put_canonical(*canonical_board(B), side, **values)
+
+    def put_canonical(self, C: Board, transform: int, side: bool, **values) -> None:
+        '''
+        put_solution for a board whose canonical board C and transform (as
+        returned by canonical_board) are already known; the mate line is on
+        the board, not on C
+
+        [arguments]
+        C: Board - The canonical board
+        transform: int - The transform from the board to C
+        side: bool
+        values: The Solution fields
+        '''
+        mate = values.pop('mate', None)
+        if mate is not None:
+            values['mate'] = tuple(_transform_move(move, C[0], transform) for move in mate)
+            values['mate_in'] = (len(mate) + 1) // 2
+        self.put_many({self.canonical_key(C, side): Solution(**values)})
+    #endregion
+
+    def _transaction(self) -> '_Transaction':
+        '''
+        returns a context which runs its statements in one write transaction,
+        taking the write lock at the start so that concurrent writers queue
+
+        [return]
+        object: _Transaction
+        '''
+        return _Transaction(self._db)
+#endregion
+
+# < Transaction Class >
+#region
+class _Transaction:
+    '''
+    _Transaction class
+
+    BEGIN IMMEDIATE ... COMMIT (ROLLBACK on an exception) on a connection
+    in autocommit mode
+
+    Created: 2026-10-16
+    Updated: 2026-10-16
+    '''
+
+    def __init__(self, db: sqlite3.Connection):
+        self._db = db
+
+    def __enter__(self) -> None:
+        self._db.execute('BEGIN IMMEDIATE')
+
+    def __exit__(self, exc_type, *exc) -> None:
+        self._db.execute('ROLLBACK' if exc_type else 'COMMIT')
+#endregion
+
+
+# ---------------
+# Static Methods
+# ---------------
+# < Conversion Methods >
+#region
+def _flag(value: int | None) -> bool | None:
+    '''
+    converts a stored flag to a bool, keeping None for unknown
+    '''
+    return None if value is None else bool(value)
+
+
+def _int(value: bool | None) -> int | None:
+    '''
+    converts a bool to a stored flag, keeping None for unknown
+    '''
+    return None if value is None else int(value)
+
+
+def _transform_move(move: tuple[int, int, int, int], size: int, transform: int) -> tuple[int, int, int, int]:
+    '''
+    returns move under transform on a board of size
+
+    [arguments]
+    move: tuple[int, int, int, int]
+    size: int
+    transform: int
+
+    [return]
+    tuple[int, int, int, int]
+    '''
+    return transform_square(move[0], move[1], size, transform) + transform_square(move[2], move[3], size, transform)
+#endregion
@@ -0,0 +1,489 @@
+'''Chess Puzzle Endgame Tablebases
+
+Retrograde analysis of small King and Bishop endings for the chess puzzle
+programming course work. A tablebase labels every position of one material
+signature on one board size as a win, draw or loss for the side to move,
+with the distance to mate in plies, and is stored as a flat array of
+16-bit values which is memory-mapped when probed.
+
+A material signature lists the white pieces, 'v', then the black pieces,
+kings first, e.g. 'KBBvK' or 'KBvKB'. The pieces of a position are indexed
+in that order: index = ((k * M + s1) * M + ...) * 2 + (0 if White is to
+move else 1), where M = size * size and s = (y - 1) * size + (x - 1).
+Positions are first rotated or reflected so that the white king stands in
+the triangle 1 <= y <= x <= (size + 1) // 2, and k is its number within
+that triangle, which makes the tables up to 8 times smaller.
+
+Practical for up to about four pieces on boards up to 5x5, or three pieces
+up to 8x8; the number of positions grows as size ** (2 * pieces).
+
+Author : Serika Kawano
+Created: 2026-10-16
+Updated: 2026-10-16
+'''
+
+import glob
+import heapq
+import itertools
+import mmap
+import os
+import struct
+from array import array
+from functools import lru_cache
+
+from chess_puzzle import (SYMMETRIES, Bishop, Board, King, Piece, analyse_position, find_checkers,
+                          piece_legal_moves, register_tablebase, transform_square)
+
+
+# < Format Variables >
+#region
+# The file format: b'CPTB' files index the white king on every square and are
+# read wrongly by the triangle indexing, so they are rejected
+MAGIC = b'CPT2'
+HEADER = struct.Struct('<4sBB26s')
+
+DRAW = 0
+WIN = 1
+LOSS = 2
+ILLEGAL = 0xFFFF
+RESULTS = {DRAW: 'draw', WIN: 'win', LOSS: 'loss'}
+#endregion
+
+
+# ---------------
+# Classes
+# ---------------
+# < Tablebase Class >
+#region
+class Tablebase:
+    '''
+    Tablebase class
+
+    Memory-mapped tablebase file of one material signature and board size;
+    the pages are shared between all processes probing the same file
+
+    Created: 2026-10-16
+    Updated: 2026-10-16
+    '''
+
+    def __init__(self, filename: str):
+        '''
+        Constructor
+
+        [arguments]
+        filename: str - The tablebase file to open
+        '''
+        with open(filename, 'rb') as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.size, length, signature = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self._map.close()
+            raise ValueError(f'{filename} is not a tablebase of this version (rebuild it).')
+        self.signature = signature[:length].decode('ascii')
+        self._kinds = parse_signature(self.signature)
+        self._values = memoryview(self._map)[HEADER.size:].cast('H')
+
+    def __enter__(self) -> 'Tablebase':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def probe(self, B: Board, side: bool) -> tuple[str, int] | None:
+        '''
+        [specification]
+        returns ('win', 'draw' or 'loss' for side to move on B, distance to mate in plies),
+        or None if B does not have the material and size of this tablebase
+        or is not a legal position
+
+        [arguments]
+        B: Board
+        side: bool
+
+        [return]
+        tuple[str, int] or None
+        '''
+        if B[0] != self.size:
+            return None
+        squares = board_squares(B, self._kinds)
+        if squares is None:
+            return None
+        value = self._values[position_index(squares, self.size, side)]
+        if value == ILLEGAL:
+            return None
+        return RESULTS[value & 3], value >> 2
+
+    def close(self) -> None:
+        '''
+        unmaps the file
+        '''
+        self._values.release()
+        self._map.close()
+#endregion
+
+
+# ---------------
+# Static Methods
+# ---------------
+# < Index Methods >
+#region
+def parse_signature(signature: str) -> list[tuple[str, bool]]:
+    '''
+    converts a material signature to the (symbol, side) of each piece in index order
+
+    [arguments]
+    signature: str
+
+    [return]
+    list[tuple[str, bool]]
+    '''
+    white, _, black = signature.partition('v')
+    for pieces in (white, black):
+        if not pieces.startswith('K') or pieces.count('K') != 1 or set(pieces) - {'K', 'B'}:
+            raise ValueError(f'Invalid material signature: {signature}')
+    white = 'K' + ''.join(sorted(white[1:]))
+    black = 'K' + ''.join(sorted(black[1:]))
+    return [(symbol, True) for symbol in white] + [(symbol, False) for symbol in black]
+
+
+def board_signature(B: Board) -> str:
+    '''
+    returns the material signature of board B
+
+    [arguments]
+    B: Board
+
+    [return]
+    str
+    '''
+    sides = []
+    for side in (True, False):
+        symbols = sorted(p.symbol for p in B[1] if p.side == side)
+        sides.append('K' * symbols.count('K') + ''.join(s for s in symbols if s != 'K'))
+    return 'v'.join(sides)
+
+
+def board_squares(B: Board, kinds: list[tuple[str, bool]]) -> list[int] | None:
+    '''
+    returns the square numbers of the pieces of B in the index order of kinds,
+    or None if B has other material
+
+    [arguments]
+    B: Board
+    kinds: list[tuple[str, bool]]
+
+    [return]
+    list[int] or None
+    '''
+    if len(B[1]) != len(kinds):
+        return None
+    size = B[0]
+    groups: dict[tuple[str, bool], list[int]] = {}
+    for piece in B[1]:
+        groups.setdefault((piece.symbol, piece.side), []).append((piece.pos_y - 1) * size + piece.pos_x - 1)
+    squares = []
+    for kind in kinds:
+        group = groups.get(kind)
+        if not group:
+            return None
+        squares.append(group.pop())
+    return squares
+
+
+def position_index(squares: list[int], size: int, side: bool) -> int:
+    '''
+    returns the index of the position with pieces on squares and side to move,
+    after turning the board so that the white king (squares[0]) is in the triangle
+
+    [arguments]
+    squares: list[int]
+    size: int
+    side: bool
+
+    [return]
+    int
+    '''
+    maps, king_transform, triangle_index, _ = symmetry_tables(size)
+    square_map = maps[king_transform[squares[0]]]
+    count = size * size
+    index = triangle_index[square_map[squares[0]]]
+    for square in squares[1:]:
+        index = index * count + square_map[square]
+    return index * 2 + (0 if side else 1)
+
+
+@lru_cache(maxsize=None)
+def symmetry_tables(size: int) -> tuple[list[list[int]], list[int], dict[int, int], list[int]]:
+    '''
+    returns the tables used to index positions of a board size: the square
+    numbers under each transform, the transform bringing each square into the
+    triangle, the number of each triangle square and the triangle squares
+
+    [arguments]
+    size: int
+
+    [return]
+    tuple[list[list[int]], list[int], dict[int, int], list[int]]
+    '''
+    def number(x: int, y: int) -> int:
+        return (y - 1) * size + x - 1
+
+    half = (size + 1) // 2
+    triangle = [number(x, y) for x in range(1, half + 1) for y in range(1, x + 1)]
+    triangle_index = {square: i for i, square in enumerate(triangle)}
+    maps = [[0] * (size * size) for _ in range(SYMMETRIES)]
+    king_transform = [0] * (size * size)
+    for x in range(1, size + 1):
+        for y in range(1, size + 1):
+            for t in range(SYMMETRIES):
+                maps[t][number(x, y)] = number(*transform_square(x, y, size, t))
+            king_transform[number(x, y)] = next(
+                t for t in range(SYMMETRIES) if maps[t][number(x, y)] in triangle_index)
+    return maps, king_transform, triangle_index, triangle
+#endregion
+
+# < Generation Methods >
+#region
+def generate(signature: str, size: int, tables: dict[str, array] | None = None) -> array:
+    '''
+    [specification]
+    labels every position of signature on a board of size by retrograde analysis
+    checkmates are losses in 0 plies; from there results are propagated back
+    along the reversed move graph in order of distance: a position is won as
+    soon as one move reaches a lost position, and lost once every move
+    reaches a won one; positions never labelled are draws
+    captures lead into the tablebase of the smaller material, which is
+    generated first (and kept in tables)
+
+    [arguments]
+    signature: str
+    size: int
+    tables: dict[str, array] | None - The tablebases already generated for size, by signature
+
+    [return]
+    array - One 16-bit value per position index: ILLEGAL, or (distance << 2) | result
+    '''
+    if tables is None:
+        tables = {}
+    kinds = parse_signature(signature)
+    signature = _signature_of(kinds)
+    if signature in tables:
+        return tables[signature]
+    count = size * size
+    triangle = symmetry_tables(size)[3]
+    total = len(triangle) * count ** (len(kinds) - 1) * 2
+
+    # 1. Tablebases reached by capturing each bishop
+    captures: dict[int, array] = {}
+    for i, (symbol, _) in enumerate(kinds):
+        if symbol == 'B':
+            captures[i] = generate(_signature_of(kinds[:i] + kinds[i + 1:]), size, tables)
+
+    # 2. Forward pass: legal moves of every position, as edges to other indices
+    values = array('H', [ILLEGAL]) * total
+    moves_left = array('i', [0]) * total
+    edge_start = array('q', [0]) * (total + 1)
+    edges = array('q')
+    heap: list[tuple[int, int, int, bool]] = []
+    pieces: list[Piece] = [(King if symbol == 'K' else Bishop)(1, 1, side) for symbol, side in kinds]
+    index = 0
+    for squares in itertools.product(triangle, *[range(count)] * (len(kinds) - 1)):
+        board = _place(pieces, squares, size)
+        for side in (True, False):
+            edge_start[index] = len(edges)
+            if board is not None and not find_checkers(board.kings[not side], board):
+                _expand(board, side, index, squares, size, kinds, captures, values, moves_left, edges, heap)
+            index += 1
+    edge_start[total] = len(edges)
+
+    # 3. Reverse the edges, so that each position lists the positions moving into it
+    parent_start = array('q', [0]) * (total + 1)
+    for child in edges:
+        parent_start[child + 1] += 1
+    for i in range(total):
+        parent_start[i + 1] += parent_start[i]
+    parents = array('q', [0]) * len(edges)
+    filled = array('q', parent_start[:total])
+    for parent in range(total):
+        for k in range(edge_start[parent], edge_start[parent + 1]):
+            child = edges[k]
+            parents[filled[child]] = parent
+            filled[child] += 1
+
+    # 4. Backward pass in order of distance
+    while heap:
+        distance, result, index, seed = heapq.heappop(heap)
+        targets = [index] if seed else parents[parent_start[index]:parent_start[index + 1]]
+        for parent in targets:
+            if moves_left[parent] < 0:
+                continue
+            if result == LOSS:
+                _label(parent, WIN, distance + 1, values, moves_left, heap)
+            elif result == WIN:
+                moves_left[parent] -= 1
+                if moves_left[parent] == 0:
+                    _label(parent, LOSS, distance + 1, values, moves_left, heap)
+
+    # 5. Return
+    tables[signature] = values
+    return values
+
+
+def _signature_of(kinds: list[tuple[str, bool]]) -> str:
+    '''
+    returns the material signature of pieces in index order
+
+    [arguments]
+    kinds: list[tuple[str, bool]]
+
+    [return]
+    str
+    '''
+    return ''.join(s for s, side in kinds if side) + 'v' + ''.join(s for s, side in kinds if not side)
+
+
+def _place(pieces: list[Piece], squares: tuple[int, ...], size: int) -> Board | None:
+    '''
+    puts pieces on squares and returns the board, or None if two pieces share a square
+
+    [arguments]
+    pieces: list[Piece]
+    squares: tuple[int, ...]
+    size: int
+
+    [return]
+    object: Board or None
+    '''
+    if len(set(squares)) != len(squares):
+        return None
+    for piece, square in zip(pieces, squares):
+        piece._pos_y, piece._pos_x = divmod(square, size)
+        piece._pos_x += 1
+        piece._pos_y += 1
+    return Board((size, list(pieces)))
+
+
+def _expand(board: Board, side: bool, index: int, squares: tuple[int, ...], size: int,
+            kinds: list[tuple[str, bool]], captures: dict[int, array], values: array,
+            moves_left: array, edges: array, heap: list) -> None:
+    '''
+    records the moves of a legal position: quiet moves become edges, captures
+    are looked up in the smaller tablebase and queued as seeds, and positions
+    without moves are labelled as checkmate (queued) or stalemate
+
+    [arguments]
+    board: Board
+    side: bool
+    index: int
+    squares: tuple[int, ...]
+    size: int
+    kinds: list[tuple[str, bool]]
+    captures: dict[int, array]
+    values: array
+    moves_left: array
+    edges: array
+    heap: list
+    '''
+    values[index] = DRAW
+    info = analyse_position(side, board)
+    order = {id(piece): i for i, piece in enumerate(board[1])}
+    moves = 0
+    for i, piece in enumerate(board[1]):
+        if piece.side != side:
+            continue
+        for _, x, y in piece_legal_moves(piece, board, info):
+            moves += 1
+            target = (y - 1) * size + x - 1
+            child = list(squares)
+            child[i] = target
+            captured = board.occupancy.get((x, y))
+            if captured is None:
+                edges.append(position_index(child, size, not side))
+                continue
+            c = order[id(captured)]
+            del child[c]
+            value = captures[c][position_index(child, size, not side)]
+            if value & 3 != DRAW:
+                heapq.heappush(heap, (value >> 2, value & 3, index, True))
+    moves_left[index] = moves
+    if moves == 0 and info.is_check():
+        _label(index, LOSS, 0, values, moves_left, heap)
+
+
+def _label(index: int, result: int, distance: int, values: array, moves_left: array, heap: list) -> None:
+    '''
+    labels a position and queues it for its parents
+
+    [arguments]
+    index: int
+    result: int
+    distance: int
+    values: array
+    moves_left: array
+    heap: list
+    '''
+    values[index] = (distance << 2) | result
+    moves_left[index] = -1
+    heapq.heappush(heap, (distance, result, index, False))
+#endregion
+
+# < File Methods >
+#region
+def save_tablebase(filename: str, signature: str, size: int, values: array) -> None:
+    '''
+    writes a generated tablebase into a file
+
+    [arguments]
+    filename: str
+    signature: str
+    size: int
+    values: array
+    '''
+    signature = _signature_of(parse_signature(signature))
+    with open(filename, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, size, len(signature), signature.encode('ascii')))
+        file.write(values.tobytes())
+
+
+def build_tablebases(signature: str, size: int, directory: str) -> list[str]:
+    '''
+    generates the tablebase of signature on size, with every smaller tablebase
+    reached by captures, and writes each one into directory as SIGNATURE_SIZE.cptb
+
+    [arguments]
+    signature: str
+    size: int
+    directory: str
+
+    [return]
+    list[str] - The files written
+    '''
+    tables: dict[str, array] = {}
+    generate(signature, size, tables)
+    os.makedirs(directory, exist_ok=True)
+    filenames = []
+    for name, values in tables.items():
+        filename = os.path.join(directory, f'{name}_{size}.cptb')
+        save_tablebase(filename, name, size, values)
+        filenames.append(filename)
+    return filenames
+
+
+def load_tablebases(directory: str) -> list[Tablebase]:
+    '''
+    opens every tablebase file in directory and registers it with the
+    chess puzzle module, so find_black_move and solve_mate probe it
+
+    [arguments]
+    directory: str
+
+    [return]
+    list[Tablebase]
+    '''
+    loaded = []
+    for filename in sorted(glob.glob(os.path.join(directory, '*.cptb'))):
+        tablebase = Tablebase(filename)
+        register_tablebase(tablebase)
+        loaded.append(tablebase)
+    return loaded
+#endregion
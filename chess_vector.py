@@ -0,0 +1,260 @@
+'''Chess Puzzle Vectorised Classification
+
+Classifies many board configurations of the same size at once with NumPy.
+A stack of n boards of size N is an int8 array of shape (n, N, N) indexed
+[board, y - 1, x - 1], holding 0 for an empty square, KING or BISHOP for a
+white piece and -KING or -BISHOP for a black piece.
+
+Requires NumPy.
+
+Author : Serika Kawano
+Created: 2026-10-16
+Updated: 2026-10-16
+'''
+
+from functools import lru_cache
+from typing import Sequence
+
+import numpy as np
+
+from chess_puzzle import Bishop, Board, King, Piece, has_legal_move
+
+
+# < Code Variables >
+#region
+KING = 1
+BISHOP = 2
+
+# The value of the square past the edge which pads the index tables (see square_tables)
+OFF_BOARD = 127
+
+DIAGONALS = ((1, 1), (-1, 1), (1, -1), (-1, -1))
+NEIGHBOURS = tuple((dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1) if dx or dy)
+#endregion
+
+
+# ---------------
+# Static Methods
+# ---------------
+# < Stack Methods >
+#region
+def stack_boards(boards: Sequence[Board]) -> np.ndarray:
+    '''
+    converts board configurations of the same size to a stack of occupancy arrays
+
+    [arguments]
+    boards: Sequence[Board]
+
+    [return]
+    np.ndarray - int8 array of shape (len(boards), N, N)
+    '''
+    if not boards:
+        raise ValueError('There must be at least one board.')
+    size = boards[0][0]
+    grid = np.zeros((len(boards), size, size), dtype=np.int8)
+    for i, B in enumerate(boards):
+        if B[0] != size:
+            raise ValueError(f'All boards must have size {size}. Board {i} has size {B[0]}.')
+        for piece in B[1]:
+            code = KING if isinstance(piece, King) else BISHOP
+            grid[i, piece.pos_y - 1, piece.pos_x - 1] = code if piece.side else -code
+    return grid
+
+
+def unstack_board(grid: np.ndarray, i: int) -> Board:
+    '''
+    converts board i of a stack of occupancy arrays back to a board configuration
+
+    [arguments]
+    grid: np.ndarray
+    i: int
+
+    [return]
+    object: Board
+    '''
+    pieces: list[Piece] = []
+    for y, x in zip(*np.nonzero(grid[i])):
+        code = int(grid[i, y, x])
+        kind = King if abs(code) == KING else Bishop
+        pieces.append(kind(int(x) + 1, int(y) + 1, code > 0))
+    return Board((grid.shape[1], pieces))
+
+
+@lru_cache(maxsize=None)
+def square_tables(size: int) -> tuple[np.ndarray, np.ndarray]:
+    '''
+    returns the index tables of size, over squares s = (y - 1) * size + (x - 1)
+    and one off-board square s = size * size which pads them (see OFF_BOARD)
+    rays[s, d] - the squares along diagonal d from s outwards, shape (size * size + 1, 4, size - 1)
+    neighbours[s] - the squares next to s, shape (size * size + 1, 8)
+
+    [arguments]
+    size: int
+
+    [return]
+    tuple[np.ndarray, np.ndarray] - rays and neighbours
+    '''
+    off = size * size
+    rays = np.full((off + 1, len(DIAGONALS), max(size - 1, 1)), off, dtype=np.intp)
+    neighbours = np.full((off + 1, len(NEIGHBOURS)), off, dtype=np.intp)
+    for x in range(size):
+        for y in range(size):
+            for d, (dx, dy) in enumerate(DIAGONALS):
+                for step in range(1, size):
+                    if not (0 <= x + dx * step < size and 0 <= y + dy * step < size):
+                        break
+                    rays[y * size + x, d, step - 1] = (y + dy * step) * size + x + dx * step
+            for d, (dx, dy) in enumerate(NEIGHBOURS):
+                if 0 <= x + dx < size and 0 <= y + dy < size:
+                    neighbours[y * size + x, d] = (y + dy) * size + x + dx
+    return rays, neighbours
+
+
+def _flatten(grid: np.ndarray) -> np.ndarray:
+    '''
+    returns the stack as rows of squares, with the off-board square appended
+
+    [arguments]
+    grid: np.ndarray
+
+    [return]
+    np.ndarray - int8 array of shape (n, N * N + 1)
+    '''
+    n = grid.shape[0]
+    return np.concatenate([grid.reshape(n, -1), np.full((n, 1), OFF_BOARD, dtype=np.int8)], axis=1)
+
+
+def _first_piece(values: np.ndarray) -> np.ndarray:
+    '''
+    returns the first non-empty value along the last axis (0 if there is none)
+
+    [arguments]
+    values: np.ndarray
+
+    [return]
+    np.ndarray
+    '''
+    first = (values != 0).argmax(axis=-1)
+    return np.take_along_axis(values, first[..., None], axis=-1)[..., 0]
+#endregion
+
+# < Attack Methods >
+#region
+def _attacked(flat: np.ndarray, boards: np.ndarray, squares: np.ndarray, side: bool, size: int,
+              ignore: int = 0) -> np.ndarray:
+    '''
+    checks if side attacks squares[i] on board boards[i] of the stack, looking
+    outwards from each square along its diagonals and neighbours (like find_checkers)
+
+    [arguments]
+    flat: np.ndarray - The flattened stack (see _flatten)
+    boards: np.ndarray - Board indices of shape (m,)
+    squares: np.ndarray - Square indices of shape (m,)
+    side: bool - The attacking side
+    size: int
+    ignore: int - A piece code treated as an empty square (0 for none)
+
+    [return]
+    np.ndarray - bool array of shape (m,)
+    '''
+    sign = 1 if side else -1
+    rays, neighbours = square_tables(size)
+    # Offsets of the boards, so that squares index the flattened stack as one array
+    rows = boards * flat.shape[1]
+    cells = flat.ravel()
+
+    # 1. Bishops which are the first piece along a diagonal
+    along = cells.take(rays[squares] + rows[:, None, None])
+    if ignore:
+        along[along == ignore] = 0
+    attacked = (_first_piece(along) == sign * BISHOP).any(axis=1)
+
+    # 2. Kings next to the square
+    return attacked | (cells.take(neighbours[squares] + rows[:, None]) == sign * KING).any(axis=1)
+
+
+def batch_is_check(grid: np.ndarray, side: bool) -> np.ndarray:
+    '''
+    checks if each board of the stack is check for side
+
+    [arguments]
+    grid: np.ndarray
+    side: bool
+
+    [return]
+    np.ndarray - bool array of shape (n,)
+    '''
+    flat = _flatten(grid)
+    king = (flat == (KING if side else -KING)).argmax(axis=1)
+    return _attacked(flat, np.arange(len(flat)), king, not side, grid.shape[1])
+
+
+def king_escapes(grid: np.ndarray, side: bool) -> np.ndarray:
+    '''
+    checks if the king of side can move to a square which is neither
+    occupied by its own side nor attacked, on each board of the stack
+    (the king does not block the bishops attacking the squares it leaves for)
+
+    [arguments]
+    grid: np.ndarray
+    side: bool
+
+    [return]
+    np.ndarray - bool array of shape (n,)
+    '''
+    sign = 1 if side else -1
+    flat = _flatten(grid)
+    _, neighbours = square_tables(grid.shape[1])
+
+    # 1. The squares next to each king which are on the board and not taken by its own side
+    targets = neighbours[(flat == sign * KING).argmax(axis=1)]
+    values = np.take_along_axis(flat, targets, axis=1)
+    boards, slots = np.nonzero((values != OFF_BOARD) & (values * sign <= 0))
+    squares = targets[boards, slots]
+
+    # 2. An escape is one of them which is not attacked
+    safe = ~_attacked(flat, boards, squares, not side, grid.shape[1], ignore=sign * KING)
+    escape = np.zeros(len(flat), dtype=bool)
+    escape[boards[safe]] = True
+    return escape
+#endregion
+
+# < Classification Methods >
+#region
+def batch_classify(boards: Sequence[Board] | np.ndarray, side: bool) -> dict[str, np.ndarray]:
+    '''
+    classifies every board for side as check, checkmate and stalemate
+    check and king escapes are computed for the whole stack with array
+    operations; only boards where the king has no escape, where a bishop move
+    could still decide the answer, are passed to has_legal_move one by one
+
+    [arguments]
+    boards: Sequence[Board] or np.ndarray - The boards, or their stack of occupancy arrays
+    side: bool
+
+    [return]
+    dict[str, np.ndarray] - bool arrays of shape (n,) for 'check', 'escape', 'checkmate' and 'stalemate'
+    '''
+    if isinstance(boards, np.ndarray):
+        grid, boards = boards, None
+    else:
+        grid = stack_boards(boards)
+
+    # 1. Array operations over the whole stack
+    check = batch_is_check(grid, side)
+    escape = king_escapes(grid, side)
+
+    # 2. Without a king escape, look for another legal move
+    mobile = escape.copy()
+    for i in np.flatnonzero(~escape):
+        B = boards[i] if boards is not None else unstack_board(grid, i)
+        mobile[i] = has_legal_move(side, B)
+
+    # 3. Return
+    return {
+        'check': check,
+        'escape': escape,
+        'checkmate': check & ~mobile,
+        'stalemate': ~check & ~mobile,
+    }
+#endregion
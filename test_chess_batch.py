@@ -0,0 +1,73 @@
+import io
+import json
+
+import pytest
+from chess_batch import *
+
+
+def test_classify_file1():
+    result = classify_file("board_examp.txt")
+    assert result['size'] == 5
+    assert result['white']['check'] == False
+    assert result['black']['checkmate'] == False
+
+def test_classify_file2(tmp_path):
+    path = tmp_path / "bad.txt"
+    path.write_text("2\nKa1\nKb2\n")
+    assert 'error' in classify_file(str(path))
+
+def test_run_batch1(tmp_path):
+    (tmp_path / "a.txt").write_text("5\nBb5, Kc5, Bd4, Bc1\nKb3, Bc3, Be3\n")
+    (tmp_path / "b.txt").write_text("3\nKa3, Bc2\nKa1\n")
+    (tmp_path / "notes.md").write_text("not a board")
+    output = io.StringIO()
+    assert run_batch(iter_board_files(str(tmp_path)), output, workers=2, chunk_size=1) == 2
+    results = {json.loads(line)['file'][-5:]: json.loads(line) for line in output.getvalue().splitlines()}
+    assert results['b.txt']['black']['stalemate'] == True
+    assert results['a.txt']['size'] == 5
+
+def test_run_batch2(tmp_path):
+    (tmp_path / "a.txt").write_text("5\nKa3, Bb1, Bc5\nKa5\n")
+    (tmp_path / "b.txt").write_text("5\nKe3, Bd5, Bc1\nKe1\n")
+    (tmp_path / "c.txt").write_text("3\nKa3, Bc2\nKa1\n")
+    output = io.StringIO()
+    assert run_batch(iter_board_files(str(tmp_path)), output, workers=1, mate_depth=2, dedupe=True) == 3
+    results = {json.loads(line)['file'][-5:]: json.loads(line) for line in output.getvalue().splitlines()}
+    assert results['a.txt']['mate'] == ['c5b4', 'a5b5', 'b1d3']
+    assert results['b.txt']['duplicate_of'].endswith('a.txt')
+    assert results['b.txt']['mate'] == ['c1d2', 'e1d1', 'd5b3']
+    assert 'duplicate_of' not in results['c.txt']
+
+def test_run_batch3(tmp_path):
+    # duplicates solved by different workers are still marked
+    (tmp_path / "a.txt").write_text("5\nKa3, Bb1, Bc5\nKa5\n")
+    (tmp_path / "b.txt").write_text("5\nKe3, Bd5, Bc1\nKe1\n")
+    output = io.StringIO()
+    assert run_batch(iter_board_files(str(tmp_path)), output, workers=2, chunk_size=1, dedupe=True) == 2
+    results = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert 'duplicate_of' not in results[0]
+    assert results[1]['duplicate_of'] == results[0]['file']
+    assert all('canonical' not in result for result in results)
+
+def test_classify_file3(tmp_path):
+    (tmp_path / "a.txt").write_text("5\nKa3, Bb1, Bc5\nKa5\n")
+    (tmp_path / "b.txt").write_text("5\nKe3, Bd5, Bc1\nKe1\n")
+    first = classify_file(str(tmp_path / "a.txt"), 2, dedupe=True)
+    second = classify_file(str(tmp_path / "b.txt"), 2, dedupe=True)
+    assert first['canonical'] == second['canonical']
+    assert second['duplicate_of'] == first['file']
+    assert second['mate'] == ['c1d2', 'e1d1', 'd5b3']
+
+def test_classify_file4(tmp_path, monkeypatch):
+    # one canonical board per board, shared by the memo, the store and the mate search
+    import chess_batch, chess_puzzle, chess_store
+    canonical_board, calls = chess_puzzle.canonical_board, []
+    def counted(B):
+        calls.append(B)
+        return canonical_board(B)
+    for module in (chess_batch, chess_puzzle, chess_store):
+        monkeypatch.setattr(module, "canonical_board", counted)
+    (tmp_path / "a.txt").write_text("5\nKa3, Bb1, Bc5\nKa5\n")
+    result = classify_file(str(tmp_path / "a.txt"), 2, store=str(tmp_path / "s.db"), dedupe=True)
+    assert result['mate'] == ['c5b4', 'a5b5', 'b1d3']
+    assert len(calls) == 1
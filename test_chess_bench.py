@@ -0,0 +1,27 @@
+import pytest
+from chess_puzzle import *
+from chess_bench import *
+
+
+def test_standard_position1():
+    for size in SIZES:
+        B = standard_position(size)
+        assert is_check(True, B) == False
+        assert is_check(False, B) == False
+
+def test_run_benchmarks1():
+    max_entries = result_cache.max_entries
+    results = run_benchmarks((5,), min_time=0.001)
+    assert set(results) == {'perft/5', 'is_check/5', 'is_checkmate/5', 'conf2unicode/5'}
+    assert results['perft/5']['nodes'] == perft(standard_position(5), True, PERFT_DEPTHS[5])
+    assert all(result['rate'] > 0 for result in results.values())
+    assert result_cache.max_entries == max_entries
+
+def test_compare1(tmp_path):
+    path = str(tmp_path / "baseline.json")
+    results = {'perft/5': {'rate': 1000.0, 'unit': 'nodes/s'}, 'is_check/5': {'rate': 500.0, 'unit': 'calls/s'}}
+    save_baseline(path, results)
+    slower = {'perft/5': {'rate': 800.0, 'unit': 'nodes/s'}, 'is_check/5': {'rate': 480.0, 'unit': 'calls/s'}}
+    rows = {name: regressed for name, _, _, regressed in compare(slower, load_baseline(path), 0.1)}
+    assert rows == {'perft/5': True, 'is_check/5': False}
+    assert 'REGRESSION' in format_report(slower, compare(slower, load_baseline(path)))
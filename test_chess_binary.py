@@ -0,0 +1,39 @@
+import pytest
+from chess_puzzle import *
+from chess_binary import *
+
+
+def test_encode_board1():
+    B = read_board("board_examp.txt")
+    record = encode_board(B)
+    assert len(record) == 1 + 2 * len(B[1])
+    assert board_to_plain(decode_board(record)) == board_to_plain(B)
+
+def test_encode_board2():
+    B = Board((26, [King(26,26,True), King(1,1,False), Bishop(13,7,True)]))
+    assert board_to_plain(decode_board(encode_board(B))) == board_to_plain(B)
+
+def test_archive1(tmp_path):
+    boards = [read_board("board_examp.txt"), Board((3, [King(1,3,True), Bishop(3,2,True), King(1,1,False)]))] * 50
+    path = str(tmp_path / "boards.cpb")
+    assert write_archive(path, boards) == 100
+    with BoardArchive(path) as archive:
+        assert len(archive) == 100
+        assert board_to_plain(archive[51]) == board_to_plain(boards[1])
+        assert board_to_plain(archive[-2]) == board_to_plain(boards[0])
+        with pytest.raises(IndexError):
+            archive[100]
+
+def test_archive2(tmp_path):
+    # a truncated index is rejected when the file opens
+    path = tmp_path / "boards.cpb"
+    write_archive(str(path), [read_board("board_examp.txt")] * 3)
+    path.write_bytes(path.read_bytes()[:-8])
+    with pytest.raises(ValueError):
+        BoardArchive(str(path))
+
+def test_plain_to_binary1(tmp_path):
+    path = str(tmp_path / "board.cpb")
+    assert plain_to_binary("board_examp.txt", path) == 1
+    assert binary_to_plain(path, str(tmp_path / "board.txt")) == 1
+    assert board_to_plain(read_board(str(tmp_path / "board.txt"))) == board_to_plain(read_board("board_examp.txt"))
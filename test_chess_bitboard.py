@@ -0,0 +1,51 @@
+import random
+
+import pytest
+from chess_puzzle import *
+import chess_bitboard
+
+
+wb1 = Bishop(2,5,True)
+wb3 = Bishop(3,1,True)
+wb4 = Bishop(5,5,True)
+wb5 = Bishop(4,1,True)
+
+wk1 = King(3,5,True)
+wk1a = King(2,5,True)
+
+bb1 = Bishop(3,3,False)
+bb2 = Bishop(5,3,False)
+bb3 = Bishop(1,2,False)
+
+bk1 = King(2,3,False)
+
+
+def random_board(size, rng):
+    squares = rng.sample([(x, y) for x in range(1, size + 1) for y in range(1, size + 1)], rng.randint(2, 7))
+    pieces = [King(*squares[0], True), King(*squares[1], False)]
+    for x, y in squares[2:]:
+        pieces.append(Bishop(x, y, rng.random() < 0.5))
+    return Board((size, pieces))
+
+
+def test_is_check1():
+    B2 = (5, [wb1, wk1, bk1, bb1, bb2, wb3])
+    assert chess_bitboard.is_check(True, B2) == True
+
+def test_is_checkmate1():
+    B3 = (5, [wk1a, wb4, bk1, bb2, bb3, wb3, wb5])
+    assert chess_bitboard.is_checkmate(False, B3) == True
+    assert chess_bitboard.is_stalemate(False, B3) == False
+
+def test_is_stalemate1():
+    B4 = (3, [King(1,1,False), King(1,3,True), Bishop(3,2,True)])
+    assert chess_bitboard.is_check(False, B4) == False
+    assert chess_bitboard.is_stalemate(False, B4) == True
+
+def test_matches_pieces1():
+    rng = random.Random(1)
+    for _ in range(200):
+        B = random_board(rng.choice([3, 5, 8]), rng)
+        for side in (True, False):
+            assert chess_bitboard.is_check(side, B) == is_check(side, B)
+            assert chess_bitboard.is_checkmate(side, B) == is_checkmate(side, B)
@@ -0,0 +1,95 @@
+import io
+import json
+import os
+import signal
+
+import pytest
+import chess_puzzle
+import chess_instrument
+from chess_puzzle import Bishop, Board, King
+
+
+@pytest.fixture
+def instrumented():
+    chess_instrument.reset()
+    chess_instrument.enable()
+    yield
+    chess_instrument.disable()
+    chess_instrument.reset()
+
+
+def test_enable1(instrumented):
+    B = chess_puzzle.read_board("board_examp.txt")
+    chess_puzzle.is_checkmate(True, B)
+    chess_puzzle.conf2unicode(B)
+    chess_puzzle.piece_at(2, 5, B).can_move_to(1, 4, B)
+    data = chess_instrument.snapshot()
+    assert data['read_board']['calls'] == 1
+    assert data['conf2unicode']['calls'] == 1
+    assert data['Bishop.can_move_to']['calls'] == 1
+    assert data['is_checkmate']['max_ns'] > 0
+    assert sum(data['is_checkmate']['histogram'].values()) == 1
+
+def test_disable1():
+    original = chess_puzzle.is_check, King.can_reach
+    chess_instrument.enable()
+    assert chess_instrument.is_enabled()
+    assert chess_puzzle.is_check is not original[0]
+    chess_instrument.disable()
+    assert not chess_instrument.is_enabled()
+    assert (chess_puzzle.is_check, King.can_reach) == original
+    calls = chess_instrument.stats['is_check'].calls
+    chess_puzzle.is_check(True, chess_puzzle.read_board("board_examp.txt"))
+    assert chess_instrument.stats['is_check'].calls == calls
+
+def test_dump1(instrumented, tmp_path):
+    chess_puzzle.read_board("board_examp.txt")
+    path = str(tmp_path / "stats.json")
+    chess_instrument.dump(path)
+    with open(path) as file:
+        assert json.load(file)['read_board']['calls'] == 1
+    output = io.StringIO()
+    chess_instrument.dump(output)
+    assert output.getvalue().splitlines()[1].startswith("read_board")
+
+def test_signal1(instrumented, tmp_path):
+    path = str(tmp_path / "report.txt")
+    previous = signal.getsignal(signal.SIGUSR1)
+    try:
+        chess_instrument.install_signal_handler(signal.SIGUSR1, path)
+        chess_puzzle.read_board("board_examp.txt")
+        os.kill(os.getpid(), signal.SIGUSR1)
+        with open(path) as file:
+            assert "read_board" in file.read()
+    finally:
+        signal.signal(signal.SIGUSR1, previous)
+
+def test_signal2(monkeypatch):
+    # without SIGUSR1 the signal must be given, so Ctrl-C keeps interrupting
+    monkeypatch.setattr(chess_instrument, 'DEFAULT_SIGNAL', None)
+    previous = signal.getsignal(signal.SIGINT)
+    with pytest.raises(ValueError):
+        chess_instrument.install_signal_handler()
+    assert signal.getsignal(signal.SIGINT) is previous
+
+def test_main_dump1(monkeypatch, tmp_path):
+    # the report is written even when input ends at a prompt
+    path = str(tmp_path / "report.json")
+    monkeypatch.setenv('CHESS_INSTRUMENT', path)
+    answers = iter(["board_examp.txt"])
+    def fake_input(prompt):
+        try:
+            return next(answers)
+        except StopIteration:
+            raise EOFError
+    monkeypatch.setattr('builtins.input', fake_input)
+    previous = signal.getsignal(signal.SIGUSR1)
+    try:
+        with pytest.raises(EOFError):
+            chess_puzzle.main()
+    finally:
+        chess_instrument.disable()
+        chess_instrument.reset()
+        signal.signal(signal.SIGUSR1, previous)
+    with open(path) as file:
+        assert json.load(file)['read_board']['calls'] == 1
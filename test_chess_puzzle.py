@@ -8,6 +8,17 @@ def test_location2index1():
 def test_index2location1():
     assert index2location(5,2) == "e2"
 
+def test_move2index1():
+    assert move2index("b5d3") == (2,5,4,3)
+    assert move2index("a10b11") == (1,10,2,11)
+    for move in ("b5", "b5d", "5bd3", "b5 d3"):
+        with pytest.raises(ValueError):
+            move2index(move)
+
+def test_index2move1():
+    assert index2move(1,10,2,11) == "a10b11"
+    assert move2index(index2move(2,5,4,3)) == (2,5,4,3)
+
 wb1 = Bishop(2,5,True)
 wb2 = Bishop(4,4,True)
 wb3 = Bishop(3,1,True)
@@ -88,3 +99,324 @@ def test_read_board1():
             if piece.pos_x == piece1.pos_x and piece.pos_y == piece1.pos_y and piece.side == piece1.side and type(piece) == type(piece1):
                 found = True
         assert found
+
+def test_board_occupancy1():
+    B = Board(B1)
+    assert B == B1
+    assert B.occupancy[(3,3)] is bb1
+    assert piece_at(3,3, B) is bb1
+    assert is_piece_at(2,2, B) == False
+
+def test_board_move_to1():
+    Actual_B = wb2.move_to(3,3, Board(B1))
+    assert isinstance(Actual_B, Board)
+    assert piece_at(3,3, Actual_B).side == True
+    assert len(Actual_B[1]) == len(B1[1]) - 1
+
+def test_ray_tables1():
+    tables = ray_tables(5)
+    assert tables is ray_tables(5)
+    assert tables.between[((1,1), (4,4))] == ((2,2), (3,3))
+    assert ((1,1), (4,3)) not in tables.between
+    assert sorted(tables.neighbours[(1,1)]) == [(1,2), (2,1), (2,2)]
+    assert tables.rays[(3,3)][0] == ((4,4), (5,5))
+
+def test_make_move1():
+    B = Board((5, [wb1, bb1, wb2, bb2, wb3, wk1, bk1]))
+    before = list(B[1])
+    undo = B.make_move(wb2, 3,3)
+    assert piece_at(3,3, B) is wb2
+    assert bb1 not in B[1]
+    assert not is_piece_at(4,4, B)
+    B.unmake_move(undo)
+    assert B[1] == before
+    assert piece_at(3,3, B) is bb1
+    assert piece_at(4,4, B) is wb2
+    assert (wb2.pos_x, wb2.pos_y) == (4,4)
+
+def test_piece_setters1():
+    # passing a piece in a plain tuple does not take its setters away
+    piece = Bishop(2,2,False)
+    assert is_check(True, (5, [King(1,1,True), King(5,5,False), piece])) == True
+    piece.pos_x = 3
+    piece.side = True
+    assert (piece.pos_x, piece.side) == (3, True)
+    assert is_check(True, (5, [King(1,1,True), King(5,5,False), piece])) == False
+    with pytest.raises(ValueError):
+        piece.pos_y = -1
+
+def test_can_move_to2():
+    wk = King(1,1,True)
+    B = (5, [wk, King(5,5,False), Bishop(3,4,False)])
+    assert wk.can_move_to(1,2, B) == False
+    assert wk.can_move_to(2,1, B) == True
+
+def test_legal_moves1():
+    B3 = (5, [wk1a, wb4, bk1, bb2, bb3, wb3, wb5])
+    assert list(legal_moves(False, B3)) == []
+    moves = {(p, x, y) for p, x, y in legal_moves(True, B1)}
+    expected = {(p, x, y) for p in B1[1] if p.side
+                for x in range(1, 6) for y in range(1, 6) if p.can_move_to(x, y, B1)}
+    assert moves == expected
+
+def test_is_stalemate1():
+    B4 = (3, [King(1,1,False), King(1,3,True), Bishop(3,2,True)])
+    assert is_stalemate(False, B4) == True
+    assert is_stalemate(True, B4) == False
+
+def test_analyse_position1():
+    wk = King(1,1,True)
+    wb = Bishop(2,2,True)
+    bb = Bishop(4,4,False)
+    B = (5, [wk, wb, bb, King(5,1,False)])
+    info = analyse_position(True, B)
+    assert info.checkers == []
+    assert info.pinned[wb] == {(2,2), (3,3), (4,4)}
+    assert wb.can_move_to(3,3, B) == True
+    assert wb.can_move_to(1,3, B) == False
+    assert (2,2) in analyse_position(False, B).attacked
+
+def test_analyse_position2():
+    import random
+    rng = random.Random(7)
+    for _ in range(100):
+        size = rng.choice([4, 6, 8])
+        squares = rng.sample([(x, y) for x in range(1, size + 1) for y in range(1, size + 1)], 6)
+        pieces = [King(*squares[0], True), King(*squares[1], False)]
+        pieces += [Bishop(x, y, rng.random() < 0.5) for x, y in squares[2:]]
+        B = Board((size, pieces))
+        for side in (True, False):
+            for piece in [p for p in pieces if p.side == side]:
+                for x, y in piece.candidate_moves(B):
+                    undo = B.make_move(piece, x, y)
+                    expected = not is_check(side, B)
+                    B.unmake_move(undo)
+                    assert piece.can_move_to(x, y, B) == expected
+
+def test_update_check1():
+    import random
+    rng = random.Random(11)
+    for _ in range(30):
+        board = Board((6, [King(1,1,True), King(6,6,False), Bishop(3,1,True), Bishop(2,5,True),
+                           Bishop(4,6,False), Bishop(6,3,False)]))
+        side = True
+        for _ in range(20):
+            moves = list(legal_moves(side, board))
+            if not moves:
+                break
+            piece, x, y = rng.choice(moves)
+            board = apply_board(piece, piece.pos_x, piece.pos_y, x, y, board)
+            for s in (True, False):
+                assert board.checks[s] == bool(find_checkers(find_king(s, board), board))
+            side = not side
+
+def test_position_key1():
+    B = Board((5, [wb1, bb1, wb2, bb2, wb3, wk1, bk1]))
+    key = B.key
+    assert B.position_key(True) != B.position_key(False)
+    undo = B.make_move(wb2, 3,3)
+    moved = Board((5, [Bishop(3,3,True), wb1, bb2, wb3, wk1, bk1]))
+    assert B.key == moved.key != key
+    B.unmake_move(undo)
+    assert B.key == key
+    assert Board((5, list(reversed(B[1])))).key == key
+    assert Board((6, B[1])).key != key
+
+def test_position_key2():
+    # the key is computed on first use, also after moves made before it
+    B = Board((5, [wb1, bb1, wb2, bb2, wb3, wk1, bk1]))
+    undo = B.make_move(wb2, 3,3)
+    assert B.key == Board((5, list(B[1]))).key
+    B.unmake_move(undo)
+    assert B.key == Board((5, list(B[1]))).key
+
+def test_plain_tuple1():
+    B = (5, [wb1, bb1, wk1, bk1])
+    assert is_piece_at(3,3, B) and not is_piece_at(4,4, B)
+    assert piece_at(2,5, B) is wb1
+    assert is_check(True, B) == is_check(True, Board(B))
+
+def test_result_cache1():
+    cache = ResultCache(max_entries=2)
+    cache.put(1, 'check', True)
+    cache.put(2, 'check', False)
+    assert cache.get(1, 'check') == True
+    cache.put(3, 'check', True)
+    assert cache.get(2, 'check') is None
+    assert cache.get(1, 'check') == True
+    assert cache.stats()['hits'] == 2
+    assert cache.stats()['misses'] == 1
+    assert cache.stats()['evictions'] == 1
+
+def test_result_cache2():
+    B3 = Board((5, [wk1a, wb4, bk1, bb2, bb3, wb3, wb5]))
+    result_cache.clear()
+    assert is_checkmate(False, B3) == True
+    hits = result_cache.hits
+    assert is_checkmate(False, B3) == True
+    assert is_stalemate(False, B3) == False
+    assert result_cache.hits > hits
+    assert legal_move_list(False, B3) == []
+
+def test_piece_slots1():
+    import pickle
+    for piece in (Bishop(2,5,True), King(3,5,False)):
+        assert not hasattr(piece, '__dict__')
+        copy = pickle.loads(pickle.dumps(piece))
+        assert (type(copy), copy.pos_x, copy.pos_y, copy.side) == (type(piece), piece.pos_x, piece.pos_y, piece.side)
+
+def test_solve_mate1():
+    B = Board((8, [King(2,6,True), King(2,8,False), Bishop(6,8,True), Bishop(5,4,True), Bishop(7,2,True)]))
+    line = solve_mate(B, True, 3)
+    assert len(line) == 5
+    assert solve_mate(B, True, 2) is None
+    board, side = B, True
+    for from_x, from_y, to_x, to_y in line:
+        board = apply_board(piece_at(from_x, from_y, board), from_x, from_y, to_x, to_y, board)
+        side = not side
+    assert is_checkmate(side, board)
+    assert [(p.pos_x, p.pos_y) for p in B[1]] == [(2,6), (2,8), (6,8), (5,4), (7,2)]
+
+def test_save_board1(tmp_path):
+    path = str(tmp_path / "board.txt")
+    save_board(path, read_board("board_examp.txt"))
+    with open(path) as file:
+        assert file.read() == "5\nBb5, Kc5, Bd4, Bc1\nKb3, Bc3, Be3\n"
+
+def test_iter_boards1(tmp_path):
+    path = str(tmp_path / "boards.txt")
+    boards = [read_board("board_examp.txt"), Board((3, [King(1,3,True), Bishop(3,2,True), King(1,1,False)]))]
+    assert write_boards(path, boards * 3) == 6
+    read = list(iter_boards(path))
+    assert len(read) == 6
+    assert [board_to_plain(B) for B in read] == [board_to_plain(B) for B in boards * 3]
+
+def test_transform_square1():
+    for t in range(SYMMETRIES):
+        for x in range(1, 6):
+            for y in range(1, 6):
+                assert transform_square(*transform_square(x, y, 5, t), 5, inverse_transform(t)) == (x, y)
+
+def test_canonical_board1():
+    B = read_board("board_examp.txt")
+    boards = [transform_board(B, t) for t in range(SYMMETRIES)]
+    assert len({board_to_plain(canonical_board(T)[0]) for T in boards}) == 1
+    squares = lambda B: sorted((p.symbol, p.side, p.pos_x, p.pos_y) for p in B[1])
+    for T in boards:
+        C, t = canonical_board(T)
+        assert squares(transform_board(T, t)) == squares(C)
+
+def test_transform_board1():
+    # the legal moves of a rotated board are the rotated legal moves
+    B = Board((5, [King(1,3,True), Bishop(2,1,True), Bishop(3,5,True), King(1,5,False)]))
+    moves = legal_move_list(True, B)
+    T = transform_board(B, 1)
+    assert is_checkmate(False, T) == is_checkmate(False, B) == False
+    expected = sorted(transform_square(fx, fy, 5, 1) + transform_square(tx, ty, 5, 1) for fx, fy, tx, ty in moves)
+    assert sorted(legal_move_list(True, T)) == expected
+
+def test_perft1():
+    B = read_board("board_examp.txt")
+    assert perft(B, True, 0) == 1
+    assert perft(B, True, 1) == len(legal_move_list(True, B))
+    # depth 2 against the original move rules: can_move_to on every square
+    expected = 0
+    for piece in [p for p in B[1] if p.side]:
+        for x in range(1, 6):
+            for y in range(1, 6):
+                if piece.can_move_to(x, y, B):
+                    expected += len(legal_move_list(False, piece.move_to(x, y, B)))
+    assert perft(B, True, 2) == expected
+    divide = perft_divide(B, True, 3)
+    assert sum(divide.values()) == perft(B, True, 3)
+    assert [(p.pos_x, p.pos_y) for p in B[1]] == [(2,5), (3,5), (4,4), (3,1), (2,3), (3,3), (5,3)]
+
+def test_engine1():
+    B = Board((5, [King(1,1,True), King(1,3,False), Bishop(1,2,False), Bishop(1,5,False)]))
+    piece, x, y = Engine(max_depth=3, time_limit=None).choose_move(B, False)
+    assert (piece.pos_x, piece.pos_y, x, y) == (1, 5, 3, 3)
+    assert piece in B[1]
+    assert is_checkmate(True, apply_board(piece, 1, 5, x, y, B))
+
+def test_engine2():
+    # a fake clock which advances one second per reading: one per search node
+    import itertools
+    B = Board((26, [King(13,1,True), Bishop(2,1,True), Bishop(25,1,True),
+                    King(13,26,False), Bishop(2,26,False), Bishop(25,26,False)]))
+    engine = Engine(max_depth=10, time_limit=100, clock=itertools.count().__next__)
+    piece, x, y = engine.choose_move(B, False)
+    assert engine.nodes == 101
+    assert 1 <= engine.depth < 10
+    assert (piece, x, y) in list(legal_moves(False, B))
+    assert [(p.pos_x, p.pos_y) for p in B[1]] == [(13,1), (2,1), (25,1), (13,26), (2,26), (25,26)]
+
+def test_opponents_turn1():
+    assert Engine().choose_move(Board((3, [King(1,3,True), Bishop(3,2,True), King(1,1,False)])), False) is None
+    B = read_board("board_examp.txt")
+    from_x, from_y, to_x, to_y = opponents_turn(B, Engine(max_depth=2))
+    assert piece_at(from_x, from_y, B).side == False
+    assert piece_at(from_x, from_y, B).can_move_to(to_x, to_y, B)
+
+def test_sample_legal_move1():
+    import random
+    B = read_board("board_examp.txt")
+    moves = list(legal_moves(False, B))
+    rng = random.Random(0)
+    counts = {}
+    for _ in range(200 * len(moves)):
+        move = sample_legal_move(False, B, rng)
+        counts[move] = counts.get(move, 0) + 1
+    assert set(counts) == set(moves)
+    assert all(100 < count < 300 for count in counts.values())
+    assert sample_legal_move(False, Board((3, [King(1,3,True), Bishop(3,2,True), King(1,1,False)]))) is None
+
+def test_find_black_move2():
+    # only the king can move; the stuck bishop must never make it fail
+    B = Board((5, [King(5,5,True), Bishop(2,1,True), King(1,1,False), Bishop(1,2,False), Bishop(3,3,True)]))
+    for _ in range(20):
+        piece, x, y = find_black_move(B)
+        assert piece.can_move_to(x, y, B)
+
+def test_conf2unicode1():
+    B = read_board("board_examp.txt")
+    rows = conf2unicode(B).split("\n")
+    assert len(rows) == 5
+    assert rows[0] == "\u2001♗♔\u2001\u2001"
+    assert rows[2] == "\u2001♚♝\u2001♝"
+    assert rows[4] == "\u2001\u2001♗\u2001\u2001"
+
+def test_conf2unicode_diff1():
+    B = read_board("board_examp.txt")
+    text = conf2unicode(B)
+    for move in [(2, 5, 1, 4), (2, 3, 1, 4), (3, 5, 2, 5)]:
+        B = apply_board(piece_at(move[0], move[1], B), *move, B)
+        text, changes = conf2unicode_diff(text, B, move)
+        assert text == conf2unicode(B)
+    # the capture on a4 changes two cells: the emptied b3 and the captured a4
+    B = read_board("board_examp.txt")
+    B = apply_board(piece_at(2, 5, B), 2, 5, 1, 4, B)
+    text = conf2unicode(B)
+    B = apply_board(piece_at(2, 3, B), 2, 3, 1, 4, B)
+    assert sorted(conf2unicode_diff(text, B, (2, 3, 1, 4))[1]) == [(1, 4, "♚"), (2, 3, "\u2001")]
+
+def test_main_opponent1(monkeypatch):
+    import chess_puzzle
+    answers = iter(["board_examp.txt", "b5c4"])
+    def fake_input(prompt):
+        try:
+            return next(answers)
+        except StopIteration:
+            raise EOFError
+    calls = []
+    def fake_find_black_move(B):
+        calls.append(B)
+        raise RuntimeError("stop")
+    monkeypatch.setattr('builtins.input', fake_input)
+    monkeypatch.setattr(chess_puzzle, 'find_black_move', fake_find_black_move)
+    monkeypatch.setenv('CHESS_OPPONENT', 'random')
+    with pytest.raises(EOFError):
+        chess_puzzle.main()
+    assert len(calls) == 1
+    monkeypatch.setenv('CHESS_OPPONENT', 'nobody')
+    with pytest.raises(ValueError):
+        chess_puzzle.main()
@@ -0,0 +1,32 @@
+import random
+
+import pytest
+from chess_puzzle import *
+from chess_selfplay import *
+
+
+def test_play_game1():
+    # the mate in two found by solve_mate, played by scripts
+    B = Board((5, [King(1,3,True), Bishop(2,1,True), Bishop(3,5,True), King(1,5,False)]))
+    result = play_game(B, "script:c5b4,b1d3", "script:a5b5", max_plies=10)
+    assert result == {'outcome': 'checkmate', 'winner': 'white', 'plies': 3}
+    assert [(p.pos_x, p.pos_y) for p in B[1]] == [(1,3), (2,1), (3,5), (1,5)]
+
+def test_play_game2():
+    B = Board((3, [King(1,3,True), Bishop(3,2,True), King(1,1,False)]))
+    assert play_game(B, "random", "random")['outcome'] in OUTCOMES
+    B = read_board("board_examp.txt")
+    assert play_game(B, "random", "random", max_plies=4, seed=1) == play_game(B, "random", "random", max_plies=4, seed=1)
+    with pytest.raises(ValueError):
+        play_game(B, "script:a1a2", "random")
+    with pytest.raises(ValueError):
+        make_policy("minimax", random.Random())
+
+def test_run_games1():
+    B = read_board("board_examp.txt")
+    summary = run_games(B, "random", "engine:1:0.05", games=6, workers=2, max_plies=20, chunk_size=2)
+    assert summary['games'] == 6
+    assert sum(summary['outcomes'].values()) == 6
+    assert summary['plies_per_sec'] > 0
+    assert run_games(B, "random", "random", 4, workers=1, max_plies=20, seed=3)['plies'] == \
+        run_games(B, "random", "random", 4, workers=2, max_plies=20, seed=3, chunk_size=1)['plies']
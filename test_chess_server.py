@@ -0,0 +1,87 @@
+import asyncio
+import json
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+from chess_server import *
+
+
+async def _request(reader, writer, line):
+    writer.write((line + "\n").encode())
+    await writer.drain()
+    reply = []
+    while not reply or not reply[-1].startswith(("OK", "ERR")):
+        reply.append((await reader.readline()).decode().rstrip("\n"))
+    return reply
+
+
+def _run(coroutine_function):
+    async def runner():
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            game_server = GameServer(executor, max_depth=1, time_limit=0.2)
+            server = await game_server.start_tcp()
+            port = server.sockets[0].getsockname()[1]
+            async with server:
+                return await coroutine_function(game_server, port)
+    return asyncio.run(runner())
+
+
+def test_respond1():
+    plain, events, over = respond("5\nKa3, Bb4, Bd3\nKb5\n", 1, 0.2)
+    assert events == ['CHECKMATE white']
+    assert over == True
+    plain, events, over = respond("5\nBb5, Kc5, Bd4, Bc1\nKb3, Bc3, Be3\n", 1, 0.2)
+    assert events[0].startswith('BLACK ')
+    assert over == False
+
+def test_session1():
+    async def play(game_server, port):
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        assert (await _request(reader, writer, "MOVE b5d3"))[-1].startswith("ERR")
+        assert await _request(reader, writer, "BOARD 5/Bb5, Kc5, Bd4, Bc1/Kb3, Bc3, Be3") == ["OK 5"]
+        assert (await _request(reader, writer, "MOVE a1a2"))[-1].startswith("ERR")
+        reply = await _request(reader, writer, "MOVE b5a4")
+        assert reply[-1] == "OK"
+        assert any(line.startswith("BLACK ") for line in reply)
+        board = await _request(reader, writer, "SHOW")
+        assert board[0] == "5"
+        assert "Bb5" not in board[1]
+        assert await _request(reader, writer, "QUIT") == ["OK bye"]
+        writer.close()
+    _run(play)
+
+def test_stats1():
+    async def play(game_server, port):
+        connections = [await asyncio.open_connection('127.0.0.1', port) for _ in range(3)]
+        for reader, writer in connections:
+            await _request(reader, writer, "BOARD 3/Ka3, Bc2/Ka1")
+        reader, writer = connections[0]
+        stats = json.loads((await _request(reader, writer, "STATS"))[-1][3:])
+        assert stats['active_sessions'] == 3
+        assert stats['latency_max'] > 0
+        for reader, writer in connections:
+            await _request(reader, writer, "QUIT")
+            writer.close()
+        await asyncio.sleep(0.05)
+        assert game_server.stats()['active_sessions'] == 0
+        assert game_server.stats()['total_sessions'] == 3
+    _run(play)
+
+def test_load1(tmp_path):
+    boards = tmp_path / "boards"
+    (boards / "sub").mkdir(parents=True)
+    (boards / "sub" / "a.txt").write_text("3\nKa3, Bc2\nKa1\n")
+    (boards / "bad.txt").write_text("root:x:0:0\n")
+    (tmp_path / "secret.txt").write_text("3\nKa3, Bc2\nKa1\n")
+    (boards / "link.txt").symlink_to(tmp_path / "secret.txt")
+    assert GameServer(None).board_dir is None
+    with pytest.raises(ValueError):
+        GameServer(None).load_board("sub/a.txt")
+    game_server = GameServer(None, board_dir=str(boards))
+    assert game_server.load_board("sub/a.txt")[0] == 3
+    for name in ("", str(tmp_path / "secret.txt"), "../secret.txt", "sub/../../secret.txt", "link.txt", "missing.txt"):
+        with pytest.raises(ValueError, match="^(Invalid board file name|Cannot load the board)"):
+            game_server.load_board(name)
+    with pytest.raises(ValueError) as info:
+        asyncio.run(game_server.execute(Session(1, "local"), "LOAD", "bad.txt"))
+    assert "root" not in str(info.value)
@@ -0,0 +1,108 @@
+import io
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+import chess_puzzle
+from chess_puzzle import *
+from chess_store import *
+from chess_batch import iter_board_files, run_batch
+
+
+MATE2 = Board((5, [King(1,3,True), Bishop(2,1,True), Bishop(3,5,True), King(1,5,False)]))
+
+def _put_keys(filename, start):
+    with SolutionStore(filename) as store:
+        for i in range(start, start + 20):
+            store.put_many({f"key{i}": Solution(check=False), "shared": Solution(searched=i)})
+    return True
+
+
+def test_put_many1(tmp_path):
+    with SolutionStore(str(tmp_path / "s.db")) as store:
+        store.put_many({"a": Solution(check=True), "b": Solution(searched=2)})
+        store.put_many({"a": Solution(checkmate=False), "b": Solution(mate=((1, 1, 2, 2),), mate_in=1, searched=1)})
+        found = store.get_many(["a", "b", "c"])
+        assert set(found) == {"a", "b"}
+        assert found["a"] == Solution(check=True, checkmate=False)
+        assert found["b"] == Solution(mate=((1, 1, 2, 2),), mate_in=1, searched=2)
+    with SolutionStore(str(tmp_path / "s.db")) as store:
+        assert len(store) == 2
+
+def test_put_solution1(tmp_path):
+    with SolutionStore(str(tmp_path / "s.db")) as store:
+        line = solve_mate(MATE2, True, 2)
+        store.put_solution(MATE2, True, mate=line, searched=2)
+        for t in range(SYMMETRIES):
+            T = transform_board(MATE2, t)
+            solution = store.get_solution(T, True)
+            assert solution.mate_in == 2
+            assert list(solution.mate) == [transform_square(a, b, 5, t) + transform_square(c, d, 5, t)
+                                           for a, b, c, d in line]
+        assert store.get_solution(MATE2, False) is None
+        assert len(store) == 1
+
+def test_solve_mate2(tmp_path, monkeypatch):
+    with SolutionStore(str(tmp_path / "s.db")) as store:
+        line = solve_mate(MATE2, True, 3, store=store)
+        assert solve_mate(read_board("board_examp.txt"), True, 1, store=store) is None
+        def no_search(*args):
+            raise AssertionError("searched")
+        monkeypatch.setattr(chess_puzzle, "_attack", no_search)
+        assert solve_mate(MATE2, True, 3, store=store) == line
+        assert solve_mate(MATE2, True, 1, store=store) is None
+        assert solve_mate(transform_board(read_board("board_examp.txt"), 2), True, 1, store=store) is None
+
+def test_eviction1(tmp_path):
+    with SolutionStore(str(tmp_path / "s.db"), max_entries=2, touch_interval=0) as store:
+        store.put_many({"a": Solution(check=True)})
+        time.sleep(0.01)
+        store.put_many({"b": Solution(check=True)})
+        time.sleep(0.01)
+        store.get_many(["a"])
+        time.sleep(0.01)
+        store.put_many({"c": Solution(check=True)})
+        assert set(store.get_many(["a", "b", "c"])) == {"a", "c"}
+
+def test_touch_interval1(tmp_path):
+    # a hit within touch_interval of the last use only reads
+    with SolutionStore(str(tmp_path / "s.db")) as store:
+        store.put_many({"a": Solution(check=True)})
+        changes = store._db.total_changes
+        assert store.get_many(["a"])["a"].check
+        assert store._db.total_changes == changes
+        store.touch_interval = 0
+        store.get_many(["a"])
+        assert store._db.total_changes == changes + 1
+
+def test_bad_row1(tmp_path):
+    with SolutionStore(str(tmp_path / "s.db")) as store:
+        store.put_many({"a": Solution(mate=((1, 1, 2, 2),), mate_in=1)})
+        store._db.execute("UPDATE solutions SET mate = 'x1'")
+        with pytest.raises(ValueError):
+            store.get_many(["a"])
+
+def test_concurrent1(tmp_path):
+    filename = str(tmp_path / "s.db")
+    SolutionStore(filename).close()
+    with ProcessPoolExecutor(max_workers=4) as executor:
+        assert all(executor.map(_put_keys, [filename] * 4, [0, 20, 40, 60]))
+    with SolutionStore(filename) as store:
+        assert len(store) == 81
+        assert store.get_many(["shared"])["shared"].searched == 79
+
+def test_run_batch_store1(tmp_path):
+    boards = tmp_path / "boards"
+    boards.mkdir()
+    (boards / "a.txt").write_text("5\nKa3, Bb1, Bc5\nKa5\n")
+    (boards / "b.txt").write_text("5\nBb5, Kc5, Bd4, Bc1\nKb3, Bc3, Be3\n")
+    store = str(tmp_path / "s.db")
+    outputs = []
+    for _ in range(2):
+        output = io.StringIO()
+        run_batch(iter_board_files(str(boards)), output, workers=2, mate_depth=2, store=store)
+        outputs.append(sorted(output.getvalue().splitlines()))
+    assert outputs[0] == outputs[1]
+    with SolutionStore(store) as solutions:
+        assert len(solutions) == 4
+        assert solutions.get_solution(read_board(str(boards / "a.txt")), True).mate_in == 2
@@ -0,0 +1,71 @@
+import itertools
+import os
+
+import pytest
+import chess_puzzle
+from chess_puzzle import *
+from chess_tablebase import *
+
+
+@pytest.fixture(scope="module")
+def kbbk3(tmp_path_factory):
+    directory = str(tmp_path_factory.mktemp("tablebases"))
+    files = build_tablebases("KBBvK", 3, directory)
+    tablebase = Tablebase([f for f in files if "KBBvK" in f][0])
+    yield directory, tablebase
+    tablebase.close()
+
+
+def test_parse_signature1():
+    assert parse_signature("KBBvK") == [('K', True), ('B', True), ('B', True), ('K', False)]
+    with pytest.raises(ValueError):
+        parse_signature("BKvK")
+
+def test_probe1(kbbk3):
+    _, tablebase = kbbk3
+    B3 = Board((3, [King(1,3,True), Bishop(3,2,True), King(1,1,False)]))
+    assert tablebase.probe(B3, False) is None
+    squares = [(x, y) for x in range(1, 4) for y in range(1, 4)]
+    checked = 0
+    for wk, wb1, wb2, bk in itertools.permutations(squares, 4):
+        B = Board((3, [King(*wk, True), Bishop(*wb1, True), Bishop(*wb2, True), King(*bk, False)]))
+        probe = tablebase.probe(B, True)
+        if probe is None:
+            continue
+        checked += 1
+        line = solve_mate(B, True, 3)
+        if probe[0] == 'win':
+            assert len(line) == probe[1]
+        else:
+            assert line is None
+    assert checked > 0
+
+def test_register_tablebase1(kbbk3, monkeypatch):
+    directory, _ = kbbk3
+    monkeypatch.setattr(chess_puzzle, 'tablebases', [])
+    loaded = load_tablebases(directory)
+    assert len(chess_puzzle.tablebases) == 3
+    B = Board((3, [King(1,3,True), Bishop(2,1,True), Bishop(3,3,True), King(3,1,False)]))
+    assert probe_tablebases(B, False) is not None
+    piece, x, y = find_black_move(B)
+    assert piece.side == False and piece.can_move_to(x, y, B)
+    engine = Engine(max_depth=3)
+    assert engine.choose_move(B, False) == tablebase_move(False, B)
+    assert engine.nodes == 0
+    for tablebase in loaded:
+        tablebase.close()
+
+def test_tablebase_magic1(kbbk3, tmp_path):
+    directory, _ = kbbk3
+    with open(os.path.join(directory, "KBBvK_3.cptb"), 'rb') as file:
+        data = file.read()
+    old = tmp_path / "KBBvK_3.cptb"
+    old.write_bytes(b'CPTB' + data[4:])
+    with pytest.raises(ValueError):
+        Tablebase(str(old))
+
+def test_tablebase_size1(kbbk3):
+    directory, _ = kbbk3
+    path = os.path.join(directory, "KBBvK_3.cptb")
+    # white king on 3 canonical squares instead of 9, 2 bytes per position
+    assert os.path.getsize(path) == HEADER.size + 3 * 9 ** 3 * 2 * 2
@@ -0,0 +1,45 @@
+import random
+
+import pytest
+np = pytest.importorskip("numpy")
+from chess_puzzle import *
+from chess_vector import *
+
+
+def random_boards(count, size, seed):
+    rng = random.Random(seed)
+    boards = []
+    while len(boards) < count:
+        squares = rng.sample([(x, y) for x in range(1, size + 1) for y in range(1, size + 1)], rng.randint(2, 7))
+        pieces = [King(*squares[0], True), King(*squares[1], False)]
+        pieces += [Bishop(x, y, rng.random() < 0.5) for x, y in squares[2:]]
+        boards.append(Board((size, pieces)))
+    return boards
+
+
+def test_stack_boards1():
+    B = read_board("board_examp.txt")
+    grid = stack_boards([B])
+    assert grid.shape == (1, 5, 5)
+    assert grid[0, 4, 2] == KING
+    assert grid[0, 2, 1] == -KING
+    assert board_to_plain(unstack_board(grid, 0)).splitlines()[0] == "5"
+    assert sorted(board_to_plain(unstack_board(grid, 0)).replace(',', '').split()) == \
+        sorted(board_to_plain(B).replace(',', '').split())
+
+def test_batch_classify1():
+    for size in (3, 5, 8, 26):
+        boards = random_boards(300, size, size)
+        for side in (True, False):
+            result = batch_classify(boards, side)
+            assert list(result['check']) == [is_check(side, B) for B in boards]
+            assert list(result['checkmate']) == [is_checkmate(side, B) for B in boards]
+            assert list(result['stalemate']) == [is_stalemate(side, B) for B in boards]
+
+def test_square_tables1():
+    rays, neighbours = square_tables(3)
+    # a1 is square 0; diagonal (1, 1) runs b2, c3; the off-board square 9 pads
+    assert list(rays[0, 0]) == [4, 8]
+    assert list(rays[0, 1]) == [9, 9]
+    assert sorted(neighbours[0]) == [1, 3, 4, 9, 9, 9, 9, 9]
+    assert square_tables(3) is square_tables(3)